@@ -28,9 +28,9 @@ import d1_common.cert.subjects
 import d1_common.types.exceptions
 
 import django.conf
-import django.core.cache
 import django.db.models
 
+import d1_gmn.app.cache
 import d1_gmn.app.models
 import d1_gmn.app.node_registry
 
@@ -104,11 +104,87 @@ def get_trusted_subjects_string():
 # Permission checks
 
 
+class AuthContext:
+    """Authorization state for the session subjects of a request.
+
+    Trust, whitelist membership, subject ids and permission levels are resolved on
+    first use and cached for the lifetime of the request. Use ``get_auth_context()`` to
+    get the context for a request.
+
+    """
+
+    def __init__(self, all_subjects_set):
+        self.subject_set = frozenset(all_subjects_set)
+        self._is_trusted = None
+        self._is_whitelisted = None
+        self._subject_id_list = None
+        self._level_dict = {}
+
+    def is_trusted(self):
+        if self._is_trusted is None:
+            trusted_subject_set = get_trusted_subjects()
+            logging.debug("Session subjects: {}".format(", ".join(self.subject_set)))
+            logging.debug("Trusted subjects: {}".format(", ".join(trusted_subject_set)))
+            self._is_trusted = not self.subject_set.isdisjoint(trusted_subject_set)
+        return self._is_trusted
+
+    def is_whitelisted(self):
+        if self._is_whitelisted is None:
+            whitelisted_subject_set = get_whitelisted_subject_set()
+            logging.debug(
+                "Whitelisted subjects: {}".format(", ".join(whitelisted_subject_set))
+            )
+            self._is_whitelisted = not self.subject_set.isdisjoint(
+                whitelisted_subject_set
+            )
+        return self._is_whitelisted
+
+    def get_subject_id_list(self):
+        """Get the ids of the Subject rows for the session subjects.
+
+        Subjects that are not in the database have no permissions, and are skipped.
+
+        """
+        if self._subject_id_list is None:
+            self._subject_id_list = list(
+                d1_gmn.app.models.Subject.objects.filter(
+                    subject__in=self.subject_set
+                ).values_list("id", flat=True)
+            )
+        return self._subject_id_list
+
+    def get_permission_level(self, pid):
+        """Get the highest access level that the session subjects have on an object.
+
+        Returns None if none of the subjects have access or if the object does not
+        exist.
+
+        """
+        if pid not in self._level_dict:
+            self._level_dict[pid] = d1_gmn.app.models.Permission.objects.filter(
+                sciobj__pid__did=pid, subject_id__in=self.get_subject_id_list()
+            ).aggregate(level=django.db.models.Max("level"))["level"]
+        return self._level_dict[pid]
+
+
+def get_auth_context(request):
+    """Get the AuthContext for the request.
+
+    The context is normally created in ``ViewHandler.process_view()``. It is created
+    here for requests that did not pass through the middleware, and recreated if the
+    session subjects have changed.
+
+    """
+    auth_context = getattr(request, "auth_context", None)
+    if auth_context is None or auth_context.subject_set != request.all_subjects_set:
+        auth_context = AuthContext(request.all_subjects_set)
+        request.auth_context = auth_context
+    return auth_context
+
+
 def is_trusted_subject(request):
     """Determine if calling subject is fully trusted."""
-    logging.debug("Session subjects: {}".format(", ".join(request.all_subjects_set)))
-    logging.debug("Trusted subjects: {}".format(", ".join(get_trusted_subjects())))
-    return not request.all_subjects_set.isdisjoint(get_trusted_subjects())
+    return get_auth_context(request).is_trusted()
 
 
 def is_client_side_cert_subject(request):
@@ -122,14 +198,18 @@ def get_client_side_certificate_subject():
     cert has been configured. Else return None.
 
     """
-    subject = django.core.cache.cache.get("client_side_certificate_subject")
+    subject = d1_gmn.app.cache.get_cache("client_cert").get(
+        "client_side_certificate_subject"
+    )
     if subject is not None:
         return subject
     cert_pem = _get_client_side_certificate_pem()
     if cert_pem is None:
         return None
     subject = _extract_subject_from_pem(cert_pem)
-    django.core.cache.cache.set("client_side_certificate_subject", subject)
+    d1_gmn.app.cache.get_cache("client_cert").set(
+        "client_side_certificate_subject", subject
+    )
     return subject
 
 
@@ -184,19 +264,12 @@ def is_allowed(request, level, pid):
     """
     if is_trusted_subject(request):
         return True
-    return d1_gmn.app.models.Permission.objects.filter(
-        sciobj__pid__did=pid,
-        subject__subject__in=request.all_subjects_set,
-        level__gte=level,
-    ).exists()
+    max_level = get_auth_context(request).get_permission_level(pid)
+    return max_level is not None and max_level >= level
 
 
 def has_create_update_delete_permission(request):
-    whitelisted_subject_set = get_whitelisted_subject_set()
-    logging.debug("Whitelisted subjects: {}".format(", ".join(whitelisted_subject_set)))
-    return is_trusted_subject(request) or not request.all_subjects_set.isdisjoint(
-        whitelisted_subject_set
-    )
+    return is_trusted_subject(request) or get_auth_context(request).is_whitelisted()
 
 
 def get_whitelisted_subject_set():
@@ -0,0 +1,293 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Namespaced access to the Django cache.
+
+Each GMN subsystem that caches values does so in its own namespace, such as ``slice``
+for the listObjects() and getLogRecords() slice cursors. A namespace has its own key
+prefix, default timeout and size limit, so a subsystem that caches many values, such
+as the slice cursors, cannot evict the values of another.
+
+A namespace uses the cache with the same alias in CACHES if there is one. Otherwise,
+it uses a cache set up like the ``default`` cache, with the TIMEOUT and MAX_ENTRIES
+from CACHE_NAMESPACES:
+
+- In-memory (LocMemCache) and file based (FileBasedCache) caches get a separate
+  location for each namespace, so the MAX_ENTRIES limit applies to each namespace.
+
+- Other backends, such as Memcached, are shared by all namespaces and the namespace is
+  added to the key prefix. Memcached manages its own size limit.
+
+The in-memory cache is separate for each GMN process. When GMN runs in several worker
+processes, as is typical under Apache mod_wsgi or Gunicorn, values that are cached by
+one worker are not available to the others, and the slice cursors, which are set by
+one request and used by the next, are found only if the next request is handled by
+the same worker. A file based or Memcached cache is shared by all the workers.
+
+Hits and misses are counted for each namespace. The counts are added to counters held
+in the namespace itself every STATS_FLUSH_COUNT lookups, so that, with a shared
+cache, they include the lookups in all the workers.
+
+"""
+import copy
+import logging
+import os
+import threading
+
+import django.conf
+import django.core.cache
+import django.core.cache.backends.base
+import django.core.cache.backends.db
+import django.core.cache.backends.filebased
+import django.core.cache.backends.locmem
+import django.core.signals
+import django.utils.module_loading
+
+# Number of lookups in a namespace after which the counts are added to the shared
+# counters.
+STATS_FLUSH_COUNT = 100
+
+STATS_KEY_PREFIX = "_stats_"
+
+# Backends that hold values in the memory of the process
+PROCESS_LOCAL_BACKEND_TUP = (django.core.cache.backends.locmem.LocMemCache,)
+
+# Backends that get a separate location for each namespace
+SEPARATE_LOCATION_BACKEND_TUP = (
+    django.core.cache.backends.locmem.LocMemCache,
+    django.core.cache.backends.filebased.FileBasedCache,
+)
+
+# Backends that support the MAX_ENTRIES option
+MAX_ENTRIES_BACKEND_TUP = SEPARATE_LOCATION_BACKEND_TUP + (
+    django.core.cache.backends.db.DatabaseCache,
+)
+
+_MISSING = object()
+
+log = logging.getLogger(__name__)
+
+_local = threading.local()
+_config_generation = 0
+
+_stats_lock = threading.Lock()
+_pending_stats_dict = {}
+
+
+class NamespaceCache(object):
+    """Access a single cache namespace.
+
+    Lookups are counted as hits or misses. Otherwise, the methods work like the
+    methods with the same names in the Django cache API.
+
+    """
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+
+    @property
+    def backend(self):
+        return _get_backend(self.namespace)
+
+    def get(self, key, default=None):
+        value = self.backend.get(key, _MISSING)
+        if value is _MISSING:
+            _count(self.namespace, "miss")
+            return default
+        _count(self.namespace, "hit")
+        return value
+
+    def set(self, key, value, timeout=django.core.cache.backends.base.DEFAULT_TIMEOUT):
+        self.backend.set(key, value, timeout)
+
+    def delete(self, key):
+        self.backend.delete(key)
+
+    def clear(self):
+        self.backend.clear()
+
+
+def get_cache(namespace):
+    """Get the cache for a namespace.
+
+    Args:
+        namespace: str
+            A key in CACHE_NAMESPACES.
+
+    Returns:
+        NamespaceCache
+
+    """
+    return NamespaceCache(namespace)
+
+
+def get_namespace_list():
+    return sorted(django.conf.settings.CACHE_NAMESPACES)
+
+
+def clear_all():
+    """Clear all cache namespaces."""
+    for namespace in get_namespace_list():
+        get_cache(namespace).clear()
+    with _stats_lock:
+        _pending_stats_dict.clear()
+
+
+def is_shared(namespace):
+    """Return True if the namespace is held in a cache that can be shared between
+    processes."""
+    return not isinstance(_get_backend(namespace), PROCESS_LOCAL_BACKEND_TUP)
+
+
+def get_stats():
+    """Get hit and miss counts for all cache namespaces.
+
+    Returns:
+        dict: Namespace to dict as returned by ``get_namespace_stats()``.
+
+    """
+    return {
+        namespace: get_namespace_stats(namespace) for namespace in get_namespace_list()
+    }
+
+
+def get_namespace_stats(namespace):
+    """Get hit and miss counts for a cache namespace.
+
+    Returns:
+        dict: ``backend``, ``shared``, ``hit``, ``miss`` and ``hit_rate``.
+        ``hit_rate`` is None if there have been no lookups. For a shared cache, the
+        counts include the lookups in all processes that use the cache.
+
+    """
+    _flush_stats(namespace)
+    backend = _get_backend(namespace)
+    count_dict = backend.get_many([STATS_KEY_PREFIX + "hit", STATS_KEY_PREFIX + "miss"])
+    hit_int = count_dict.get(STATS_KEY_PREFIX + "hit", 0)
+    miss_int = count_dict.get(STATS_KEY_PREFIX + "miss", 0)
+    return {
+        "backend": type(backend).__name__,
+        "shared": is_shared(namespace),
+        "hit": hit_int,
+        "miss": miss_int,
+        "hit_rate": hit_int / (hit_int + miss_int) if hit_int + miss_int else None,
+    }
+
+
+def check_namespace(namespace):
+    """Check that a value can be stored in and retrieved from a namespace.
+
+    Returns:
+        None if the check was successful, else a str describing the error.
+
+    """
+    key = STATS_KEY_PREFIX + "check"
+    value = "{}_{}".format(os.getpid(), threading.get_ident())
+    try:
+        backend = _get_backend(namespace)
+        backend.set(key, value, 60)
+        stored_value = backend.get(key)
+        backend.delete(key)
+    except Exception as e:
+        return str(e)
+    if stored_value != value:
+        return "Stored value could not be retrieved"
+
+
+# ------------------------------------------------------------------------------
+
+
+def _get_backend(namespace):
+    if getattr(_local, "generation", None) != _config_generation:
+        _local.generation = _config_generation
+        _local.backend_dict = {}
+    backend = _local.backend_dict.get(namespace)
+    if backend is None:
+        backend = _create_backend(namespace)
+        _local.backend_dict[namespace] = backend
+    return backend
+
+
+def _create_backend(namespace):
+    """Create a cache backend for a namespace.
+
+    Cache backend instances are not thread safe, so, like Django, GMN creates a
+    separate instance for each thread. Instances of the in-memory backend with the
+    same location share the cached values.
+
+    """
+    if namespace in django.conf.settings.CACHES:
+        return django.core.cache.caches[namespace]
+    param_dict = copy.deepcopy(django.conf.settings.CACHES["default"])
+    namespace_dict = django.conf.settings.CACHE_NAMESPACES.get(namespace, {})
+    backend_class = django.utils.module_loading.import_string(param_dict.pop("BACKEND"))
+    location = param_dict.pop("LOCATION", "")
+    if issubclass(backend_class, django.core.cache.backends.filebased.FileBasedCache):
+        location = os.path.join(location, namespace)
+    elif issubclass(backend_class, SEPARATE_LOCATION_BACKEND_TUP):
+        location = "{}_{}".format(location or "gmn", namespace)
+    param_dict["KEY_PREFIX"] = ":".join(
+        v for v in (param_dict.get("KEY_PREFIX"), namespace) if v
+    )
+    if "TIMEOUT" in namespace_dict:
+        param_dict["TIMEOUT"] = namespace_dict["TIMEOUT"]
+    if namespace_dict.get("MAX_ENTRIES") and issubclass(
+        backend_class, MAX_ENTRIES_BACKEND_TUP
+    ):
+        param_dict.setdefault("OPTIONS", {})["MAX_ENTRIES"] = namespace_dict[
+            "MAX_ENTRIES"
+        ]
+    return backend_class(location, param_dict)
+
+
+def _count(namespace, stat_str):
+    with _stats_lock:
+        count_dict = _pending_stats_dict.setdefault(namespace, {"hit": 0, "miss": 0})
+        count_dict[stat_str] += 1
+        is_flush_due = count_dict["hit"] + count_dict["miss"] >= STATS_FLUSH_COUNT
+    if is_flush_due:
+        _flush_stats(namespace)
+
+
+def _flush_stats(namespace):
+    """Add the counts for this process to the counters in the namespace."""
+    with _stats_lock:
+        count_dict = _pending_stats_dict.pop(namespace, {})
+    backend = _get_backend(namespace)
+    for stat_str, count_int in count_dict.items():
+        if not count_int:
+            continue
+        key = STATS_KEY_PREFIX + stat_str
+        try:
+            backend.add(key, 0, None)
+            backend.incr(key, count_int)
+        except Exception as e:
+            log.warning(
+                'Unable to update cache stats. namespace="{}" error="{}"'.format(
+                    namespace, str(e)
+                )
+            )
+
+
+def _reset(setting, **_kwargs):
+    """Discard the cache backends when the cache settings are changed in tests."""
+    global _config_generation
+    if setting in ("CACHES", "CACHE_NAMESPACES"):
+        _config_generation += 1
+
+
+django.core.signals.setting_changed.connect(_reset)
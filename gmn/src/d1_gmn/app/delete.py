@@ -24,6 +24,7 @@ import django.apps
 import d1_gmn.app.did
 import d1_gmn.app.model_util
 import d1_gmn.app.models
+import d1_gmn.app.query_count
 import d1_gmn.app.revision
 import d1_gmn.app.sciobj_store
 
@@ -60,5 +61,6 @@ def delete_sciobj_from_database(pid):
     d1_gmn.app.revision.delete_chain(pid)
     # The models.CASCADE property is set on all ForeignKey fields, so most object
     # related info is deleted when deleting the IdNamespace "root".
-    d1_gmn.app.models.IdNamespace.objects.filter(did=pid).delete()
+    with d1_gmn.app.query_count.track_sciobj_change():
+        d1_gmn.app.models.IdNamespace.objects.filter(did=pid).delete()
     d1_gmn.app.model_util.delete_unused_subjects()
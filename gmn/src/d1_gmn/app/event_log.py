@@ -26,28 +26,126 @@ import re
 import d1_common.types.exceptions
 
 import django.conf
+import django.db.transaction
 
 import d1_gmn.app.auth
+import d1_gmn.app.event_log_buffer
 import d1_gmn.app.models
 
+# Lookup tables referenced by EventLog. Field name -> model.
+LOOKUP_MODEL_DICT = {
+    "event": d1_gmn.app.models.Event,
+    "ip_address": d1_gmn.app.models.IpAddress,
+    "user_agent": d1_gmn.app.models.UserAgent,
+    "subject": d1_gmn.app.models.Subject,
+}
+LOOKUP_FIELD_LIST = list(LOOKUP_MODEL_DICT.keys())
+# Subjects are shared with System Metadata and unused Subjects are deleted together with
+# the objects that used them, so their ids cannot be cached safely.
+UNCACHED_LOOKUP_FIELD_SET = {"subject"}
+
+# (field name, value) -> id of row in lookup table.
+_lookup_id_cache = {}
+
 
 def create_log_entry(object_model, event, ip_address, user_agent, subject):
     event_log_model = d1_gmn.app.models.EventLog()
     event_log_model.sciobj = object_model
-    event_log_model.event = d1_gmn.app.models.event(event)
-    event_log_model.ip_address = d1_gmn.app.models.ip_address(ip_address)
-    event_log_model.user_agent = d1_gmn.app.models.user_agent(user_agent)
-    event_log_model.subject = d1_gmn.app.models.subject(subject)
+    d1_gmn.app.models.assert_valid_event(event)
+    event_log_model.event_id = get_lookup_id("event", event)
+    event_log_model.ip_address_id = get_lookup_id("ip_address", ip_address)
+    event_log_model.user_agent_id = get_lookup_id("user_agent", user_agent)
+    event_log_model.subject_id = get_lookup_id("subject", subject)
     event_log_model.save()
     return event_log_model
 
 
+def get_lookup_id(field_name, value_str):
+    """Get the id of the row holding ``value_str`` in the lookup table for
+    ``field_name``, creating the row if it does not exist."""
+    return get_lookup_id_dict(field_name, {value_str})[value_str]
+
+
+def get_lookup_id_dict(field_name, value_set):
+    """Get the ids of the rows holding the values in ``value_set`` in the lookup table
+    for ``field_name``, creating any rows that do not exist.
+
+    The lookup tables are small and rarely modified, so the ids are cached in memory.
+    Ids are added to the cache only after the transaction that may have created the
+    rows has been committed, so that the cache never holds ids of rolled back rows.
+    Ids are not cached under manual transaction management, or for lookup tables in
+    UNCACHED_LOOKUP_FIELD_SET, from which rows may be deleted.
+
+    Returns:
+        dict: value -> id
+
+    """
+    id_dict = {}
+    missing_set = set()
+    for value_str in value_set:
+        try:
+            id_dict[value_str] = _lookup_id_cache[(field_name, value_str)]
+        except KeyError:
+            missing_set.add(value_str)
+    if not missing_set:
+        return id_dict
+    model = LOOKUP_MODEL_DICT[field_name]
+    found_dict = {}
+    if len(missing_set) > 1:
+        found_dict.update(
+            model.objects.filter(**{field_name + "__in": missing_set}).values_list(
+                field_name, "id"
+            )
+        )
+    for value_str in missing_set - set(found_dict):
+        found_dict[value_str] = model.objects.get_or_create(**{field_name: value_str})[
+            0
+        ].id
+    id_dict.update(found_dict)
+    if field_name in UNCACHED_LOOKUP_FIELD_SET:
+        return id_dict
+    connection = django.db.transaction.get_connection()
+    if connection.in_atomic_block or connection.get_autocommit():
+        django.db.transaction.on_commit(
+            lambda: _cache_lookup_ids(field_name, found_dict)
+        )
+    return id_dict
+
+
+def clear_lookup_id_cache():
+    _lookup_id_cache.clear()
+
+
+def _cache_lookup_ids(field_name, id_dict):
+    if len(_lookup_id_cache) >= django.conf.settings.EVENT_LOG_LOOKUP_CACHE_SIZE:
+        _lookup_id_cache.clear()
+    for value_str, id_int in id_dict.items():
+        _lookup_id_cache[(field_name, value_str)] = id_int
+
+
 def create(pid, request, timestamp=None):
     _log(pid, request, "create", timestamp)
 
 
 def log_read_event(pid, request, timestamp=None):
-    if not _is_ignored_read_event(request):
+    """Log a read event.
+
+    If EVENT_LOG_BUFFER_ENABLED is True, the event is written asynchronously. See
+    d1_gmn.app.event_log_buffer.
+
+    """
+    if _is_ignored_read_event(request):
+        return
+    if d1_gmn.app.event_log_buffer.is_enabled():
+        d1_gmn.app.event_log_buffer.enqueue(
+            pid,
+            "read",
+            request.META["REMOTE_ADDR"],
+            request.META.get("HTTP_USER_AGENT", "<not provided>"),
+            request.primary_subject_str,
+            timestamp,
+        )
+    else:
         _log(pid, request, "read", timestamp)
 
 
@@ -0,0 +1,311 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Buffered writer for read events in the Event Log.
+
+When EVENT_LOG_BUFFER_ENABLED is True, read events are not written to the database
+while the request is being processed. Instead, they are added to an in-process buffer
+that is written by a background thread in batches, when the buffer holds
+EVENT_LOG_BUFFER_SIZE events, and at least every EVENT_LOG_BUFFER_MAX_AGE seconds.
+
+Each batch is written in a single transaction, with the related ScienceObject and
+lookup table rows resolved with one query per table, and the EventLog rows inserted
+with bulk_create().
+
+Events are also appended to a spill file under EVENT_LOG_BUFFER_SPILL_DIR_PATH before
+they are added to the buffer. The spill file is truncated after each successful
+write. If the process is stopped before the buffer has been written, the events are
+recovered from the spill file by the next GMN process that starts the writer.
+
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+import d1_common.date_time
+
+import django.conf
+import django.db
+import django.db.transaction
+
+import d1_gmn.app.event_log
+import d1_gmn.app.models
+
+SPILL_FILE_PREFIX = "event_log_spill."
+SPILL_FILE_EXT = ".jsonl"
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Condition()
+_flush_lock = threading.Lock()
+_event_list = []
+_writer_thread = None
+_spill_file = None
+
+
+def is_enabled():
+    return django.conf.settings.EVENT_LOG_BUFFER_ENABLED
+
+
+def enqueue(pid, event, ip_address, user_agent, subject, timestamp=None):
+    """Add an event to the buffer.
+
+    The event is written to the database asynchronously. ``timestamp`` defaults to the
+    time at which the event was added to the buffer.
+
+    """
+    event_dict = {
+        "pid": pid,
+        "event": event,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "subject": subject,
+        "timestamp": (timestamp or d1_common.date_time.utc_now()).isoformat(),
+    }
+    with _lock:
+        _start_writer_if_required()
+        _spill(event_dict)
+        _event_list.append(event_dict)
+        if len(_event_list) >= django.conf.settings.EVENT_LOG_BUFFER_SIZE:
+            _lock.notify()
+
+
+def flush():
+    """Write all buffered events to the database.
+
+    Called by the writer thread and at process exit. May also be called directly, e.g.,
+    from tests and management commands, to write the buffer synchronously.
+
+    Returns:
+        int: Number of EventLog rows that were created.
+
+    """
+    with _flush_lock:
+        with _lock:
+            event_list = list(_event_list)
+            _event_list.clear()
+        if not event_list:
+            return 0
+        try:
+            created_int = write_events(event_list)
+        except Exception:
+            # Keep the events for the next attempt. They are still in the spill file.
+            with _lock:
+                _event_list[:0] = event_list
+            raise
+        with _lock:
+            # Events that were added while writing remain in the spill file.
+            _rewrite_spill(_event_list)
+        return created_int
+
+
+def write_events(event_list):
+    """Write a batch of events to the database in a single transaction.
+
+    Events for objects that no longer exist are dropped. If the batch references a
+    lookup table row that has been deleted after its id was cached, the cache is cleared
+    and the batch is written again with fresh ids.
+
+    Returns:
+        int: Number of EventLog rows that were created.
+
+    """
+    try:
+        return _write_events(event_list)
+    except django.db.IntegrityError:
+        log.warning("Retrying event batch with fresh lookup ids")
+        d1_gmn.app.event_log.clear_lookup_id_cache()
+        return _write_events(event_list)
+
+
+def _write_events(event_list):
+    with django.db.transaction.atomic():
+        pid_to_id_dict = dict(
+            d1_gmn.app.models.ScienceObject.objects.filter(
+                pid__did__in={e["pid"] for e in event_list}
+            ).values_list("pid__did", "id")
+        )
+        lookup_dict = {
+            field_name: d1_gmn.app.event_log.get_lookup_id_dict(
+                field_name, {e[field_name] for e in event_list}
+            )
+            for field_name in d1_gmn.app.event_log.LOOKUP_FIELD_LIST
+        }
+        event_log_model_list = []
+        written_event_list = []
+        for e in event_list:
+            sciobj_id = pid_to_id_dict.get(e["pid"])
+            if sciobj_id is None:
+                log.warning(
+                    'Dropped event for non-existing object. event="{}"'.format(e)
+                )
+                continue
+            event_log_model_list.append(
+                d1_gmn.app.models.EventLog(
+                    sciobj_id=sciobj_id,
+                    event_id=lookup_dict["event"][e["event"]],
+                    ip_address_id=lookup_dict["ip_address"][e["ip_address"]],
+                    user_agent_id=lookup_dict["user_agent"][e["user_agent"]],
+                    subject_id=lookup_dict["subject"][e["subject"]],
+                )
+            )
+            written_event_list.append(e)
+        d1_gmn.app.models.EventLog.objects.bulk_create(event_log_model_list)
+        # EventLog.timestamp is "auto_now_add", so the timestamps are always set to Now
+        # on insert and must be updated in a separate step.
+        for event_log_model, e in zip(event_log_model_list, written_event_list):
+            event_log_model.timestamp = d1_common.date_time.dt_from_iso8601_str(
+                e["timestamp"]
+            )
+        d1_gmn.app.models.EventLog.objects.bulk_update(
+            event_log_model_list, ["timestamp"]
+        )
+    return len(event_log_model_list)
+
+
+# Writer thread
+
+
+def _start_writer_if_required():
+    global _writer_thread
+    if _writer_thread is not None:
+        return
+    _recover_orphaned_spill_files()
+    _writer_thread = threading.Thread(
+        target=_writer_loop, name="EventLogWriter", daemon=True
+    )
+    _writer_thread.start()
+    atexit.register(_flush_at_exit)
+
+
+def _writer_loop():
+    max_age_sec = django.conf.settings.EVENT_LOG_BUFFER_MAX_AGE
+    while True:
+        with _lock:
+            _lock.wait_for(
+                lambda: len(_event_list) >= django.conf.settings.EVENT_LOG_BUFFER_SIZE,
+                timeout=max_age_sec,
+            )
+        try:
+            flush()
+        except Exception as e:
+            log.error(
+                "Unable to write buffered events. Retrying in {} sec. error={}".format(
+                    max_age_sec, str(e)
+                )
+            )
+            time.sleep(max_age_sec)
+        finally:
+            django.db.connection.close()
+
+
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception as e:
+        log.error(
+            "Unable to write buffered events at exit. The events remain in the spill "
+            'file. path="{}" error="{}"'.format(_get_spill_path(os.getpid()), str(e))
+        )
+
+
+# Spill file
+
+
+def _spill(event_dict):
+    global _spill_file
+    if _spill_file is None:
+        _spill_file = open(_get_spill_path(os.getpid()), "a", encoding="utf-8")
+    _spill_file.write(json.dumps(event_dict) + "\n")
+    _spill_file.flush()
+
+
+def _rewrite_spill(event_list):
+    if _spill_file is None:
+        return
+    _spill_file.seek(0)
+    _spill_file.truncate()
+    for event_dict in event_list:
+        _spill_file.write(json.dumps(event_dict) + "\n")
+    _spill_file.flush()
+
+
+def _recover_orphaned_spill_files():
+    """Add events from spill files left behind by GMN processes that have stopped to the
+    buffer.
+
+    Each orphaned spill file is claimed by renaming it, so that only one process
+    recovers the events in a given file.
+
+    """
+    spill_dir_path = django.conf.settings.EVENT_LOG_BUFFER_SPILL_DIR_PATH
+    for file_name in os.listdir(spill_dir_path):
+        owner_pid = _get_spill_owner_pid(file_name)
+        if owner_pid is None or _is_running_process(owner_pid):
+            continue
+        spill_path = os.path.join(spill_dir_path, file_name)
+        claimed_path = "{}.recovering.{}".format(spill_path, os.getpid())
+        try:
+            os.rename(spill_path, claimed_path)
+        except OSError:
+            # Claimed by another process
+            continue
+        with open(claimed_path, "r", encoding="utf-8") as f:
+            event_list = [json.loads(line) for line in f if line.strip()]
+        for event_dict in event_list:
+            _spill(event_dict)
+        _event_list.extend(event_list)
+        os.unlink(claimed_path)
+        log.info(
+            'Recovered buffered events from spill file. path="{}" count={}'.format(
+                spill_path, len(event_list)
+            )
+        )
+
+
+def _get_spill_path(owner_pid):
+    return os.path.join(
+        django.conf.settings.EVENT_LOG_BUFFER_SPILL_DIR_PATH,
+        "{}{}{}".format(SPILL_FILE_PREFIX, owner_pid, SPILL_FILE_EXT),
+    )
+
+
+def _get_spill_owner_pid(file_name):
+    if not (
+        file_name.startswith(SPILL_FILE_PREFIX) and file_name.endswith(SPILL_FILE_EXT)
+    ):
+        return None
+    try:
+        return int(file_name[len(SPILL_FILE_PREFIX) : -len(SPILL_FILE_EXT)])
+    except ValueError:
+        return None
+
+
+def _is_running_process(pid):
+    if pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
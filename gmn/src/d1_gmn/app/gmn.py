@@ -33,16 +33,21 @@ import string
 
 import requests
 
+import d1_scimeta.validate
+
 import d1_common.url
 
 import django.apps
 import django.conf
 import django.core.exceptions
 
+import d1_gmn.app.cache
+import d1_gmn.app.middleware.session_jwt
 import d1_gmn.app.sciobj_store
 import d1_gmn.app.util
 
 RESOURCE_MAP_CREATE_MODE_LIST = ["block", "open"]
+SCIOBJ_DELIVERY_MODE_LIST = ["stream", "file", "x_sendfile", "x_accel_redirect"]
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +75,33 @@ class Startup(django.apps.AppConfig):
         self._assert_is_type("SCIMETA_VALIDATION_ENABLED", bool)
         self._assert_is_type("SCIMETA_VALIDATION_MAX_SIZE", int)
         self._assert_is_in("SCIMETA_VALIDATION_OVER_SIZE_ACTION", ("reject", "accept"))
+        self._assert_is_type("SCIMETA_VALIDATION_WARM_UP", bool)
+        self._assert_is_type("SLICE_CHECKPOINT_INTERVAL", int)
+        self._assert_is_type("EVENT_LOG_BUFFER_ENABLED", bool)
+        if django.conf.settings.EVENT_LOG_BUFFER_ENABLED:
+            self._assert_is_type("EVENT_LOG_BUFFER_SIZE", int)
+            self._assert_is_dir("EVENT_LOG_BUFFER_SPILL_DIR_PATH")
+        self._assert_is_in("SCIOBJ_DELIVERY_MODE", SCIOBJ_DELIVERY_MODE_LIST)
+        if django.conf.settings.SCIOBJ_DELIVERY_MODE == "x_accel_redirect":
+            self._assert_is_type("SCIOBJ_X_ACCEL_REDIRECT_URL", str)
+        self._assert_is_type("QUERY_COUNT_CACHE_ENABLED", bool)
+        if django.conf.settings.QUERY_COUNT_CACHE_ENABLED:
+            self._assert_is_type("QUERY_COUNT_CACHE_SIZE", int)
+            self._assert_is_type("QUERY_COUNT_CACHE_MAX_AGE", int)
+        self._assert_is_type("SESSION_CERT_CACHE_ENABLED", bool)
+        if django.conf.settings.SESSION_CERT_CACHE_ENABLED:
+            self._assert_is_type("SESSION_CERT_CACHE_MAX_AGE", int)
+        self._assert_is_type("JWT_CACHE_ENABLED", bool)
+        if django.conf.settings.JWT_CACHE_ENABLED:
+            self._assert_is_type("JWT_CACHE_MAX_AGE", int)
+        self._assert_is_type("JWT_CN_CERT_REFRESH_INTERVAL", int)
+        self._assert_is_type("CACHE_NAMESPACES", dict)
+        self._assert_is_type("REPLICATION_CONCURRENCY", int)
+        self._assert_is_type("REPLICATION_CONCURRENCY_PER_NODE", int)
+        self._assert_is_type("PACKAGE_CACHE_ENABLED", bool)
+        if django.conf.settings.PACKAGE_CACHE_ENABLED:
+            self._assert_is_type("PACKAGE_CACHE_DIR_PATH", str)
+            self._assert_is_type("PACKAGE_CACHE_MAX_SIZE", int)
 
         if django.conf.settings.UNSAFE_SETTING_WARNINGS:
             self._warn_unsafe_for_prod()
@@ -81,6 +113,9 @@ class Startup(django.apps.AppConfig):
 
         self._add_xslt_mimetype()
         self._set_mn_logo()
+        self._warm_up_scimeta_validators()
+        self._start_jwt_cn_cert_refresh()
+        self._log_cache_diagnostic()
 
     def _assert_is_type(self, setting_name, valid_type):
         v = self._get_setting(setting_name)
@@ -130,6 +165,13 @@ class Startup(django.apps.AppConfig):
                 is_none_allowed=False,
             )
 
+    def _assert_is_dir(self, setting_name):
+        v = self._get_setting(setting_name)
+        if not os.path.isdir(v):
+            self.raise_config_error(
+                setting_name, v, str, "a path to an existing directory"
+            )
+
     def raise_config_error(
         self, setting_name, cur_val, exp_type, valid_str=None, is_none_allowed=False
     ):
@@ -270,6 +312,70 @@ class Startup(django.apps.AppConfig):
                 "images/gmn_logo.png"
             )
 
+    def _warm_up_scimeta_validators(self):
+        """Compile and cache the XML Schema validators for SciMeta validation.
+
+        Failing to compile a validator is not fatal. Validation of objects of the
+        affected formatId will fail in the same way when the validator is compiled on
+        first use.
+
+        """
+        if not (
+            django.conf.settings.SCIMETA_VALIDATION_ENABLED
+            and django.conf.settings.SCIMETA_VALIDATION_WARM_UP
+        ):
+            return
+        for format_id, error_str in d1_scimeta.validate.warm_up_cache():
+            logger.warning(
+                'Unable to compile SciMeta validator. format_id="{}" error="{}"'.format(
+                    format_id, error_str
+                )
+            )
+
+    def _start_jwt_cn_cert_refresh(self):
+        """Preload the CN certificate used for validating JWTs in the background.
+
+        In stand-alone mode, JWTs are ignored and the certificate is not needed.
+
+        """
+        if not django.conf.settings.STAND_ALONE:
+            d1_gmn.app.middleware.session_jwt.start_cn_cert_refresh()
+
+    def _log_cache_diagnostic(self):
+        """Check that a value can be stored in and retrieved from each cache namespace,
+        and log the backend and hit rate of each namespace.
+
+        With a shared cache, the hit rate includes the lookups by the GMN processes
+        that are already running and that ran since the cache was created.
+
+        Failing the check is not fatal. GMN works without the cache, but with reduced
+        performance.
+
+        """
+        for namespace in d1_gmn.app.cache.get_namespace_list():
+            error_str = d1_gmn.app.cache.check_namespace(namespace)
+            if error_str is not None:
+                logger.error(
+                    'Cache namespace is not working. namespace="{}" error="{}"'.format(
+                        namespace, error_str
+                    )
+                )
+                continue
+            stats_dict = d1_gmn.app.cache.get_namespace_stats(namespace)
+            logger.info(
+                'Cache namespace. namespace="{}" backend="{}" shared={} hit={} miss={} '
+                "hit_rate={}".format(
+                    namespace,
+                    stats_dict["backend"],
+                    stats_dict["shared"],
+                    stats_dict["hit"],
+                    stats_dict["miss"],
+                    "-"
+                    if stats_dict["hit_rate"] is None
+                    else "{:.1%}".format(stats_dict["hit_rate"]),
+                )
+            )
+
     def _get_setting(self, setting_dotted_name, default=None):
         """Return the value of a potentially nested dict setting.
 
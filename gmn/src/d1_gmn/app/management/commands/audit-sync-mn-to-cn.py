@@ -32,6 +32,14 @@ CN connections are made using the DataONE provided client side certificate, whic
 give access on the CN to all objects for which this GMN is registered as authoritative,
 meaning that this GMN is the primary location from which the object should be available.
 
+By default, the audit compares the list of objects that the CN has registered for this
+GMN with the list of local objects, and issues CNRead.describe() requests only where
+needed to confirm that an object is missing. The CN list is retrieved with
+CNRead.listObjects() in large pages, and the local list is read with a database cursor.
+The two lists are sorted on disk, so memory use does not depend on the number of
+objects, and then merged by PID. With --per-pid, or when a list of PIDs is provided with
+--pid-path, each local object is instead checked with a separate CNRead.describe() call.
+
 Unless the CN is working through large numbers of objects recently added to Member
 Nodes, objects should synchronize to the CN in less than 24 hours. If, after that time,
 objects are reported as unknown by the CN, the cause should be investigated.
@@ -58,9 +66,23 @@ are synced.
 
 """
 
+import heapq
+import json
+import os
+import tempfile
+
+import django.conf
+
+import d1_common.xml
+
 import d1_gmn.app.mgmt_base
 import d1_gmn.app.models
 
+# Number of PIDs held in memory before a sorted run is written to disk.
+SORT_CHUNK_SIZE = 100000
+# Number of local PIDs fetched from the database cursor in each round trip.
+DB_CURSOR_CHUNK_SIZE = 10000
+
 
 class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
     def __init__(self, *args, **kwargs):
@@ -78,16 +100,108 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
             action="store_true",
             help="Do not issue sync requests for objects missing on the CN",
         )
+        parser.add_argument(
+            "--per-pid",
+            action="store_true",
+            help=(
+                "Check each local object with a separate CNRead.describe() call "
+                "instead of comparing object lists"
+            ),
+        )
+        parser.add_argument(
+            "--list-page-size",
+            type=int,
+            default=5000,
+            metavar="N",
+            help="Number of objects to retrieve in each CNRead.listObjects() call",
+        )
 
     async def handle_async(self):
+        if self.opt_dict["per_pid"] or self.pid_set:
+            await self.audit_per_pid()
+        else:
+            await self.audit_by_object_list()
+        await self.await_all()
+        self.audit_tracker.completed()
+
+    async def audit_per_pid(self):
         self.log.info("Starting MN SciObj audit")
-        total_count = await self.query_sciobj_count()
-        self.log.info("Number of MN SciObj to audit: {}".format(total_count))
-        self.audit_tracker = self.tracker.tracker(
-            "Auditing CN availability of local SciObj", total_count
+        with ExternalSorter() as local_sorter:
+            await self.run_in_db_thread(self.load_local_pids, local_sorter)
+            self.audit_tracker = self.tracker.tracker(
+                "Auditing CN availability of local SciObj", local_sorter.count
+            )
+            for pid in local_sorter:
+                await self.add_task(self.check_and_sync(pid))
+
+    async def audit_by_object_list(self):
+        self.log.info("Starting MN SciObj audit by object list")
+        with ExternalSorter() as cn_sorter, ExternalSorter() as local_sorter:
+            await self.load_cn_pids(cn_sorter)
+            await self.run_in_db_thread(self.load_local_pids, local_sorter)
+            self.audit_tracker = self.tracker.tracker(
+                "Auditing CN availability of local SciObj", local_sorter.count
+            )
+            synced_count = 0
+            for pid, is_on_cn in iter_merge_by_pid(local_sorter, cn_sorter):
+                if is_on_cn:
+                    self.audit_tracker.step()
+                    synced_count += 1
+                else:
+                    # Confirm with CNRead.describe(), as the object may have synced
+                    # after the CN list was retrieved.
+                    await self.add_task(self.check_and_sync(pid))
+            self.audit_tracker.event(
+                "Audit OK: SciObj already synced on CN", count_int=synced_count
+            )
+
+    async def load_cn_pids(self, sorter):
+        """Add the PIDs of all objects that the CN has registered for this GMN.
+
+        Pages are retrieved in order, with each page starting after the objects that
+        have been received so far. So, no objects are skipped if the CN returns fewer
+        objects than requested.
+
+        """
+        page_size = self.opt_dict["list_page_size"]
+        node_id = django.conf.settings.NODE_IDENTIFIER
+        object_list_pyxb = await self.async_d1_client.list_objects(
+            nodeId=node_id, start=0, count=0
         )
-        for sciobj_model in self.query_sciobj_with_pid_filter():
-            await self.add_task(self.check_and_sync(sciobj_model.pid.did))
+        total_count = object_list_pyxb.total
+        self.log.info("Number of SciObj on CN: {}".format(total_count))
+        list_tracker = self.tracker.tracker("Retrieving CN object list", total_count)
+        while sorter.count < total_count:
+            object_list_pyxb = await self.async_d1_client.list_objects(
+                nodeId=node_id, start=sorter.count, count=page_size
+            )
+            if not object_list_pyxb.objectInfo:
+                self.log.warning(
+                    "CN object list ended early. received={} total={}".format(
+                        sorter.count, total_count
+                    )
+                )
+                break
+            for object_info_pyxb in object_list_pyxb.objectInfo:
+                sorter.add(d1_common.xml.get_req_val(object_info_pyxb.identifier))
+            list_tracker.step(sorter.count)
+        list_tracker.completed()
+
+    def load_local_pids(self, sorter):
+        """Add the PIDs of all local objects, or of the local objects in the list
+        provided with --pid-path.
+
+        This runs a DB query, so must not be called from the event loop.
+
+        """
+        for pid in (
+            self.query_sciobj_with_pid_filter()
+            .values_list("pid__did", flat=True)
+            .order_by()
+            .iterator(chunk_size=DB_CURSOR_CHUNK_SIZE)
+        ):
+            sorter.add(pid)
+        self.log.info("Number of MN SciObj to audit: {}".format(sorter.count))
 
     async def check_and_sync(self, pid):
         self.audit_tracker.step()
@@ -137,3 +251,74 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
                 f'pid="{pid}" status="{status}"',
                 is_error=True,
             )
+
+
+class ExternalSorter(object):
+    """Sort a large number of PIDs with bounded memory.
+
+    PIDs are buffered in memory and written to sorted temporary files when the buffer
+    is full. Iterating over the sorter merges the files and yields the unique PIDs in
+    sorted order. Use as a context manager to remove the temporary files.
+
+    """
+
+    def __init__(self, chunk_size=SORT_CHUNK_SIZE):
+        self.count = 0
+        self._chunk_size = chunk_size
+        self._pid_list = []
+        self._run_path_list = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for run_path in self._run_path_list:
+            os.unlink(run_path)
+        self._run_path_list = []
+
+    def add(self, pid):
+        self._pid_list.append(pid)
+        self.count += 1
+        if len(self._pid_list) >= self._chunk_size:
+            self._write_run()
+
+    def __iter__(self):
+        self._pid_list.sort()
+        run_file_list = [open(p, encoding="utf-8") for p in self._run_path_list]
+        try:
+            prev_pid = None
+            for pid in heapq.merge(
+                self._pid_list, *[map(json.loads, f) for f in run_file_list]
+            ):
+                if pid != prev_pid:
+                    yield pid
+                    prev_pid = pid
+        finally:
+            for run_file in run_file_list:
+                run_file.close()
+
+    def _write_run(self):
+        self._pid_list.sort()
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", suffix=".pid_run", delete=False
+        ) as f:
+            self._run_path_list.append(f.name)
+            for pid in self._pid_list:
+                # JSON encoding keeps each PID on a single line.
+                f.write(json.dumps(pid) + "\n")
+        self._pid_list = []
+
+
+def iter_merge_by_pid(local_pid_iter, cn_pid_iter):
+    """Merge two sorted iterators of unique PIDs.
+
+    Yields:
+        (pid, is_on_cn) for each PID in ``local_pid_iter``.
+
+    """
+    cn_pid_iter = iter(cn_pid_iter)
+    cn_pid = next(cn_pid_iter, None)
+    for pid in local_pid_iter:
+        while cn_pid is not None and cn_pid < pid:
+            cn_pid = next(cn_pid_iter, None)
+        yield pid, pid == cn_pid
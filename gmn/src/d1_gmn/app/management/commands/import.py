@@ -55,9 +55,24 @@ the source MN without using a certificate.
 After the certificate provided by GMN is accepted by the source MN, GMN is authenticated
 on the source MN for the subject(s) contained in the certificate. If no certificate was
 provided, only objects and APIs that are available to the public user are accessible.
+
+The import runs as a pipeline. Objects and events are retrieved from the source MN with
+async IO, SciObj bytes are written to the local SciObj store in a pool of
+``--file-workers`` threads, and the System Metadata and events are written to the
+database by a single writer thread, in transactions of up to ``--db-batch-size`` objects
+or events. The PIDs of the imported objects and the entry IDs of the imported events
+are appended to a checkpoint file (``--checkpoint-path``) after each transaction. If the
+import is interrupted, running it again skips the objects and events that are recorded
+in the checkpoint file. The checkpoint file is removed when the import completes.
 """
 import asyncio
+import concurrent.futures
+import json
 import logging
+import os
+import queue
+import tempfile
+import threading
 
 import d1_common.date_time
 import d1_common.type_conversions
@@ -70,18 +85,25 @@ import d1_common.xml
 
 import django.conf
 import django.core.management.base
+import django.db
 import django.db.transaction
 
 import d1_gmn.app.delete
 import d1_gmn.app.did
-import d1_gmn.app.event_log
+import d1_gmn.app.event_log_buffer
 import d1_gmn.app.mgmt_base
 import d1_gmn.app.model_util
 import d1_gmn.app.models
+import d1_gmn.app.query_count
 import d1_gmn.app.resource_map
 import d1_gmn.app.sciobj_store
 import d1_gmn.app.sysmeta
 
+DEFAULT_DB_BATCH_SIZE = 500
+DEFAULT_FILE_WORKERS = 4
+# Max time to wait for a batch to fill before writing a partial batch.
+DB_BATCH_MAX_WAIT_SEC = 1.0
+
 
 class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
     def __init__(self, *args, **kwargs):
@@ -90,6 +112,11 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
         self.log_records_arg_dict = None
         self.sciobj_tracker = None
         self.event_tracker = None
+        self.checkpoint = None
+        self.file_executor = None
+        self.db_queue = None
+        self.db_writer_thread = None
+        self.sciobj_started_set = set()
 
     def add_components(self, parser):
         self.using_single_instance(parser)
@@ -132,12 +159,85 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
             action="store_true",
             help="Recursively import all nested objects in Resource Maps",
         )
+        parser.add_argument(
+            "--checkpoint-path",
+            action="store",
+            default=os.path.join(tempfile.gettempdir(), "gmn_import.checkpoint"),
+            help="File in which to record imported objects and events, for resuming "
+            "an interrupted import",
+        )
+        parser.add_argument(
+            "--db-batch-size",
+            type=int,
+            action="store",
+            default=DEFAULT_DB_BATCH_SIZE,
+            help="Max number of objects or events to write in each DB transaction",
+        )
+        parser.add_argument(
+            "--file-workers",
+            type=int,
+            action="store",
+            default=DEFAULT_FILE_WORKERS,
+            help="Number of threads writing SciObj bytes to the SciObj store",
+        )
 
     async def handle_async(self):
         # Suppress debug output from async_client
         logging.getLogger("d1_client.aio.async_client").setLevel(logging.ERROR)
 
-        if not self.is_db_empty() and not self.opt_dict["force"]:
+        self.checkpoint = ImportCheckpoint(self.opt_dict["checkpoint_path"])
+        if self.checkpoint.is_resumed():
+            self.log.info(
+                "Resuming import from checkpoint. path={} sciobj_count={} "
+                "event_count={}".format(
+                    self.opt_dict["checkpoint_path"],
+                    self.checkpoint.count("sciobj"),
+                    self.checkpoint.count("event"),
+                )
+            )
+        await self.run_in_db_thread(self.prepare_db)
+
+        self.file_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.opt_dict["file_workers"]
+        )
+        try:
+            if not self.opt_dict["only_log"]:
+                self.start_db_writer(self.write_sciobj_batch)
+                try:
+                    if self.opt_dict["pid_path"]:
+                        await self.sciobj_import_by_pid_list()
+                    else:
+                        await self.sciobj_import_all()
+                    await self.await_all()
+                finally:
+                    await self.stop_db_writer()
+                self.sciobj_tracker.completed()
+
+            self.start_db_writer(self.write_event_batch)
+            try:
+                await self.event_import_all()
+                await self.await_all()
+            finally:
+                await self.stop_db_writer()
+            self.event_tracker.completed()
+        finally:
+            self.file_executor.shutdown()
+            self.checkpoint.close()
+
+        self.checkpoint.remove()
+
+    def prepare_db(self):
+        """Check that the DB is empty and clear it if requested.
+
+        The check is skipped when resuming from a checkpoint. This runs DB queries, so
+        must not be called from the event loop.
+
+        """
+        if (
+            not self.checkpoint.is_resumed()
+            and not self.opt_dict["force"]
+            and not self.is_db_empty()
+        ):
             raise django.core.management.base.CommandError(
                 "There are already local objects or Event Logs in the DB. "
                 "Use --force to import anyway. "
@@ -147,23 +247,14 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
         if self.opt_dict["clear"]:
             if self.opt_dict["only_log"]:
                 d1_gmn.app.models.EventLog.objects.all().delete()
+                d1_gmn.app.query_count.clear()
+                self.checkpoint.clear("event")
                 self.log.info("Cleared Event Logs from DB")
             else:
                 d1_gmn.app.delete.delete_all_from_db()
+                self.checkpoint.clear()
                 self.log.info("Cleared objects and Event Logs from DB")
 
-        if not self.opt_dict["only_log"]:
-            if self.opt_dict["pid_path"]:
-                await self.sciobj_import_by_pid_list()
-            else:
-                await self.sciobj_import_all()
-            await self.await_all()
-            self.sciobj_tracker.completed()
-
-        await self.event_import_all()
-        await self.await_all()
-        self.event_tracker.completed()
-
     # SciObj
 
     async def sciobj_import_all(self):
@@ -179,8 +270,7 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
     async def sciobj_import_by_pid_list(self):
         """Import SciObj specified by PID list file."""
         self.log.info("Starting SciObj import from PID file")
-        pid_list = self.load_set_from_file(self.opt_dict["pid_path"])
-        total_count = len(pid_list)
+        total_count = len(self.pid_set)
         self.log.info("Number of SciObj to import: {}".format(total_count))
         if not total_count:
             self.log.error("Aborted: Loaded empty list from file")
@@ -188,34 +278,51 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
         self.sciobj_tracker = self.tracker.tracker(
             "Importing SciObj by PID list file", total_count
         )
-        for pid in pid_list:
+        for pid in self.pid_set:
             await self.add_task(self.sciobj_import_pid(pid))
 
     async def sciobj_import_pid(self, pid):
-        """Import SciObj SysMeta and bytes"""
+        """Import SciObj SysMeta and bytes.
+
+        The SysMeta is passed to the DB writer, which creates the object in the DB
+        after the bytes are in the SciObj store.
+
+        """
         self.log.debug("Starting import of SciObj: {}".format(pid))
         self.sciobj_tracker.step()
-        if d1_gmn.app.did.is_existing_object(pid):
+        if pid in self.sciobj_started_set:
+            return
+        self.sciobj_started_set.add(pid)
+        if self.checkpoint.contains("sciobj", pid):
+            self.sciobj_tracker.event(
+                "Skipped object import: Recorded in checkpoint", 'pid="{}"'.format(pid)
+            )
+            return
+        if await self.run_in_file_executor(d1_gmn.app.did.is_existing_object, pid):
             self.sciobj_tracker.event(
                 "Skipped object import: Local object already exists",
                 'pid="{}"'.format(pid),
             )
             return
 
-        with django.db.transaction.atomic():
-            await self.sciobj_download_and_create(pid)
-
-        if self.opt_dict["deep"]:
-            if d1_gmn.app.did.is_resource_map_db(pid):
-                for (
-                    member_pid
-                ) in d1_gmn.app.resource_map.get_resource_map_members_by_map(pid):
-                    await self.sciobj_import_pid(member_pid)
-                    self.sciobj_tracker.event(
-                        "Imported aggregated SciObj", 'pid="{}"'.format(pid)
-                    )
+        resource_map = await self.sciobj_download(pid)
 
-    async def sciobj_download_and_create(self, pid):
+        if self.opt_dict["deep"] and resource_map is not None:
+            for member_pid in resource_map.getAggregatedPids():
+                await self.sciobj_import_pid(str(member_pid))
+                self.sciobj_tracker.event(
+                    "Imported aggregated SciObj", 'pid="{}"'.format(pid)
+                )
+
+    async def sciobj_download(self, pid):
+        """Download the SysMeta and bytes of a SciObj and queue the SciObj for
+        creation in the DB.
+
+        Returns:
+            ResourceMap or None: The parsed Resource Map if the SciObj is a Resource
+            Map that was stored locally.
+
+        """
         try:
             sysmeta_pyxb = await self.async_d1_client.get_system_metadata(pid)
         except d1_common.types.exceptions.DataONEException as e:
@@ -226,6 +333,7 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
             )
             return
 
+        resource_map = None
         sciobj_url = await self.sciobj_get_proxy_location(pid)
         if sciobj_url:
             self.sciobj_tracker.event(
@@ -243,14 +351,21 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
                 )
                 return
             sciobj_url = d1_gmn.app.sciobj_store.get_rel_sciobj_file_url_by_pid(pid)
+            if d1_gmn.app.resource_map.is_resource_map_sysmeta_pyxb(sysmeta_pyxb):
+                try:
+                    resource_map = await self.run_in_file_executor(
+                        d1_gmn.app.resource_map.get_resource_map_from_sciobj, pid
+                    )
+                except d1_common.types.exceptions.DataONEException as e:
+                    self.sciobj_tracker.event(
+                        "SciObj import failed: Invalid Resource Map",
+                        'pid="{}" error="{}"'.format(pid, e.friendly_format()),
+                        is_error=True,
+                    )
+                    return
 
-        d1_gmn.app.sysmeta.create_or_update(sysmeta_pyxb, sciobj_url)
-
-        if d1_gmn.app.resource_map.is_resource_map_sysmeta_pyxb(sysmeta_pyxb):
-            d1_gmn.app.resource_map.create_or_update_db(sysmeta_pyxb)
-            self.sciobj_tracker.event("Processed Resource Map", 'pid="{}"'.format(pid))
-
-        self.sciobj_tracker.event("Imported SciObj", 'pid="{}"'.format(pid))
+        await self.put_db_item((pid, sysmeta_pyxb, sciobj_url, resource_map))
+        return resource_map
 
     async def sciobj_get_proxy_location(self, pid):
         """If object is a proxy, return the proxy location URL.
@@ -265,17 +380,66 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
             pass
 
     async def sciobj_download_bytes_to_store(self, pid):
-        if d1_gmn.app.sciobj_store.is_existing_sciobj_file(pid):
+        """Download the SciObj bytes to the SciObj store.
+
+        The bytes are written to a temporary file in a thread of the file executor,
+        and the file is moved into place when the download is complete, so a file in
+        the SciObj store is always complete.
+
+        """
+        if await self.run_in_file_executor(
+            d1_gmn.app.sciobj_store.is_existing_sciobj_file, pid
+        ):
             self.sciobj_tracker.event(
                 "Skipped object bytes download: File already in local SciObj store",
                 'pid="{}"'.format(pid),
             )
             return
 
-        with d1_gmn.app.sciobj_store.open_sciobj_file_by_pid_ctx(
-            pid, write=True
-        ) as sciobj_file:
-            await self.async_d1_client.get(sciobj_file, pid)
+        tmp_file = await self.run_in_file_executor(
+            lambda: tempfile.NamedTemporaryFile(
+                dir=d1_gmn.app.sciobj_store.get_abs_upload_dir_path(),
+                suffix=".import",
+                delete=False,
+            )
+        )
+        try:
+            try:
+                await self.async_d1_client.get(
+                    ExecutorFile(tmp_file, self.file_executor), pid
+                )
+            finally:
+                await self.run_in_file_executor(tmp_file.close)
+            await self.run_in_file_executor(self.move_to_sciobj_store, tmp_file, pid)
+        except BaseException:
+            await self.run_in_file_executor(self.remove_if_exists, tmp_file.name)
+            raise
+
+    def move_to_sciobj_store(self, tmp_file, pid):
+        sciobj_path = d1_gmn.app.sciobj_store.get_abs_sciobj_file_path_by_pid(pid)
+        d1_common.utils.filesystem.create_missing_directories_for_file(sciobj_path)
+        os.replace(tmp_file.name, sciobj_path)
+
+    def remove_if_exists(self, path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def write_sciobj_batch(self, item_list):
+        """Create a batch of SciObj in the DB in a single transaction."""
+        with django.db.transaction.atomic():
+            for pid, sysmeta_pyxb, sciobj_url, resource_map in item_list:
+                d1_gmn.app.sysmeta.create_or_update(sysmeta_pyxb, sciobj_url)
+                if resource_map is not None:
+                    d1_gmn.app.resource_map.create_or_update(pid, resource_map)
+        self.checkpoint.add("sciobj", [item[0] for item in item_list])
+        for pid, sysmeta_pyxb, sciobj_url, resource_map in item_list:
+            if resource_map is not None:
+                self.sciobj_tracker.event(
+                    "Processed Resource Map", 'pid="{}"'.format(pid)
+                )
+            self.sciobj_tracker.event("Imported SciObj", 'pid="{}"'.format(pid))
 
     def get_list_objects_arg_dict(self):
         """Create a dict of arguments that will be passed to listObjects().
@@ -302,32 +466,47 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
         self.log.info("Number of events to import: {}".format(total_count))
         self.event_tracker = self.tracker.tracker("Importing Event Logs", total_count)
         async for log_entry_pyxb in self.async_event_log_iter:
-            await self.add_task(self.event_import_entry(log_entry_pyxb))
+            await self.event_import_entry(log_entry_pyxb)
 
     async def event_import_entry(self, log_entry_pyxb):
-        self.event_tracker.step()
-        pid = d1_common.xml.get_req_val(log_entry_pyxb.identifier)
-        if not d1_gmn.app.did.is_existing_object(pid):
-            self.event_tracker.event(
-                "Skipped Event Log: Local object does not exist", 'pid="{}"'.format(pid)
-            )
-            return
+        """Queue an event for creation in the DB.
 
-        with django.db.transaction.atomic():
+        Events for objects that do not exist locally are dropped by the DB writer.
 
-            event_log_model = d1_gmn.app.event_log.create_log_entry(
-                d1_gmn.app.model_util.get_sci_model(pid),
-                log_entry_pyxb.event,
-                log_entry_pyxb.ipAddress,
-                log_entry_pyxb.userAgent,
-                log_entry_pyxb.subject.value(),
-            )
-            event_log_model.timestamp = d1_common.date_time.normalize_datetime_to_utc(
-                log_entry_pyxb.dateLogged
+        """
+        self.event_tracker.step()
+        entry_id = d1_common.xml.get_req_val(log_entry_pyxb.entryId)
+        if self.checkpoint.contains("event", entry_id):
+            return
+        await self.put_db_item(
+            (
+                entry_id,
+                {
+                    "pid": d1_common.xml.get_req_val(log_entry_pyxb.identifier),
+                    "event": log_entry_pyxb.event,
+                    "ip_address": log_entry_pyxb.ipAddress,
+                    "user_agent": log_entry_pyxb.userAgent,
+                    "subject": d1_common.xml.get_req_val(log_entry_pyxb.subject),
+                    "timestamp": d1_common.date_time.normalize_datetime_to_utc(
+                        log_entry_pyxb.dateLogged
+                    ).isoformat(),
+                },
             )
-            event_log_model.save()
+        )
 
-        self.event_tracker.event("Imported Event", 'pid="{}"'.format(pid))
+    def write_event_batch(self, item_list):
+        """Create a batch of events in the DB in a single transaction."""
+        created_count = d1_gmn.app.event_log_buffer.write_events(
+            [event_dict for _, event_dict in item_list]
+        )
+        self.checkpoint.add("event", [entry_id for entry_id, _ in item_list])
+        if created_count:
+            self.event_tracker.event("Imported Event", count_int=created_count)
+        if created_count < len(item_list):
+            self.event_tracker.event(
+                "Skipped Event Log: Local object does not exist",
+                count_int=len(item_list) - created_count,
+            )
 
     def get_log_records_arg_dict(self):
         """Create a dict of arguments that will be passed to getLogRecords().
@@ -345,3 +524,147 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
             arg_dict["nodeId"] = django.conf.settings.NODE_IDENTIFIER
         self.log.debug("getLogRecords args: {}".format(arg_dict))
         return arg_dict
+
+    # DB writer
+
+    def start_db_writer(self, write_batch_func):
+        """Start a thread that writes the items passed to put_db_item() to the DB by
+        calling ``write_batch_func`` with lists of up to --db-batch-size items."""
+        self.db_queue = queue.Queue(maxsize=self.opt_dict["db_batch_size"] * 2)
+        self.db_writer_thread = threading.Thread(
+            target=self.db_writer_loop, args=(write_batch_func,), daemon=True
+        )
+        self.db_writer_thread.start()
+
+    async def stop_db_writer(self):
+        """Write the queued items and stop the DB writer thread."""
+        await self.put_db_item(None)
+        await asyncio.get_event_loop().run_in_executor(None, self.db_writer_thread.join)
+
+    async def put_db_item(self, item):
+        # The queue is bounded, so downloads wait if the DB writer falls behind.
+        await asyncio.get_event_loop().run_in_executor(None, self.db_queue.put, item)
+
+    def db_writer_loop(self, write_batch_func):
+        try:
+            is_stopped = False
+            while not is_stopped:
+                item_list = []
+                item = self.db_queue.get()
+                while item is not None:
+                    item_list.append(item)
+                    if len(item_list) >= self.opt_dict["db_batch_size"]:
+                        break
+                    try:
+                        item = self.db_queue.get(timeout=DB_BATCH_MAX_WAIT_SEC)
+                    except queue.Empty:
+                        break
+                is_stopped = item is None
+                if item_list:
+                    self.write_db_batch(write_batch_func, item_list)
+        finally:
+            django.db.connection.close()
+
+    def write_db_batch(self, write_batch_func, item_list):
+        """Write a batch of items. If the batch fails, write the items one by one, so
+        that a single invalid item does not prevent the others from being imported."""
+        try:
+            write_batch_func(item_list)
+        except Exception:
+            if len(item_list) == 1:
+                self.log.exception(
+                    "Import failed with error. Continuing. item={}".format(item_list[0])
+                )
+                return
+            self.log.exception("Batch write failed. Retrying items one by one:")
+            for item in item_list:
+                self.write_db_batch(write_batch_func, [item])
+
+    # Executor
+
+    async def run_in_file_executor(self, func, *args):
+        return await asyncio.get_event_loop().run_in_executor(
+            self.file_executor, func, *args
+        )
+
+
+class ExecutorFile:
+    """File-like object that writes to a file in a thread of an executor.
+
+    ``write()`` returns an awaitable that completes when the bytes have been written.
+    """
+
+    def __init__(self, file, executor):
+        self._file = file
+        self._executor = executor
+
+    def write(self, b):
+        return asyncio.get_event_loop().run_in_executor(
+            self._executor, self._file.write, b
+        )
+
+
+class ImportCheckpoint:
+    """Record of the objects and events that have been imported.
+
+    Each line in the checkpoint file holds a JSON list with the kind of record,
+    ``sciobj`` or ``event``, and the PID or event entry ID. Records are added after the
+    DB transaction that created the objects or events has been committed.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._key_dict = {"sciobj": set(), "event": set()}
+        self._is_resumed = False
+        self._load()
+        self._file = open(self._path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def is_resumed(self):
+        return self._is_resumed
+
+    def count(self, kind_str):
+        return len(self._key_dict[kind_str])
+
+    def contains(self, kind_str, key_str):
+        return key_str in self._key_dict[kind_str]
+
+    def add(self, kind_str, key_list):
+        with self._lock:
+            for key_str in key_list:
+                self._file.write(json.dumps([kind_str, key_str]) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._key_dict[kind_str].update(key_list)
+
+    def clear(self, kind_str=None):
+        """Remove records of the given kind, or all records."""
+        with self._lock:
+            for k in [kind_str] if kind_str else list(self._key_dict):
+                self._key_dict[k].clear()
+            self._file.seek(0)
+            self._file.truncate()
+            for k, key_set in self._key_dict.items():
+                for key_str in key_set:
+                    self._file.write(json.dumps([k, key_str]) + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def remove(self):
+        os.unlink(self._path)
+
+    def _load(self):
+        try:
+            with open(self._path, encoding="utf-8") as f:
+                for line_str in f:
+                    try:
+                        kind_str, key_str = json.loads(line_str)
+                    except ValueError:
+                        # Incomplete last line from an interrupted write.
+                        continue
+                    self._key_dict[kind_str].add(key_str)
+                    self._is_resumed = True
+        except FileNotFoundError:
+            pass
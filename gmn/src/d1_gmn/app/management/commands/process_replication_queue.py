@@ -24,8 +24,29 @@ CNs call MNReplication.replicate() to request the creation of replicas. GMN queu
 requests and processes them asynchronously. This command iterates over the requests and
 attempts to create the replicas.
 
-"""
+Replicas are downloaded in parallel, by up to REPLICATION_CONCURRENCY threads, with no
+more than REPLICATION_CONCURRENCY_PER_NODE downloads from the same source Member Node
+at a time. Each thread reuses a single client, with its pool of HTTP connections, for
+each source node. The base URLs of the source nodes are resolved from a node list that
+is retrieved from the CN and cached in the ``node_base_url`` cache namespace.
+
+The object bytes are downloaded to a partial file in the upload directory before the
+database is updated, so the database transaction covers only the database writes and
+the move of the file into the object store. The checksum is calculated while the bytes
+are written and must match the System Metadata from the CN. If a download is
+interrupted, the partial file is kept, and the next run resumes the download with an
+HTTP Range request.
 
+"""
+import collections
+import concurrent.futures
+import hashlib
+import os
+import re
+import threading
+import time
+
+import d1_common.checksum
 import d1_common.types.exceptions
 import d1_common.utils.filesystem
 import d1_common.utils.ulog
@@ -36,8 +57,10 @@ import d1_client.mnclient
 
 import django.conf
 import django.core.management.base
+import django.db
 import django.db.transaction
 
+import d1_gmn.app.cache
 import d1_gmn.app.did
 import d1_gmn.app.event_log
 import d1_gmn.app.mgmt_base
@@ -46,32 +69,96 @@ import d1_gmn.app.sciobj_store
 import d1_gmn.app.sysmeta
 
 
+NODE_BASE_URL_CACHE_KEY = "base_url_dict"
+PARTIAL_FILE_EXT = ".partial"
+
+
 class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
     def __init__(self, *args, **kwargs):
         super().__init__(__doc__, __name__, *args, **kwargs)
+        # CN and MN clients for each thread
+        self.thread_local = threading.local()
 
     def add_components(self, parser):
         self.using_single_instance(parser)
-        self.using_
-        self.cn_client = self.create_cn_client()
 
     def handle_serial(self):
         self.process_replication_queue()
 
+    @property
+    def cn_client(self):
+        if not hasattr(self.thread_local, "cn_client"):
+            self.thread_local.cn_client = self.create_cn_client()
+        return self.thread_local.cn_client
+
     def process_replication_queue(self):
-        queue_queryset = d1_gmn.app.models.ReplicationQueue.objects.filter(
-            local_replica__info__status__status="queued"
-        ).order_by("local_replica__info__timestamp", "local_replica__pid__did")
-        if not len(queue_queryset):
+        queue_model_list = list(
+            d1_gmn.app.models.ReplicationQueue.objects.filter(
+                local_replica__info__status__status="queued"
+            )
+            .select_related("local_replica__pid", "local_replica__info__member_node")
+            .order_by("local_replica__info__timestamp", "local_replica__pid__did")
+        )
+        if not queue_model_list:
             self.log.debug("No replication requests to process")
             return
-        for queue_model in queue_queryset:
-            self.process_replication_request(queue_model)
+        if django.conf.settings.REPLICATION_CONCURRENCY <= 1:
+            for queue_model in queue_model_list:
+                self.process_replication_request(queue_model)
+        else:
+            self.process_replication_requests_concurrently(queue_model_list)
         self.remove_completed_requests_from_queue()
 
+    def process_replication_requests_concurrently(self, queue_model_list):
+        """Process the requests in a thread pool.
+
+        The requests for each source node are held in a separate queue. Up to
+        REPLICATION_CONCURRENCY_PER_NODE tasks process each queue, so the threads never
+        wait for each other, and a burst of requests for one node does not hold up the
+        requests for other nodes.
+
+        """
+        node_queue_dict = collections.OrderedDict()
+        for queue_model in queue_model_list:
+            node_queue_dict.setdefault(
+                queue_model.local_replica.info.member_node.urn, collections.deque()
+            ).append(queue_model)
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=django.conf.settings.REPLICATION_CONCURRENCY
+        ) as executor:
+            future_list = [
+                executor.submit(self.process_node_queue, node_queue)
+                for node_queue in node_queue_dict.values()
+                for _ in range(
+                    min(
+                        django.conf.settings.REPLICATION_CONCURRENCY_PER_NODE,
+                        len(node_queue),
+                    )
+                )
+            ]
+            for future in concurrent.futures.as_completed(future_list):
+                future.result()
+
+    def process_node_queue(self, node_queue):
+        try:
+            while True:
+                try:
+                    queue_model = node_queue.popleft()
+                except IndexError:
+                    return
+                self.process_replication_request(queue_model)
+        finally:
+            # Each thread has its own database connection.
+            django.db.connection.close()
+
     def process_replication_request(self, queue_model):
         self.log.info("-" * 100)
-        self.log.info("Processing PID: {}".format(queue_model.local_replica.pid.did))
+        self.log.info(
+            "Processing PID: {} source_node={}".format(
+                queue_model.local_replica.pid.did,
+                queue_model.local_replica.info.member_node.urn,
+            )
+        )
         try:
             self.replicate(queue_model)
         except Exception as e:
@@ -94,6 +181,7 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
                         django.conf.settings.REPLICATION_MAX_ATTEMPTS,
                     )
                 )
+                self.remove_partial_sciobj(queue_model)
                 self.update_request_status(
                     queue_model,
                     "failed",
@@ -103,12 +191,17 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
                 )
 
     def replicate(self, queue_model):
+        sysmeta_pyxb = self.get_system_metadata(queue_model)
+        self.set_origin(queue_model, sysmeta_pyxb)
+        partial_sciobj_path = self.download_sciobj(queue_model, sysmeta_pyxb)
         with django.db.transaction.atomic():
-            sysmeta_pyxb = self.get_system_metadata(queue_model)
-            self.set_origin(queue_model, sysmeta_pyxb)
-            sciobj_bytestream = self.get_sciobj_bytestream(queue_model)
-            self.create_replica(sysmeta_pyxb, sciobj_bytestream)
-            self.update_request_status(queue_model, "completed")
+            self.create_replica(sysmeta_pyxb, partial_sciobj_path)
+            self.update_local_request_status(queue_model, "completed")
+        # The replica has been created, so a failure to notify the CN is not retried.
+        try:
+            self.update_cn_request_status(queue_model, "completed")
+        except Exception:
+            self.log.exception("Unable to notify the CN that the replica was created:")
 
     def set_origin(self, queue_model, sysmeta_pyxb):
         if sysmeta_pyxb.originMemberNode is None:
@@ -165,42 +258,236 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
         self.log.debug("Calling CNRead.getSystemMetadata() pid={}".format(pid))
         return self.cn_client.getSystemMetadata(pid)
 
-    def get_sciobj_bytestream(self, queue_model):
-        source_node_base_url = self.resolve_source_node_id_to_base_url(
-            queue_model.local_replica.info.member_node.urn
+    def download_sciobj(self, queue_model, sysmeta_pyxb):
+        """Download the object bytes to a partial file in the upload directory.
+
+        A partial file left by an earlier run is resumed. The size and checksum of the
+        downloaded bytes are checked against the System Metadata.
+
+        Returns:
+            str: Path to the partial file, which holds the complete object.
+
+        """
+        pid = queue_model.local_replica.pid.did
+        partial_sciobj_path = self.get_partial_sciobj_path(pid)
+        resume_size = self.get_partial_sciobj_size(partial_sciobj_path)
+        if resume_size > sysmeta_pyxb.size:
+            resume_size = 0
+        start_time = time.time()
+        download_size = 0
+        checksum_calculator = d1_common.checksum.get_checksum_calculator_by_dataone_designator(
+            sysmeta_pyxb.checksum.algorithm
         )
-        mn_client = d1_client.mnclient.MemberNodeClient(
-            base_url=source_node_base_url,
-            cert_pem_path=django.conf.settings.CLIENT_CERT_PATH,
-            cert_key_path=django.conf.settings.CLIENT_CERT_PRIVATE_KEY_PATH,
-            try_count=1,
+        if resume_size < sysmeta_pyxb.size:
+            sciobj_bytestream, resume_size = self.get_sciobj_bytestream(
+                queue_model, resume_size
+            )
+            try:
+                self.update_checksum_from_file(
+                    partial_sciobj_path, resume_size, checksum_calculator
+                )
+                # The bytes are written as they arrive, so the bytes received before
+                # a dropped connection are kept for resuming.
+                with open(partial_sciobj_path, "ab" if resume_size else "wb") as f:
+                    for chunk in sciobj_bytestream.iter_content(
+                        chunk_size=django.conf.settings.NUM_CHUNK_BYTES
+                    ):
+                        f.write(chunk)
+                        checksum_calculator.update(chunk)
+                        download_size += len(chunk)
+            finally:
+                sciobj_bytestream.close()
+        else:
+            self.update_checksum_from_file(
+                partial_sciobj_path, resume_size, checksum_calculator
+            )
+        duration_sec = time.time() - start_time
+        self.log.info(
+            "Downloaded replica. pid={} size={} resumed_bytes={} downloaded_bytes={} "
+            "duration_sec={:.2f} bytes_per_sec={:.0f} failed_attempts={}".format(
+                pid,
+                sysmeta_pyxb.size,
+                resume_size,
+                download_size,
+                duration_sec,
+                download_size / duration_sec if duration_sec else 0,
+                queue_model.failed_attempts,
+            )
         )
-        return self.open_sciobj_bytestream_on_member_node(
-            mn_client, queue_model.local_replica.pid.did
+        self.assert_valid_download(
+            sysmeta_pyxb,
+            partial_sciobj_path,
+            resume_size + download_size,
+            checksum_calculator.hexdigest(),
         )
+        return partial_sciobj_path
 
-    def resolve_source_node_id_to_base_url(self, source_node):
-        node_list = self.get_node_list()
-        discovered_nodes = []
-        for node in node_list.node:
-            discovered_node_id = d1_common.xml.get_req_val(node.identifier)
-            discovered_nodes.append(discovered_node_id)
-            if discovered_node_id == source_node:
-                return node.baseURL
-        raise self.CommandError(
-            "Unable to resolve Source Node ID. "
-            'source_node="{}", discovered_nodes="{}"'.format(
-                source_node, ", ".join(discovered_nodes)
+    def assert_valid_download(
+        self, sysmeta_pyxb, partial_sciobj_path, sciobj_size, checksum_str
+    ):
+        """Raise if the downloaded bytes do not match the System Metadata.
+
+        A download that is shorter than expected is kept, to be resumed on the next
+        attempt. Other mismatches cannot be fixed by resuming, so the partial file is
+        removed.
+
+        """
+        if sciobj_size < sysmeta_pyxb.size:
+            raise d1_common.types.exceptions.ServiceFailure(
+                0,
+                "Download of replica ended before all bytes were received. "
+                "received={} expected={}".format(sciobj_size, sysmeta_pyxb.size),
+            )
+        if (
+            sciobj_size != sysmeta_pyxb.size
+            or checksum_str.lower() != sysmeta_pyxb.checksum.value().lower()
+        ):
+            os.unlink(partial_sciobj_path)
+            raise d1_common.types.exceptions.InvalidSystemMetadata(
+                0,
+                "Downloaded replica does not match the System Metadata. "
+                'size="{}" expected_size="{}" checksum="{}" expected_checksum="{}"'.format(
+                    sciobj_size,
+                    sysmeta_pyxb.size,
+                    checksum_str.lower(),
+                    sysmeta_pyxb.checksum.value().lower(),
+                ),
             )
+
+    def get_partial_sciobj_path(self, pid):
+        """Get the path to the file that holds the bytes of a replica while it is being
+        downloaded.
+
+        The path is the same across runs, so that an interrupted download can be
+        resumed.
+
+        """
+        return os.path.join(
+            d1_gmn.app.sciobj_store.get_abs_upload_dir_path(),
+            "replica_{}{}".format(
+                hashlib.sha1(pid.encode("utf-8")).hexdigest(), PARTIAL_FILE_EXT
+            ),
         )
 
+    def get_partial_sciobj_size(self, partial_sciobj_path):
+        try:
+            return os.path.getsize(partial_sciobj_path)
+        except FileNotFoundError:
+            return 0
+
+    def remove_partial_sciobj(self, queue_model):
+        try:
+            os.unlink(self.get_partial_sciobj_path(queue_model.local_replica.pid.did))
+        except FileNotFoundError:
+            pass
+
+    def update_checksum_from_file(self, path, size, checksum_calculator):
+        """Add the first ``size`` bytes of the file to the checksum."""
+        if not size:
+            return
+        with open(path, "rb") as f:
+            while size:
+                chunk = f.read(min(size, django.conf.settings.NUM_CHUNK_BYTES))
+                if not chunk:
+                    break
+                checksum_calculator.update(chunk)
+                size -= len(chunk)
+
+    def get_sciobj_bytestream(self, queue_model, resume_size=0):
+        """Open a stream of the object bytes on the source node.
+
+        If ``resume_size`` is not zero, only the bytes after the first ``resume_size``
+        bytes are requested. If the source node does not honor the Range request, the
+        stream holds the complete object.
+
+        Returns:
+            tuple: The stream and the number of bytes that were skipped.
+
+        """
+        source_node_base_url = self.resolve_source_node_id_to_base_url(
+            queue_model.local_replica.info.member_node.urn
+        )
+        mn_client = self.get_mn_client(source_node_base_url)
+        pid = queue_model.local_replica.pid.did
+        if resume_size:
+            response = mn_client.getReplicaResponse(
+                pid, {"Range": "bytes={}-".format(resume_size)}
+            )
+            if (
+                response.status_code == 206
+                and self.get_content_range_first_byte(response) == resume_size
+            ):
+                return response, resume_size
+            if response.status_code == 200:
+                self.log.info(
+                    "Source node returned the complete object. Restarting download"
+                )
+                return response, 0
+            response.close()
+        return self.open_sciobj_bytestream_on_member_node(mn_client, pid), 0
+
+    def get_content_range_first_byte(self, response):
+        m = re.match(r"bytes (\d+)-", response.headers.get("Content-Range", ""))
+        return int(m.group(1)) if m else None
+
+    def get_mn_client(self, base_url):
+        """Get the client for a source node.
+
+        Each thread has its own client for each node, so that HTTP connections are
+        reused for all the replicas that the thread downloads from the node. Responses
+        are streamed, so that replicas are not held in memory.
+
+        """
+        mn_client_dict = self.thread_local.__dict__.setdefault("mn_client_dict", {})
+        if base_url not in mn_client_dict:
+            mn_client_dict[base_url] = d1_client.mnclient.MemberNodeClient(
+                base_url=base_url,
+                cert_pem_path=django.conf.settings.CLIENT_CERT_PATH,
+                cert_key_path=django.conf.settings.CLIENT_CERT_PRIVATE_KEY_PATH,
+                try_count=1,
+                use_stream=True,
+            )
+        return mn_client_dict[base_url]
+
+    def resolve_source_node_id_to_base_url(self, source_node):
+        """Resolve a Node ID to a base URL.
+
+        If the Node ID is not in the cached node list, the list is retrieved from the
+        CN again, in case the node has been added since the list was cached.
+
+        """
+        base_url_dict = self.get_node_base_url_dict()
+        if source_node not in base_url_dict:
+            base_url_dict = self.get_node_base_url_dict(refresh=True)
+        try:
+            return base_url_dict[source_node]
+        except KeyError:
+            raise self.CommandError(
+                "Unable to resolve Source Node ID. "
+                'source_node="{}", discovered_nodes="{}"'.format(
+                    source_node, ", ".join(sorted(base_url_dict))
+                )
+            )
+
+    def get_node_base_url_dict(self, refresh=False):
+        """Get a dict of Node ID to base URL for the nodes registered with the CN."""
+        node_cache = d1_gmn.app.cache.get_cache("node_base_url")
+        base_url_dict = None if refresh else node_cache.get(NODE_BASE_URL_CACHE_KEY)
+        if base_url_dict is None:
+            base_url_dict = {
+                d1_common.xml.get_req_val(node.identifier): node.baseURL
+                for node in self.get_node_list().node
+            }
+            node_cache.set(NODE_BASE_URL_CACHE_KEY, base_url_dict)
+        return base_url_dict
+
     def get_node_list(self):
         return self.cn_client.listNodes()
 
     def open_sciobj_bytestream_on_member_node(self, mn_client, pid):
         return mn_client.getReplica(pid)
 
-    def create_replica(self, sysmeta_pyxb, sciobj_bytestream):
+    def create_replica(self, sysmeta_pyxb, partial_sciobj_path):
         """GMN handles replicas differently from native objects, with the main
         differences being related to handling of restrictions related to revision chains
         and SIDs.
@@ -208,6 +495,9 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
         As a consequence, this procedure sequence differs significantly from the regular
         procedure accessed through MNStorage.create().
 
+        The object bytes have been downloaded to ``partial_sciobj_path``, and are moved
+        into the object store after the database has been updated.
+
         """
         pid = d1_common.xml.get_req_val(sysmeta_pyxb.identifier)
         self.assert_is_pid_of_local_unprocessed_replica(pid)
@@ -215,10 +505,10 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
         self.check_and_create_replica_revision(sysmeta_pyxb, "obsoletedBy")
         sciobj_url = d1_gmn.app.sciobj_store.get_rel_sciobj_file_url_by_pid(pid)
         sciobj_model = d1_gmn.app.sysmeta.create_or_update(sysmeta_pyxb, sciobj_url)
-        self.store_science_object_bytes(pid, sciobj_bytestream)
         d1_gmn.app.event_log.create_log_entry(
             sciobj_model, "create", "0.0.0.0", "[replica]", "[replica]"
         )
+        self.store_science_object_bytes(pid, partial_sciobj_path)
 
     def check_and_create_replica_revision(self, sysmeta_pyxb, attr_str):
         revision_attr = getattr(sysmeta_pyxb, attr_str)
@@ -230,14 +520,10 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
     def create_replica_revision_reference(self, pid):
         d1_gmn.app.models.replica_revision_chain_reference(pid)
 
-    def store_science_object_bytes(self, pid, sciobj_bytestream):
+    def store_science_object_bytes(self, pid, partial_sciobj_path):
         sciobj_path = d1_gmn.app.sciobj_store.get_abs_sciobj_file_path_by_pid(pid)
         d1_common.utils.filesystem.create_missing_directories_for_file(sciobj_path)
-        with open(sciobj_path, "wb") as f:
-            for chunk in sciobj_bytestream.iter_content(
-                chunk_size=django.conf.settings.NUM_CHUNK_BYTES
-            ):
-                f.write(chunk)
+        os.replace(partial_sciobj_path, sciobj_path)
 
     def assert_is_pid_of_local_unprocessed_replica(self, pid):
         if not d1_gmn.app.did.is_unprocessed_local_replica(pid):
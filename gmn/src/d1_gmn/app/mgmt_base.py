@@ -572,7 +572,7 @@ class GMNCommandBase(django.core.management.base.BaseCommand):
     async def add_task(self, task_func):
         if len(self.task_set) >= self.opt_dict["max_concurrent"]:
             await self.await_task()
-        self.task_set.add(task_func)
+        self.task_set.add(asyncio.ensure_future(task_func))
 
     async def await_task(self):
         task_set = self.task_set.copy()
@@ -746,6 +746,23 @@ class GMNCommandBase(django.core.management.base.BaseCommand):
         """
         return self.query_sciobj_with_pid_filter().count()
 
+    async def run_in_db_thread(self, func, *args):
+        """Call ``func(*args)`` in a thread of the default executor and return the
+        result.
+
+        Django does not allow DB queries from the thread that runs the event loop, so
+        async commands use this for all DB access. The DB connection that is opened by
+        the thread is closed before returning.
+        """
+
+        def run():
+            try:
+                return func(*args)
+            finally:
+                django.db.connection.close()
+
+        return await asyncio.get_event_loop().run_in_executor(None, run)
+
     # Testing
 
     def create_test_subj(self):
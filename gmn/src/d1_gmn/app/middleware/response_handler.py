@@ -31,7 +31,6 @@ import d1_common.xml
 
 import django.conf
 import django.db
-import django.db.models
 import django.http
 import django.http.response
 import django.urls
@@ -39,6 +38,7 @@ import django.urls.base
 
 import d1_gmn.app.views.slice
 import d1_gmn.app.views.util
+import d1_gmn.app.xml_stream
 
 
 class ResponseHandler:
@@ -98,28 +98,29 @@ class ResponseHandler:
         return response
 
     def _serialize_object(self, request, view_result):
+        if view_result["type"] in ("object_list", "log"):
+            return self._stream_object(request, view_result)
         response = django.http.HttpResponse()
         name_to_func_map = {
-            "object_list": (self._generate_object_list, ["modified_timestamp", "id"]),
             "object_list_json": (
                 self._generate_object_field_json,
                 ["modified_timestamp", "id"],
-            ),
-            "log": (self._generate_log_records, ["timestamp", "id"]),
+            )
         }
         d1_type_generator, sort_field_list = name_to_func_map[view_result["type"]]
         d1_type_pyxb = d1_type_generator(
             request, view_result["query"], view_result["start"], view_result["total"]
         )
-        d1_type_latest_date = self._latest_date(
-            view_result["query"], sort_field_list[0]
+        count_int, last_ts_tup = d1_gmn.app.views.slice.get_count_and_last_in_slice(
+            view_result["query"], sort_field_list
         )
         d1_gmn.app.views.slice.cache_add_last_in_slice(
-            request,
-            view_result["query"],
-            view_result["start"],
-            view_result["total"],
-            sort_field_list,
+            request, view_result["start"], count_int, view_result["total"], last_ts_tup
+        )
+        # The slice is sorted by the timestamp, so the last item has the latest date.
+        d1_type_latest_date = last_ts_tup[0] if last_ts_tup else None
+        d1_gmn.app.views.slice.add_resume_token_header(
+            response, request, view_result["start"] + d1_type_pyxb.count, last_ts_tup
         )
         response.write(
             d1_common.xml.serialize_for_transport(
@@ -131,26 +132,46 @@ class ResponseHandler:
         self._set_headers(response, d1_type_latest_date, response.tell())
         return response
 
-    def _generate_object_list(self, request, db_query, start, total):
-        objectList = d1_gmn.app.views.util.dataoneTypes(request).objectList()
-        for row in db_query:
-            objectInfo = d1_gmn.app.views.util.dataoneTypes(request).ObjectInfo()
-            objectInfo.identifier = row.pid.did
-            objectInfo.formatId = row.format.format
-            checksum = d1_gmn.app.views.util.dataoneTypes(request).Checksum(
-                row.checksum
-            )
-            checksum.algorithm = row.checksum_algorithm.checksum_algorithm
-            objectInfo.checksum = checksum
-            objectInfo.dateSysMetadataModified = d1_common.date_time.normalize_datetime_to_utc(
-                row.modified_timestamp
-            )
-            objectInfo.size = row.size
-            objectList.objectInfo.append(objectInfo)
-        objectList.start = start
-        objectList.count = len(objectList.objectInfo)
-        objectList.total = total
-        return objectList
+    def _stream_object(self, request, view_result):
+        """Serialize ObjectList and Log directly from the database rows, without
+        going through PyXB.
+
+        The number of rows and the sort key of the last row are read first, as they
+        are needed for the root element and the headers. The rows are then serialized
+        while the response is being sent, so the length of the response is not known
+        in advance and no Content-Length header is set.
+
+        """
+        name_to_func_map = {
+            "object_list": (
+                d1_gmn.app.xml_stream.object_list,
+                ["modified_timestamp", "id"],
+            ),
+            "log": (d1_gmn.app.xml_stream.log, ["timestamp", "id"]),
+        }
+        xml_stream_func, sort_field_list = name_to_func_map[view_result["type"]]
+        count_int, last_ts_tup = d1_gmn.app.views.slice.get_count_and_last_in_slice(
+            view_result["query"], sort_field_list
+        )
+        d1_gmn.app.views.slice.cache_add_last_in_slice(
+            request, view_result["start"], count_int, view_result["total"], last_ts_tup
+        )
+        xml_stream = xml_stream_func(
+            request,
+            view_result["query"],
+            view_result["start"],
+            count_int,
+            view_result["total"],
+            xslt_url=django.urls.base.reverse("home_xslt"),
+        )
+        # The slice is sorted by the timestamp, so the last item has the latest date.
+        d1_type_latest_date = last_ts_tup[0] if last_ts_tup else None
+        response = django.http.StreamingHttpResponse(xml_stream)
+        d1_gmn.app.views.slice.add_resume_token_header(
+            response, request, view_result["start"] + count_int, last_ts_tup
+        )
+        self._set_headers(response, d1_type_latest_date)
+        return response
 
     def _generate_object_field_json(self, request, db_query, start, total):
         objectList = d1_gmn.app.views.util.dataoneTypes(request).objectList()
@@ -173,52 +194,16 @@ class ResponseHandler:
         objectList.total = total
         return objectList
 
-    def _generate_log_records(self, request, db_query, start, total):
-        log = d1_gmn.app.views.util.dataoneTypes(request).log()
-        for row in db_query:
-            logEntry = d1_gmn.app.views.util.dataoneTypes(request).LogEntry()
-            logEntry.entryId = str(row.id)
-            logEntry.identifier = row.sciobj.pid.did
-            # Redact ipAddress and subject on records for which client has only "read"
-            # access.
-            if getattr(row, "redact", False):
-                logEntry.ipAddress = "<NotAuthorized>"
-                logEntry.subject = "<NotAuthorized>"
-            else:
-                logEntry.ipAddress = row.ip_address.ip_address
-                logEntry.subject = row.subject.subject
-            logEntry.userAgent = row.user_agent.user_agent
-            logEntry.event = row.event.event
-            logEntry.dateLogged = d1_common.date_time.normalize_datetime_to_utc(
-                row.timestamp
-            )
-            logEntry.nodeIdentifier = django.conf.settings.NODE_IDENTIFIER
-            log.logEntry.append(logEntry)
-        log.start = start
-        log.count = len(log.logEntry)
-        log.total = total
-        return log
-
     def _http_response_with_identifier_type(self, request, pid):
         pid_pyxb = d1_gmn.app.views.util.dataoneTypes(request).identifier(pid)
         pid_xml = pid_pyxb.toxml("utf-8")
         return django.http.HttpResponse(pid_xml, d1_common.const.CONTENT_TYPE_XML)
 
-    def _set_headers(self, response, content_modified_timestamp, content_length):
+    def _set_headers(self, response, content_modified_timestamp, content_length=None):
         if content_modified_timestamp is not None:
             response["Last-Modified"] = d1_common.date_time.normalize_datetime_to_utc(
                 content_modified_timestamp
             )
-        response["Content-Length"] = str(content_length)
+        if content_length is not None:
+            response["Content-Length"] = str(content_length)
         response["Content-Type"] = d1_common.const.CONTENT_TYPE_XML
-
-    def _latest_date(self, query, datetime_field_name):
-        """Given a QuerySet and the name of field containing datetimes, return the
-        latest (most recent) date.
-
-        Return None if QuerySet is empty.
-
-        """
-        return list(
-            query.aggregate(django.db.models.Max(datetime_field_name)).values()
-        )[0]
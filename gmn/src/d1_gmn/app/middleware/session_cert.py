@@ -28,12 +28,36 @@ equivalent identities and group memberships (no SubjectInfo). This limits the
 user's access to data that is publicly available and that is available directly
 to that user (as designated in the Subject DN).
 
+Extracting the subjects requires deserializing the certificate and parsing and
+expanding the SubjectInfo XML. As clients such as CN harvesters typically issue many
+requests with the same certificate, the subjects are cached in the session_cert
+namespace of the cache, keyed by the SHA-256 fingerprint of the certificate. A cached
+entry expires after SESSION_CERT_CACHE_MAX_AGE seconds or when the certificate
+expires, whichever comes first. The cache is shared between worker processes if
+CACHES is set up with a shared backend. See d1_gmn.app.cache.
+
 """
+import base64
+import hashlib
+import logging
+import re
 
 import d1_common.cert.subjects
+import d1_common.cert.x509
 import d1_common.const
+import d1_common.date_time
 import d1_common.types.exceptions
 
+import django.conf
+
+import d1_gmn.app.cache
+
+PEM_BODY_RX = re.compile(
+    rb"-----BEGIN CERTIFICATE-----(.*?)-----END CERTIFICATE-----", re.DOTALL
+)
+
+log = logging.getLogger(__name__)
+
 
 def get_subjects(request):
     """Get all subjects in the certificate.
@@ -46,7 +70,7 @@ def get_subjects(request):
     """
     if _is_certificate_provided(request):
         try:
-            return get_authenticated_subjects(request.META["SSL_CLIENT_CERT"])
+            return get_authenticated_subjects_cached(request.META["SSL_CLIENT_CERT"])
         except Exception as e:
             raise d1_common.types.exceptions.InvalidToken(
                 0,
@@ -67,5 +91,66 @@ def get_authenticated_subjects(cert_pem):
     return d1_common.cert.subjects.extract_subjects(cert_pem)
 
 
+def get_authenticated_subjects_cached(cert_pem):
+    """Return primary subject and set of equivalents authenticated by certificate,
+    using the session cert cache if enabled.
+
+    - ``cert_pem`` can be str or bytes
+
+    """
+    if isinstance(cert_pem, str):
+        cert_pem = cert_pem.encode("utf-8")
+    if not django.conf.settings.SESSION_CERT_CACHE_ENABLED:
+        return get_authenticated_subjects(cert_pem)
+    fingerprint_str = get_cert_fingerprint(cert_pem)
+    if fingerprint_str is None:
+        return get_authenticated_subjects(cert_pem)
+    subject_tup = d1_gmn.app.cache.get_cache("session_cert").get(fingerprint_str)
+    if subject_tup is not None:
+        primary_str, equivalent_set = subject_tup
+        return primary_str, set(equivalent_set)
+    cert_obj = d1_common.cert.x509.deserialize_pem(cert_pem)
+    primary_str, equivalent_set = d1_common.cert.subjects.extract_subjects_from_cert_obj(
+        cert_obj
+    )
+    timeout_sec = min(
+        django.conf.settings.SESSION_CERT_CACHE_MAX_AGE,
+        int(
+            (
+                d1_common.date_time.normalize_datetime_to_utc(cert_obj.not_valid_after)
+                - d1_common.date_time.utc_now()
+            ).total_seconds()
+        ),
+    )
+    if timeout_sec > 0:
+        d1_gmn.app.cache.get_cache("session_cert").set(
+            fingerprint_str, (primary_str, frozenset(equivalent_set)), timeout_sec
+        )
+        log.debug(
+            'Cached session cert subjects. fingerprint="{}" timeout_sec={}'.format(
+                fingerprint_str, timeout_sec
+            )
+        )
+    return primary_str, equivalent_set
+
+
+def get_cert_fingerprint(cert_pem):
+    """Get the SHA-256 fingerprint of a PEM encoded certificate.
+
+    The fingerprint is calculated over the DER encoded certificate, which is decoded
+    from the PEM without deserializing the certificate. Return None if ``cert_pem`` is
+    not a valid PEM.
+
+    """
+    m = PEM_BODY_RX.search(cert_pem)
+    if not m:
+        return None
+    try:
+        cert_der = base64.b64decode(b"".join(m.group(1).split()), validate=True)
+    except ValueError:
+        return None
+    return hashlib.sha256(cert_der).hexdigest()
+
+
 def _is_certificate_provided(request):
     return "SSL_CLIENT_CERT" in request.META and request.META["SSL_CLIENT_CERT"] != ""
@@ -15,21 +15,53 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-"""Validate Java Web Token (JWT) and extract subject."""
+"""Validate Java Web Token (JWT) and extract subject.
 
+JWTs are validated by checking that they were signed with the certificate of the root
+CN of the DataONE environment.
+
+- The CN certificate is held in memory in each GMN process. It is downloaded on first
+  use or, if not in stand-alone mode, when GMN starts. A background thread then
+  downloads it again every JWT_CN_CERT_REFRESH_INTERVAL seconds, so that a rotated
+  CN certificate is picked up without restarting GMN.
+
+- Successful validations are cached in the session_jwt namespace of the cache, keyed
+  by a hash of the token. A cached validation expires after JWT_CACHE_MAX_AGE seconds
+  or when the JWT expires, whichever comes first, so repeated requests with the same
+  token do not require the signature to be verified again.
+
+- Hit and miss counters for the validation cache are returned by
+  ``get_cache_stats()``.
+
+"""
+
+import hashlib
 import http.client
 import logging
 import socket
 import ssl
+import threading
+import time
 
 import d1_common.cert.jwt
 import d1_common.cert.x509
 
 import django.conf
-import django.core.cache
+
+import d1_gmn.app.cache
+
+# Delay before retrying a failed CN certificate download in the background thread.
+CN_CERT_RETRY_INTERVAL = 5 * 60
 
 log = logging.getLogger(__name__)
 
+_cn_cert_lock = threading.RLock()
+_cn_cert_obj = None
+_refresh_thread = None
+
+_stats_lock = threading.Lock()
+_stats_dict = {"hit": 0, "miss": 0, "invalid": 0}
+
 
 def validate_jwt_and_get_subject_list(request):
     if not _has_jwt_header(request):
@@ -40,9 +72,80 @@ def validate_jwt_and_get_subject_list(request):
             "ignoring included JWT."
         )
         return []
-    return [
-        d1_common.cert.jwt.get_subject_with_local_validation(_get_jwt_header(request))
-    ]
+    subject_str = get_subject_with_cached_validation(_get_jwt_header(request))
+    return [] if subject_str is None else [subject_str]
+
+
+def get_subject_with_cached_validation(jwt_bu64):
+    """Validate the JWT and return the subject it contains.
+
+    Returns None if the JWT is not valid.
+
+    """
+    if isinstance(jwt_bu64, str):
+        jwt_bu64 = jwt_bu64.encode("utf-8")
+    jwt_bu64 = jwt_bu64.strip()
+    cache_key = None
+    if django.conf.settings.JWT_CACHE_ENABLED:
+        cache_key = hashlib.sha256(jwt_bu64).hexdigest()
+        subject_str = d1_gmn.app.cache.get_cache("session_jwt").get(cache_key)
+        if subject_str is not None:
+            _inc_stat("hit")
+            return subject_str
+    _inc_stat("miss")
+    cert_obj = _get_cn_cert()
+    if cert_obj is None:
+        return None
+    try:
+        jwt_dict = d1_common.cert.jwt.validate_and_decode(jwt_bu64, cert_obj)
+    except d1_common.cert.jwt.JwtException as e:
+        _inc_stat("invalid")
+        log.error('JWT validation failed. error="{}"'.format(str(e)))
+        return None
+    subject_str = jwt_dict.get("sub")
+    if subject_str is None:
+        _inc_stat("invalid")
+        d1_common.cert.jwt.log_jwt_dict_info(log.error, 'Missing "sub" key', jwt_dict)
+        return None
+    if cache_key is not None:
+        timeout_sec = django.conf.settings.JWT_CACHE_MAX_AGE
+        if "exp" in jwt_dict:
+            timeout_sec = min(timeout_sec, int(jwt_dict["exp"] - time.time()))
+        if timeout_sec > 0:
+            d1_gmn.app.cache.get_cache("session_jwt").set(
+                cache_key, subject_str, timeout_sec
+            )
+    return subject_str
+
+
+def get_cache_stats():
+    """Get the JWT validation cache counters for this process.
+
+    Returns:
+        dict: ``hit`` and ``miss`` are the number of validations that were and were
+        not found in the cache. ``invalid`` is the number of misses for which
+        validation failed.
+
+    """
+    with _stats_lock:
+        return dict(_stats_dict)
+
+
+def start_cn_cert_refresh():
+    """Download the CN certificate in the background and start refreshing it
+    periodically.
+
+    Does nothing if the refresh has already been started in this process.
+
+    """
+    global _refresh_thread
+    with _cn_cert_lock:
+        if _refresh_thread is not None:
+            return
+        _refresh_thread = threading.Thread(
+            target=_refresh_loop, name="JwtCnCertRefresh", daemon=True
+        )
+        _refresh_thread.start()
 
 
 def _has_jwt_header(request):
@@ -53,26 +156,44 @@ def _get_jwt_header(request):
     return request.META["Authorization"]
 
 
+def _inc_stat(stat_name):
+    with _stats_lock:
+        _stats_dict[stat_name] += 1
+
+
 def _get_cn_cert():
     """Get the public TLS/SSL X.509 certificate from the root CN of the DataONE
     environment. The certificate is used for validating the signature of the JWTs.
 
-    If certificate retrieval fails, a new attempt to retrieve the certificate
-    is performed after the cache expires (settings.CACHES.default.TIMEOUT).
+    If the certificate has not yet been retrieved in this process, it is downloaded
+    here and the background refresh is started. If retrieval fails, a new attempt is
+    made on the next call.
 
     If successful, returns a cryptography.Certificate().
 
     """
-    try:
-        cert_obj = django.core.cache.cache.cn_cert_obj
-        d1_common.cert.x509.log_cert_info(
-            log.debug, "Using cached CN cert for JWT validation", cert_obj
-        )
-        return cert_obj
-    except AttributeError:
-        cn_cert_obj = _download_and_decode_cn_cert()
-        django.core.cache.cache.cn_cert_obj = cn_cert_obj
-        return cn_cert_obj
+    global _cn_cert_obj
+    if _cn_cert_obj is None:
+        with _cn_cert_lock:
+            if _cn_cert_obj is None:
+                _cn_cert_obj = _download_and_decode_cn_cert()
+                if _cn_cert_obj is None:
+                    return None
+                start_cn_cert_refresh()
+    return _cn_cert_obj
+
+
+def _refresh_loop():
+    global _cn_cert_obj
+    if _cn_cert_obj is not None:
+        time.sleep(django.conf.settings.JWT_CN_CERT_REFRESH_INTERVAL)
+    while True:
+        cert_obj = _download_and_decode_cn_cert()
+        if cert_obj is None:
+            time.sleep(CN_CERT_RETRY_INTERVAL)
+        else:
+            _cn_cert_obj = cert_obj
+            time.sleep(django.conf.settings.JWT_CN_CERT_REFRESH_INTERVAL)
 
 
 def _download_and_decode_cn_cert():
@@ -26,6 +26,7 @@ import d1_common.const
 import django.conf
 import django.http
 
+import d1_gmn.app.auth
 import d1_gmn.app.middleware.session_cert
 import d1_gmn.app.middleware.session_jwt
 import d1_gmn.app.views
@@ -74,6 +75,9 @@ class ViewHandler:
         request.primary_subject_str, request.all_subjects_set = self.get_session_subject_set(
             request
         )
+        # Trust, whitelist membership and permissions for the session subjects are
+        # resolved on first use and cached for the remainder of the request.
+        request.auth_context = d1_gmn.app.auth.AuthContext(request.all_subjects_set)
         # Returning None causes Django to continue processing by calling any
         # process_view() in other middleware classes then the view.
 
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.1 on 2026-10-18 03:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('app', '0019_auto_20190418_1512')]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueryCount',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('query_type', models.CharField(db_index=True, max_length=32)),
+                ('filter_json', models.TextField()),
+                ('count', models.BigIntegerField()),
+                ('timestamp', models.DateTimeField(db_index=True)),
+            ],
+        )
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.1 on 2026-10-18 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('app', '0020_querycount')]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='permission',
+            index=models.Index(
+                fields=['subject', 'sciobj'], name='app_permiss_subject_21b025_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='permission',
+            index=models.Index(
+                fields=['sciobj', 'subject', 'level'],
+                name='app_permiss_sciobj__d33899_idx',
+            ),
+        ),
+    ]
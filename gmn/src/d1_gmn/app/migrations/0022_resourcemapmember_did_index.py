@@ -0,0 +1,17 @@
+# Generated by Django 4.2.1 on 2026-10-18 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('app', '0021_permission_access_index')]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resourcemapmember',
+            index=models.Index(
+                fields=['did', 'resource_map'], name='app_resourc_did_id_7c20c8_idx'
+            ),
+        )
+    ]
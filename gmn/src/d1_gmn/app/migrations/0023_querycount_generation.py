@@ -0,0 +1,36 @@
+# Generated by Django 4.2.1 on 2026-10-18 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('app', '0022_resourcemapmember_did_index')]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueryCountGeneration',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('generation', models.BigIntegerField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='querycount',
+            name='generation',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='querycount',
+            name='max_event_id',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
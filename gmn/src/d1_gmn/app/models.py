@@ -45,6 +45,17 @@ class IdNamespace(django.db.models.Model):
     did = django.db.models.CharField(max_length=800, unique=True)
 
 
+def did_dict(did_iter):
+    """Get or create IdNamespace entries for a number of DIDs, with one query for
+    existing DIDs and one INSERT for new DIDs.
+
+    Returns:
+        dict: DID to IdNamespace.
+
+    """
+    return _get_or_create_dict(IdNamespace, "did", did_iter)
+
+
 # ------------------------------------------------------------------------------
 # DataONE Node
 # ------------------------------------------------------------------------------
@@ -58,6 +69,17 @@ def node(node_urn):
     return Node.objects.get_or_create(urn=node_urn)[0]
 
 
+def node_dict(node_urn_iter):
+    """Get or create Nodes for a number of URNs, with one query for existing Nodes and
+    one INSERT for new Nodes.
+
+    Returns:
+        dict: URN to Node.
+
+    """
+    return _get_or_create_dict(Node, "urn", node_urn_iter)
+
+
 # ------------------------------------------------------------------------------
 # DataONE Subject
 # ------------------------------------------------------------------------------
@@ -71,6 +93,17 @@ def subject(subject_str):
     return Subject.objects.get_or_create(subject=subject_str)[0]
 
 
+def subject_dict(subject_str_iter):
+    """Get or create Subjects for a number of subject strings, with one query for
+    existing Subjects and one INSERT for new Subjects.
+
+    Returns:
+        dict: Subject string to Subject.
+
+    """
+    return _get_or_create_dict(Subject, "subject", subject_str_iter)
+
+
 # ------------------------------------------------------------------------------
 # Checksum
 # ------------------------------------------------------------------------------
@@ -355,6 +388,11 @@ class Event(django.db.models.Model):
 
 
 def event(event_str):
+    assert_valid_event(event_str)
+    return Event.objects.get_or_create(event=event_str)[0]
+
+
+def assert_valid_event(event_str):
     # In v2.0, events are no longer restricted to this set. However, GMN still only
     # records these types of events, so we'll leave it in while that remains the case.
     assert event_str in [
@@ -366,7 +404,6 @@ def event(event_str):
         "synchronization_failed",
         "replication_failed",
     ], 'Invalid event type. event="{}"'.format(event_str)
-    return Event.objects.get_or_create(event=event_str)[0]
 
 
 class IpAddress(django.db.models.Model):
@@ -404,6 +441,41 @@ class EventLog(django.db.models.Model):
 
 # EventLog.objects.filter(times)
 
+# ------------------------------------------------------------------------------
+# Cached query counts
+# ------------------------------------------------------------------------------
+
+
+class QueryCount(django.db.models.Model):
+    """Cached total number of items matched by a listObjects() or getLogRecords()
+    filter.
+
+    Maintained by the query_count module.
+
+    """
+
+    key = django.db.models.CharField(max_length=64, unique=True)
+    query_type = django.db.models.CharField(max_length=32, db_index=True)
+    filter_json = django.db.models.TextField()
+    count = django.db.models.BigIntegerField()
+    # Time of the last direct count in the database
+    timestamp = django.db.models.DateTimeField(db_index=True)
+    # QueryCountGeneration.generation at the time of the count
+    generation = django.db.models.BigIntegerField(default=0)
+    # Highest EventLog id included in the count. Only used for Log counts.
+    max_event_id = django.db.models.BigIntegerField(default=0)
+
+
+class QueryCountGeneration(django.db.models.Model):
+    """Counter that is incremented when ScienceObjects are created, updated or deleted.
+
+    Cached counts from earlier generations are not used. Holds a single row.
+
+    """
+
+    generation = django.db.models.BigIntegerField()
+
+
 # ------------------------------------------------------------------------------
 # System Metadata refresh queue
 # ------------------------------------------------------------------------------
@@ -457,6 +529,15 @@ class Permission(django.db.models.Model):
     subject = django.db.models.ForeignKey(Subject, django.db.models.CASCADE)
     level = django.db.models.PositiveSmallIntegerField()
 
+    class Meta:
+        # Covering indexes for access control filters in db_filter.
+        # - (subject, sciobj): Objects readable by a set of subjects.
+        # - (sciobj, subject, level): Access level of a set of subjects for an object.
+        indexes = [
+            django.db.models.Index(fields=["subject", "sciobj"]),
+            django.db.models.Index(fields=["sciobj", "subject", "level"]),
+        ]
+
 
 class WhitelistForCreateUpdateDelete(django.db.models.Model):
     subject = django.db.models.OneToOneField(Subject, django.db.models.CASCADE)
@@ -515,3 +596,39 @@ class ResourceMapMember(django.db.models.Model):
     did = django.db.models.ForeignKey(
         IdNamespace, django.db.models.CASCADE, related_name="%(class)s_did"
     )
+
+    class Meta:
+        # Covering index for finding the Resource Maps that aggregate a DID.
+        indexes = [django.db.models.Index(fields=["did", "resource_map"])]
+
+
+# ------------------------------------------------------------------------------
+# Util
+# ------------------------------------------------------------------------------
+
+
+def _get_or_create_dict(model, field_name, value_iter):
+    """Get or create model instances for a number of values of a unique field.
+
+    New instances are created with a single INSERT. Instances created concurrently by
+    another process are ignored by the INSERT and picked up by the query that
+    follows it.
+
+    """
+    value_set = set(value_iter)
+    model_dict = {
+        getattr(m, field_name): m
+        for m in model.objects.filter(**{field_name + "__in": value_set})
+    }
+    missing_set = value_set - set(model_dict)
+    if missing_set:
+        model.objects.bulk_create(
+            [model(**{field_name: v}) for v in missing_set], ignore_conflicts=True
+        )
+        model_dict.update(
+            {
+                getattr(m, field_name): m
+                for m in model.objects.filter(**{field_name + "__in": missing_set})
+            }
+        )
+    return model_dict
@@ -15,15 +15,42 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-"""Generate Node document based on the current settings for GMN."""
-
+"""Generate Node document based on the current settings for GMN.
+
+The v1 and v2 Node documents returned by MNCore.getCapabilities() are rendered once
+and then served from memory. The documents include the URL of the XSLT stylesheet,
+which depends on the script prefix under which GMN is deployed, so they are rendered
+on first use in a request, and separately for each script prefix.
+
+The documents are generated from the settings, which are read when GMN starts, so they
+only change when GMN is restarted, or when a setting is changed with
+``override_settings()`` (tests). The modified timestamp of the documents is the time
+at which settings.py was last modified, so it is the same in all GMN processes.
+
+"""
+import collections
+import hashlib
+import os
+import sys
+import threading
+
+import d1_common.date_time
 import d1_common.type_conversions
 import d1_common.xml
 
 import django.conf
+import django.core.signals
 import django.urls
 import django.urls.base
 
+NodeDoc = collections.namedtuple(
+    "NodeDoc", ["xml_bytes", "etag_str", "modified_timestamp"]
+)
+
+_render_lock = threading.Lock()
+# Script prefix -> API major version -> NodeDoc
+_doc_dict = {}
+
 # Example Node document:
 #
 # <?xml version="1.0" ?>
@@ -50,6 +77,53 @@ import django.urls.base
 # App
 
 
+def get_doc(api_major_int=2):
+    """Get the rendered Node document.
+
+    Returns:
+        NodeDoc: The pretty printed XML document as bytes, together with an ETag and
+        the time at which settings.py was last modified, or None if the settings were
+        not loaded from a file.
+
+    """
+    prefix_doc_dict = _doc_dict.get(django.urls.get_script_prefix())
+    if prefix_doc_dict is None:
+        prefix_doc_dict = render()
+    return prefix_doc_dict[api_major_int]
+
+
+def render():
+    """Render the v1 and v2 Node documents from the current settings, for the current
+    script prefix.
+
+    Returns:
+        dict: API major version to NodeDoc.
+
+    """
+    global _doc_dict
+    with _render_lock:
+        script_prefix = django.urls.get_script_prefix()
+        modified_timestamp = _get_settings_modified_timestamp()
+        doc_dict = {}
+        for api_major_int in (1, 2):
+            xml_bytes = get_pretty_xml(api_major_int)
+            if isinstance(xml_bytes, str):
+                xml_bytes = xml_bytes.encode("utf-8")
+            doc_dict[api_major_int] = NodeDoc(
+                xml_bytes,
+                '"{}"'.format(hashlib.sha1(xml_bytes).hexdigest()),
+                modified_timestamp,
+            )
+        _doc_dict = dict(_doc_dict, **{script_prefix: doc_dict})
+    return doc_dict
+
+
+def clear():
+    """Drop the rendered Node documents held by this process."""
+    global _doc_dict
+    _doc_dict = {}
+
+
 def get_pretty_xml(api_major_int=2):
     return d1_common.xml.serialize_for_transport(
         _get_pyxb(api_major_int), xslt_url=django.urls.base.reverse("home_xslt")
@@ -68,6 +142,16 @@ def get_pyxb(api_major_int=2):
     return _get_pyxb(api_major_int)
 
 
+def _get_settings_modified_timestamp():
+    """Return the time at which the settings module was last modified, with the
+    resolution of HTTP dates, or None if the settings were not loaded from a file."""
+    settings_module = sys.modules.get(django.conf.settings.SETTINGS_MODULE or "")
+    settings_path = getattr(settings_module, "__file__", None)
+    if settings_path is None:
+        return None
+    return d1_common.date_time.dt_from_ts(int(os.path.getmtime(settings_path)))
+
+
 # noinspection PyTypeChecker
 def _get_pyxb(api_major_int):
     if api_major_int == 1:
@@ -153,3 +237,10 @@ def _create_service_pyxb(pyxb_binding, service_name, service_version):
     service_pyxb.version = pyxb_binding.ServiceVersion(service_version)
     service_pyxb.available = True
     return service_pyxb
+
+
+def _on_setting_changed(**kwargs):
+    clear()
+
+
+django.core.signals.setting_changed.connect(_on_setting_changed)
@@ -30,13 +30,14 @@ import d1_common.xml
 import d1_client.cnclient
 
 import django.conf
-import django.core.cache
+
+import d1_gmn.app.cache
 
 log = logging.getLogger(__name__)
 
 
 def get_cn_subjects():
-    cn_subjects = django.core.cache.cache.get("cn_subjects")
+    cn_subjects = d1_gmn.app.cache.get_cache("cn_subjects").get("cn_subjects")
     if cn_subjects is not None:
         return cn_subjects
 
@@ -47,11 +48,11 @@ def get_cn_subjects():
         log.info("Running in environment: {}".format(django.conf.settings.DATAONE_ROOT))
         set_cn_subjects_for_environment()
 
-    return django.core.cache.cache.get("cn_subjects")
+    return d1_gmn.app.cache.get_cache("cn_subjects").get("cn_subjects")
 
 
 def set_empty_cn_subjects_cache():
-    django.core.cache.cache.set("cn_subjects", set())
+    d1_gmn.app.cache.get_cache("cn_subjects").set("cn_subjects", set())
     log.info("CN Subjects set to empty list")
 
 
@@ -73,7 +74,7 @@ def set_cn_subjects_for_environment():
                 ", ".join(cn_subjects)
             )
         )
-    django.core.cache.cache.set("cn_subjects", set(cn_subjects))
+    d1_gmn.app.cache.get_cache("cn_subjects").set("cn_subjects", set(cn_subjects))
 
 
 def get_cn_subjects_string():
@@ -22,6 +22,24 @@ import d1_common.object_format_cache
 
 import django.conf
 
+# Content types of formats that are already compressed. Compressing them again uses CPU
+# time without reducing the size.
+INCOMPRESSIBLE_CONTENT_TYPE_SET = {
+    "application/gzip",
+    "application/x-7z-compressed",
+    "application/x-bzip2",
+    "application/x-gzip",
+    "application/x-rar-compressed",
+    "application/x-xz",
+    "application/zip",
+    "image/gif",
+    "image/jp2",
+    "image/jpeg",
+    "image/png",
+    "image/webp",
+}
+INCOMPRESSIBLE_CONTENT_TYPE_PREFIX_TUP = ("audio/", "video/")
+
 if django.conf.settings.STAND_ALONE:
     object_format_list_cache = d1_common.object_format_cache.ObjectFormatListCache(
         cache_refresh_period=None
@@ -42,3 +60,16 @@ def get_content_type(format_id):
     return object_format_list_cache.get_content_type(
         format_id, d1_common.const.CONTENT_TYPE_OCTET_STREAM
     )
+
+
+def is_compressible(format_id):
+    """Return False if objects of the format are already compressed.
+
+    Unknown formats are assumed to be compressible.
+
+    """
+    content_type = get_content_type(format_id)
+    return not (
+        content_type in INCOMPRESSIBLE_CONTENT_TYPE_SET
+        or content_type.startswith(INCOMPRESSIBLE_CONTENT_TYPE_PREFIX_TUP)
+    )
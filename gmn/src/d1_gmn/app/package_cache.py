@@ -0,0 +1,155 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""On-disk cache of BagIt packages generated by MNPackage.getPackage().
+
+When PACKAGE_CACHE_ENABLED is True, the BagIt zip archive for a Resource Map is
+written to PACKAGE_CACHE_DIR_PATH while it is streamed to the client. Later requests
+for the same package are served from the file.
+
+The cache key is derived from the Resource Map PID, the API version and the PID and
+System Metadata modified timestamp of each member. A package is regenerated when the
+System Metadata of any member is updated, as the System Metadata is included in the
+package.
+
+The file is written under a temporary name and renamed when the archive is complete,
+so an incomplete archive is never served. Files that have not been used recently are
+removed when the total size of the cache exceeds PACKAGE_CACHE_MAX_SIZE.
+
+"""
+import hashlib
+import logging
+import os
+import tempfile
+
+import django.conf
+
+import d1_common.iter.stream
+
+import d1_gmn.app.models
+import d1_gmn.app.views.util
+
+PACKAGE_FILE_EXT = ".zip"
+
+log = logging.getLogger(__name__)
+
+
+def get_path(request, map_pid, member_pid_list):
+    """Get the path of the cached package for a Resource Map.
+
+    Args:
+        request: HttpRequest
+            The API version of the request selects the version of the System Metadata
+            included in the package.
+        map_pid: str
+        member_pid_list: list of str
+            PIDs of the objects aggregated by the Resource Map.
+
+    Returns:
+        str: Path to a file that may or may not exist.
+
+    """
+    timestamp_dict = dict(
+        d1_gmn.app.models.ScienceObject.objects.filter(
+            pid__did__in=member_pid_list
+        ).values_list("pid__did", "modified_timestamp")
+    )
+    key_hash = hashlib.sha256()
+    key_hash.update(
+        repr(
+            (
+                "v1" if d1_gmn.app.views.util.is_v1_api(request) else "v2",
+                map_pid,
+                sorted(
+                    (pid, str(timestamp_dict.get(pid))) for pid in set(member_pid_list)
+                ),
+            )
+        ).encode("utf-8")
+    )
+    return os.path.join(
+        django.conf.settings.PACKAGE_CACHE_DIR_PATH,
+        key_hash.hexdigest() + PACKAGE_FILE_EXT,
+    )
+
+
+def get_iter(package_path):
+    """Get an iterator over the bytes of a cached package.
+
+    Returns:
+        StreamIterator or None if the package is not in the cache.
+
+    """
+    try:
+        package_file = open(package_path, "rb")
+    except FileNotFoundError:
+        return None
+    # Record the use, for removing the least recently used packages.
+    os.utime(package_path)
+    return d1_common.iter.stream.StreamIterator(package_file)
+
+
+def write_iter(package_path, package_iter):
+    """Add a package to the cache while it is being streamed.
+
+    Yields the bytes from ``package_iter`` and writes them to the cache. If the
+    iteration is not completed, such as when the client disconnects, nothing is
+    added to the cache.
+
+    """
+    dir_path = os.path.dirname(package_path)
+    os.makedirs(dir_path, exist_ok=True)
+    tmp_file = tempfile.NamedTemporaryFile(dir=dir_path, suffix=".tmp", delete=False)
+    try:
+        with tmp_file:
+            for chunk_bytes in package_iter:
+                tmp_file.write(chunk_bytes)
+                yield chunk_bytes
+        os.replace(tmp_file.name, package_path)
+    except BaseException:
+        os.unlink(tmp_file.name)
+        raise
+    log.debug(
+        'Added package to cache. path="{}" size={}'.format(
+            package_path, os.path.getsize(package_path)
+        )
+    )
+    _remove_least_recently_used(dir_path)
+
+
+def _remove_least_recently_used(dir_path):
+    """Remove the least recently used packages until the total size of the cache is
+    below PACKAGE_CACHE_MAX_SIZE."""
+    package_list = []
+    total_size = 0
+    for dir_entry in os.scandir(dir_path):
+        if not dir_entry.name.endswith(PACKAGE_FILE_EXT):
+            continue
+        try:
+            stat_result = dir_entry.stat()
+        except FileNotFoundError:
+            continue
+        package_list.append((stat_result.st_mtime, stat_result.st_size, dir_entry.path))
+        total_size += stat_result.st_size
+    for _, package_size, package_path in sorted(package_list):
+        if total_size <= django.conf.settings.PACKAGE_CACHE_MAX_SIZE:
+            break
+        try:
+            os.unlink(package_path)
+        except FileNotFoundError:
+            pass
+        total_size -= package_size
+        log.debug('Removed package from cache. path="{}"'.format(package_path))
@@ -28,19 +28,33 @@ import d1_common.url
 
 
 def get_sciobj_iter_remote(url):
+    return get_sciobj_response_remote(url).iter_content(
+        chunk_size=django.conf.settings.NUM_CHUNK_BYTES
+    )
+
+
+def get_sciobj_response_remote(url, header_dict=None):
+    """Open a proxy object for streaming.
+
+    Args:
+        header_dict: Additional headers to send to the remote server, such as
+        ``Range``.
+
+    Returns:
+        requests.Response: Response with the body not yet read.
+
+    """
     try:
-        response = requests.get(
+        return requests.get(
             url,
             stream=True,
-            headers=_mk_header_dict(),
+            headers=dict(_mk_header_dict(), **(header_dict or {})),
             timeout=django.conf.settings.PROXY_MODE_STREAM_TIMEOUT,
         )
     except requests.RequestException as e:
         raise d1_common.types.exceptions.ServiceFailure(
             0, 'Unable to open proxy object for streaming. error="{}"'.format(str(e))
         )
-    else:
-        return response.iter_content(chunk_size=django.conf.settings.NUM_CHUNK_BYTES)
 
 
 def is_proxy_url(url):
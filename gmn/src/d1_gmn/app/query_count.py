@@ -0,0 +1,246 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cached total counts for listObjects() and getLogRecords().
+
+The total number of items matched by a listObjects() or getLogRecords() request is
+stored in the QueryCount table, keyed by the normalized filter. The filter consists of
+the URL parameters that select items and the set of authenticated subjects, or None
+for trusted subjects, which are not subject to access control.
+
+Counts are invalidated cheaply and recounted when they are next read:
+
+- Creating, updating or deleting a ScienceObject increments a single generation
+  counter, with ``track_sciobj_change()``. Counts from earlier generations are not
+  used, so the next request recounts in the database.
+
+- Logging an event does not write to the cache. Log counts store the highest EventLog
+  id that they include. When a Log count is read, only the matching events with higher
+  ids are counted and added.
+
+Only filters on fromDate, toDate, formatId, replicaStatus and event are supported.
+Other filters, such as identifier and idFilter, select small sets that are counted
+directly in the database.
+
+Counts are refreshed with a direct count after QUERY_COUNT_CACHE_MAX_AGE seconds. This
+limits the effect of any changes that were made without going through GMN, and of
+events that were committed after events with higher ids had been counted.
+
+The generation counter is a single row that is updated in the transaction of each
+change, so concurrent changes are serialized on it. The cache is therefore disabled by
+default, and is intended for nodes where objects change rarely compared to how often
+large result sets are paged.
+
+"""
+
+import contextlib
+import datetime
+import hashlib
+import json
+import logging
+
+import d1_common.date_time
+
+import django.conf
+import django.db.models
+
+import d1_gmn.app.auth
+import d1_gmn.app.models
+import d1_gmn.app.views.util
+
+OBJECT_LIST = "object_list"
+LOG = "log"
+
+# URL parameters that are included in the normalized filter
+FILTER_PARAM_DICT = {
+    OBJECT_LIST: ("fromDate", "toDate", "formatId", "replicaStatus"),
+    LOG: ("fromDate", "toDate", "event"),
+}
+
+# URL parameters that do not affect the total count
+IGNORED_PARAM_LIST = ("start", "count", "nodeId", "pretty", "f")
+
+log = logging.getLogger(__name__)
+
+
+def is_enabled():
+    return django.conf.settings.QUERY_COUNT_CACHE_ENABLED
+
+
+def get_total(request, query_type, query):
+    """Get the total number of items matched by a listObjects() or getLogRecords()
+    query.
+
+    Args:
+        query_type: OBJECT_LIST or LOG
+        query: The filtered, unsliced query.
+
+    Returns:
+        int: The cached count if available, else the count from the database.
+
+    """
+    filter_dict = _get_filter_dict(request, query_type)
+    if filter_dict is None:
+        return query.count()
+    key_str = _gen_key(filter_dict)
+    generation_int = _get_generation()
+    max_event_id = _get_max_event_id() if query_type == LOG else 0
+    min_timestamp = d1_common.date_time.utc_now() - datetime.timedelta(
+        seconds=django.conf.settings.QUERY_COUNT_CACHE_MAX_AGE
+    )
+    count_model = d1_gmn.app.models.QueryCount.objects.filter(
+        key=key_str, generation=generation_int, timestamp__gte=min_timestamp
+    ).first()
+    if count_model is not None:
+        if count_model.max_event_id >= max_event_id:
+            return count_model.count
+        return _add_new_events(count_model, query, max_event_id)
+    if query_type == LOG:
+        count_int = query.filter(id__lte=max_event_id).count()
+    else:
+        count_int = query.count()
+    _, is_created = d1_gmn.app.models.QueryCount.objects.update_or_create(
+        key=key_str,
+        defaults={
+            "query_type": query_type,
+            "filter_json": json.dumps(filter_dict, sort_keys=True),
+            "count": count_int,
+            "timestamp": d1_common.date_time.utc_now(),
+            "generation": generation_int,
+            "max_event_id": max_event_id,
+        },
+    )
+    if is_created:
+        _evict()
+    return count_int
+
+
+@contextlib.contextmanager
+def track_sciobj_change():
+    """Invalidate the cached counts for changes made to a ScienceObject within the
+    context.
+
+    Covers create, update and delete. The generation is incremented after the change,
+    so that the row lock on the counter is held only until the end of the transaction.
+
+    """
+    yield
+    if is_enabled():
+        _increment_generation()
+
+
+def clear():
+    """Remove all cached counts."""
+    d1_gmn.app.models.QueryCount.objects.all().delete()
+
+
+# Private
+
+
+def _get_filter_dict(request, query_type):
+    """Get the normalized filter for the request.
+
+    Returns None if the cache is disabled or if the request uses a filter that is not
+    supported by the cache.
+
+    """
+    if not is_enabled():
+        return None
+    filter_param_list = FILTER_PARAM_DICT[query_type]
+    for param_name in request.GET:
+        if param_name not in filter_param_list and param_name not in IGNORED_PARAM_LIST:
+            return None
+    from_dt = d1_gmn.app.views.util.parse_and_normalize_url_date(
+        request.GET.get("fromDate", None)
+    )
+    to_dt = d1_gmn.app.views.util.parse_and_normalize_url_date(
+        request.GET.get("toDate", None)
+    )
+    filter_dict = {
+        "type": query_type,
+        "fromDate": from_dt.isoformat() if from_dt else None,
+        "toDate": to_dt.isoformat() if to_dt else None,
+        "subjects": (
+            None
+            if d1_gmn.app.auth.is_trusted_subject(request)
+            else sorted(request.all_subjects_set)
+        ),
+    }
+    if query_type == OBJECT_LIST:
+        filter_dict["formatId"] = request.GET.get("formatId", None)
+        filter_dict["replicaStatus"] = not d1_gmn.app.views.util.is_false_param(
+            request.GET.get("replicaStatus", True)
+        )
+    else:
+        filter_dict["event"] = request.GET.get("event", None)
+    return filter_dict
+
+
+def _gen_key(filter_dict):
+    return hashlib.sha256(
+        json.dumps(filter_dict, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def _evict():
+    """Remove the counts that were least recently refreshed, if there are more than
+    QUERY_COUNT_CACHE_SIZE."""
+    evict_id_list = list(
+        d1_gmn.app.models.QueryCount.objects.order_by("-timestamp", "-id").values_list(
+            "id", flat=True
+        )[django.conf.settings.QUERY_COUNT_CACHE_SIZE :]
+    )
+    if evict_id_list:
+        d1_gmn.app.models.QueryCount.objects.filter(id__in=evict_id_list).delete()
+
+
+def _get_generation():
+    return (
+        d1_gmn.app.models.QueryCountGeneration.objects.order_by("id")
+        .values_list("generation", flat=True)
+        .first()
+        or 0
+    )
+
+
+def _increment_generation():
+    if not d1_gmn.app.models.QueryCountGeneration.objects.update(
+        generation=django.db.models.F("generation") + 1
+    ):
+        d1_gmn.app.models.QueryCountGeneration.objects.create(generation=1)
+
+
+def _get_max_event_id():
+    return (
+        d1_gmn.app.models.EventLog.objects.aggregate(django.db.models.Max("id"))[
+            "id__max"
+        ]
+        or 0
+    )
+
+
+def _add_new_events(count_model, query, max_event_id):
+    """Add the matching events that were logged after the count was stored."""
+    count_int = (
+        count_model.count
+        + query.filter(id__gt=count_model.max_event_id, id__lte=max_event_id).count()
+    )
+    # Skip the update if another request has already advanced the count.
+    d1_gmn.app.models.QueryCount.objects.filter(
+        id=count_model.id, max_event_id=count_model.max_event_id
+    ).update(count=count_int, max_event_id=max_event_id)
+    return count_int
@@ -83,8 +83,18 @@ def create_or_update_db(sysmeta_pyxb):
 
 
 def get_resource_map_from_sciobj(pid):
+    """Read the members of a Resource Map that is in the SciObj store.
+
+    The file is parsed as a stream, so large Resource Maps are not read into memory.
+
+    """
     with d1_gmn.app.sciobj_store.open_sciobj_file_by_pid_ctx(pid) as sciobj_file:
-        return d1_gmn.app.resource_map.parse_resource_map_from_str(sciobj_file.read())
+        try:
+            return d1_common.resource_map.parseResourceMapSummary(sciobj_file)
+        except xml.sax.SAXException as e:
+            raise d1_common.types.exceptions.InvalidRequest(
+                0, 'Invalid Resource Map. pid="{}" error="{}"'.format(pid, str(e))
+            )
 
 
 def create_or_update(map_pid, resource_map):
@@ -112,10 +122,14 @@ def get_resource_map_members_by_map(map_pid):
 
 
 def get_resource_map_members_by_member(member_pid):
-    map_model = _get_resource_map_by_member(member_pid)
-    return d1_gmn.app.models.ResourceMapMember.objects.filter(
-        resource_map=map_model
-    ).values_list("did__did", flat=True)
+    """Get the members of all Resource Maps that aggregate ``member_pid``."""
+    return (
+        d1_gmn.app.models.ResourceMapMember.objects.filter(
+            resource_map__in=_get_resource_maps_by_member(member_pid)
+        )
+        .values_list("did__did", flat=True)
+        .distinct()
+    )
 
 
 def is_resource_map_sysmeta_pyxb(sysmeta_pyxb):
@@ -123,10 +137,9 @@ def is_resource_map_sysmeta_pyxb(sysmeta_pyxb):
 
 
 def _parse_resource_map_from_file(resource_map_path):
-    resource_map = d1_common.resource_map.ResourceMap()
     try:
         with open(resource_map_path, "rb") as f:
-            resource_map.deserialize(file=f, format="xml")
+            resource_map = d1_common.resource_map.parseResourceMapSummary(f)
     except xml.sax.SAXException as e:
         raise d1_common.types.exceptions.InvalidRequest(
             0, 'Invalid Resource Map. error="{}"'.format(str(e))
@@ -135,9 +148,8 @@ def _parse_resource_map_from_file(resource_map_path):
 
 
 def parse_resource_map_from_str(resource_map_xml):
-    resource_map = d1_common.resource_map.ResourceMap()
     try:
-        resource_map.deserialize(data=resource_map_xml, format="xml")
+        resource_map = d1_common.resource_map.parseResourceMapSummary(resource_map_xml)
     except xml.sax.SAXException as e:
         raise d1_common.types.exceptions.InvalidRequest(
             0,
@@ -164,16 +176,32 @@ def _get_map(map_pid):
 
 
 def _update_map(map_model, member_pid_list):
-    d1_gmn.app.models.ResourceMapMember.objects.filter(resource_map=map_model).delete()
-    for member_pid in member_pid_list:
-        member_model = d1_gmn.app.models.ResourceMapMember(
-            resource_map=map_model, did=d1_gmn.app.did.get_or_create_did(member_pid)
-        )
-        member_model.save()
+    """Sync the members of a Resource Map with ``member_pid_list``.
 
+    Only the members that were added or removed are written, with a constant number of
+    queries regardless of the number of members.
 
-def _get_resource_map_by_member(member_pid):
-    map_model = d1_gmn.app.models.ResourceMapMember.objects.filter(
-        pid=member_pid
-    ).resource_map
-    return map_model
+    """
+    did_id_set = {
+        did_model.id
+        for did_model in d1_gmn.app.models.did_dict(member_pid_list).values()
+    }
+    member_qs = d1_gmn.app.models.ResourceMapMember.objects.filter(
+        resource_map=map_model
+    )
+    current_did_id_set = set(member_qs.values_list("did_id", flat=True))
+    removed_did_id_set = current_did_id_set - did_id_set
+    if removed_did_id_set:
+        member_qs.filter(did_id__in=removed_did_id_set).delete()
+    d1_gmn.app.models.ResourceMapMember.objects.bulk_create(
+        [
+            d1_gmn.app.models.ResourceMapMember(resource_map=map_model, did_id=did_id)
+            for did_id in did_id_set - current_did_id_set
+        ]
+    )
+
+
+def _get_resource_maps_by_member(member_pid):
+    return d1_gmn.app.models.ResourceMapMember.objects.filter(
+        did__did=member_pid
+    ).values("resource_map")
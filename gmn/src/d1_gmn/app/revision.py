@@ -120,13 +120,30 @@ def get_sid_by_pid(pid):
 
 
 def set_revision_links(sciobj_model, obsoletes_pid=None, obsoleted_by_pid=None):
+    set_revision_fields(sciobj_model, obsoletes_pid, obsoleted_by_pid)
+    sciobj_model.save()
+    set_revision_reverse_links(sciobj_model.pid.did, obsoletes_pid, obsoleted_by_pid)
+
+
+def set_revision_fields(sciobj_model, obsoletes_pid=None, obsoleted_by_pid=None):
+    """Set the obsoletes and obsoletedBy fields of an object without saving it."""
     if obsoletes_pid:
         sciobj_model.obsoletes = d1_gmn.app.did.get_or_create_did(obsoletes_pid)
-        _set_revision_reverse(sciobj_model.pid.did, obsoletes_pid, is_obsoletes=False)
     if obsoleted_by_pid:
         sciobj_model.obsoleted_by = d1_gmn.app.did.get_or_create_did(obsoleted_by_pid)
-        _set_revision_reverse(sciobj_model.pid.did, obsoleted_by_pid, is_obsoletes=True)
-    sciobj_model.save()
+
+
+def set_revision_reverse_links(pid, obsoletes_pid=None, obsoleted_by_pid=None):
+    """Link the objects that ``pid`` obsoletes and is obsoleted by back to ``pid``.
+
+    Preconditions:
+    - The object with ``pid`` has been saved.
+
+    """
+    if obsoletes_pid:
+        _set_revision_reverse(pid, obsoletes_pid, is_obsoletes=False)
+    if obsoleted_by_pid:
+        _set_revision_reverse(pid, obsoleted_by_pid, is_obsoletes=True)
 
 
 def is_obsoletes_pid(pid):
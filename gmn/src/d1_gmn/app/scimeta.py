@@ -39,6 +39,11 @@ def assert_valid(sysmeta_pyxb, pid):
       and parsed by DataONE CNs
     - and XML Schema (XSD) files for formatId are present on local system
 
+    The file is parsed as it is read, without first reading it into memory.
+
+    The XML Schema validator for the formatId is compiled on first use and cached for
+    the lifetime of the process. See the SCIMETA_VALIDATION_WARM_UP setting.
+
     """
     if not (_is_validation_enabled() and _is_installed_scimeta_format_id(sysmeta_pyxb)):
         return
@@ -59,7 +64,7 @@ def assert_valid(sysmeta_pyxb, pid):
 
     with d1_gmn.app.sciobj_store.open_sciobj_file_by_pid_ctx(pid) as sciobj_file:
         try:
-            d1_scimeta.validate.assert_valid(sysmeta_pyxb.formatId, sciobj_file.read())
+            d1_scimeta.validate.validate_file(sysmeta_pyxb.formatId, sciobj_file)
         except d1_scimeta.util.SciMetaError as e:
             raise d1_common.types.exceptions.InvalidRequest(0, str(e))
 
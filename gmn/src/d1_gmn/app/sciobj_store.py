@@ -25,6 +25,11 @@
 
 - Folders are created as required in the hierarchy.
 
+- SciObj bytes uploaded via MNStorage.create() and MNStorage.update() are received
+  into temporary files in the ``upload`` folder at the root of the store. Since the
+  folder is on the same filesystem as the hierarchy, the files can then be moved into
+  place without copying.
+
 """
 import contextlib
 import hashlib
@@ -53,6 +58,8 @@ SCIOBJ_JSON_NAME = "gmn_object_store.json"
 # that are relative to the path set in settings.OBJECT_STORE_PATH.
 RELATIVE_PATH_MAGIC_HOST_STR = "gmn-object-store"
 
+UPLOAD_DIR_NAME = "upload"
+
 # Default location
 
 
@@ -199,6 +206,18 @@ def get_abs_sciobj_store_path():
     return django.conf.settings.OBJECT_STORE_PATH
 
 
+def get_abs_upload_dir_path():
+    """Get the absolute path to the folder that holds SciObj uploads that are in
+    progress.
+
+    - The folder is created if it does not exist.
+
+    """
+    abs_path = os.path.join(get_abs_sciobj_store_path(), UPLOAD_DIR_NAME)
+    d1_common.utils.filesystem.create_missing_directories_for_dir(abs_path)
+    return abs_path
+
+
 def assert_sciobj_store_exists():
     if not is_existing_store():
         raise d1_common.types.exceptions.ServiceFailure(
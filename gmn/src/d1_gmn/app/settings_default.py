@@ -79,6 +79,12 @@ LOG_IGNORE_SUBJECT = []
 LOG_IGNORE_TRUSTED_SUBJECT = True
 LOG_IGNORE_NODE_SUBJECT = True
 
+EVENT_LOG_BUFFER_ENABLED = False
+EVENT_LOG_BUFFER_SIZE = 500
+EVENT_LOG_BUFFER_MAX_AGE = 5
+EVENT_LOG_BUFFER_SPILL_DIR_PATH = "/var/tmp"
+EVENT_LOG_LOOKUP_CACHE_SIZE = 10000
+
 CLIENT_CERT_PATH = "/var/local/dataone/certs/client/client_cert.pem"
 CLIENT_CERT_PRIVATE_KEY_PATH = (
     "/var/local/dataone/certs/client/client_key_nopassword.pem"
@@ -93,6 +99,8 @@ REPLICATION_SPACEALLOCATED = 10 * 1024 ** 3
 REPLICATION_ALLOWEDNODE = ()
 REPLICATION_ALLOWEDOBJECTFORMAT = ()
 REPLICATION_MAX_ATTEMPTS = 24
+REPLICATION_CONCURRENCY = 4
+REPLICATION_CONCURRENCY_PER_NODE = 2
 REPLICATION_ALLOW_ONLY_PUBLIC = False
 
 SYSMETA_REFRESH_MAX_ATTEMPTS = 24
@@ -113,6 +121,7 @@ RESOURCE_MAP_CREATE = "block"
 SCIMETA_VALIDATION_ENABLED = True
 SCIMETA_VALIDATION_MAX_SIZE = 100 * 1024 ** 2
 SCIMETA_VALIDATION_OVER_SIZE_ACTION = "reject"
+SCIMETA_VALIDATION_WARM_UP = True
 
 PROXY_MODE_BASIC_AUTH_ENABLED = False
 PROXY_MODE_BASIC_AUTH_USERNAME = ""
@@ -124,7 +133,21 @@ CORS_DEFAULT_ORIGIN = "https://search.dataone.org"
 
 MAX_XML_DOCUMENT_SIZE = 10 * 1024 ** 2
 NUM_CHUNK_BYTES = 1024 ** 2
+SCIOBJ_DELIVERY_MODE = "file"
+SCIOBJ_X_ACCEL_REDIRECT_URL = "/gmn_object_store/"
+PACKAGE_CACHE_ENABLED = False
+PACKAGE_CACHE_DIR_PATH = "/var/tmp/gmn_package_cache"
+PACKAGE_CACHE_MAX_SIZE = 10 * 1024 ** 3
 MAX_SLICE_ITEMS = 5000
+SLICE_CHECKPOINT_INTERVAL = 10000
+QUERY_COUNT_CACHE_ENABLED = False
+QUERY_COUNT_CACHE_SIZE = 1000
+QUERY_COUNT_CACHE_MAX_AGE = 24 * 60 * 60
+SESSION_CERT_CACHE_ENABLED = True
+SESSION_CERT_CACHE_MAX_AGE = 60 * 60
+JWT_CACHE_ENABLED = True
+JWT_CACHE_MAX_AGE = 60 * 60
+JWT_CN_CERT_REFRESH_INTERVAL = 24 * 60 * 60
 
 # Serving of static files, such as images
 
@@ -271,6 +294,15 @@ MIDDLEWARE = (
     "d1_gmn.app.middleware.view_handler.ViewHandler",
 )
 
+# SciObj bytes uploaded via MNStorage.create() and MNStorage.update() are received by
+# SciObjUploadHandler, which checksums them and writes them into the SciObj store in a
+# single pass. Other uploads are handled by the Django defaults.
+FILE_UPLOAD_HANDLERS = [
+    "d1_gmn.app.upload_handler.SciObjUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -296,6 +328,17 @@ CACHES = {
     }
 }
 
+# Default TIMEOUT and MAX_ENTRIES for the namespaces in the cache. See
+# d1_gmn.app.cache.
+CACHE_NAMESPACES = {
+    "slice": {"TIMEOUT": 60 * 60, "MAX_ENTRIES": 10000},
+    "cn_subjects": {"TIMEOUT": 60 * 60, "MAX_ENTRIES": 100},
+    "client_cert": {"TIMEOUT": 60 * 60, "MAX_ENTRIES": 100},
+    "session_cert": {"TIMEOUT": 60 * 60, "MAX_ENTRIES": 10000},
+    "session_jwt": {"TIMEOUT": 60 * 60, "MAX_ENTRIES": 10000},
+    "node_base_url": {"TIMEOUT": 60 * 60, "MAX_ENTRIES": 10},
+}
+
 ROOT_URLCONF = "d1_gmn.app.urls"
 
 INSTALLED_APPS = [
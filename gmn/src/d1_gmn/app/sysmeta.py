@@ -21,6 +21,18 @@
 - Translate System Metadata between PyXB and GMN database representations.
 - Query the database for System Metadata properties.
 
+When System Metadata is stored with ``create_or_update()``, the new values are
+compared with the existing rows and only the differences are written, in a single
+transaction. The rows for each related table are written with a single bulk INSERT,
+UPDATE or DELETE, and Subjects and Nodes referenced anywhere in the System Metadata
+are looked up and created together, so the number of database round trips does not
+depend on the number of access rules, replication policy nodes or replicas.
+
+When System Metadata is read, the related rows are read with a single query per
+table. ``model_to_pyxb_many()`` reads the System Metadata for many objects in batches,
+with the same number of queries per batch as ``model_to_pyxb()`` uses for a single
+object.
+
 """
 import os
 
@@ -37,6 +49,8 @@ import d1_common.utils.ulog
 import d1_common.wrap.access_policy
 import d1_common.xml
 
+import django.db.models
+import django.db.transaction
 import django.urls
 import django.urls.base
 
@@ -46,10 +60,15 @@ import d1_gmn.app.did
 import d1_gmn.app.model_util
 import d1_gmn.app.models
 import d1_gmn.app.object_format_cache
+import d1_gmn.app.query_count
 import d1_gmn.app.revision
 import d1_gmn.app.sciobj_store
 import d1_gmn.app.views.util
 
+# Number of objects for which System Metadata is read together by
+# model_to_pyxb_many().
+MODEL_TO_PYXB_BATCH_SIZE = 500
+
 
 def archive_sciobj(pid):
     """Set the status of an object to archived.
@@ -60,10 +79,11 @@ def archive_sciobj(pid):
     - The object is not archived.
 
     """
-    sciobj_model = d1_gmn.app.model_util.get_sci_model(pid)
-    sciobj_model.is_archived = True
-    sciobj_model.save()
-    _update_modified_timestamp(sciobj_model)
+    with d1_gmn.app.query_count.track_sciobj_change():
+        sciobj_model = d1_gmn.app.model_util.get_sci_model(pid)
+        sciobj_model.is_archived = True
+        sciobj_model.save()
+        _update_modified_timestamp(sciobj_model)
 
 
 def serialize(sysmeta_pyxb, pretty=False):
@@ -81,6 +101,7 @@ def deserialize(xml_str):
     return d1_gmn.app.views.util.deserialize(xml_str)
 
 
+@django.db.transaction.atomic
 def create_or_update(sysmeta_pyxb, sciobj_url=None):
     """Create or update database representation of a System Metadata object and closely
     related internal state.
@@ -98,41 +119,56 @@ def create_or_update(sysmeta_pyxb, sciobj_url=None):
     Preconditions:
 
         - All values in ``sysmeta_pyxb`` must be valid for the operation being performed
-    """
-    # TODO: Make sure that old sections are removed if not included in update.
 
+    Postconditions:
+
+        - Sections that are not included in ``sysmeta_pyxb``, such as the media type
+          and replication policy, are removed from the database.
+    """
     pid = d1_common.xml.get_req_val(sysmeta_pyxb.identifier)
 
     if sciobj_url is None:
         sciobj_url = d1_gmn.app.sciobj_store.get_rel_sciobj_file_url_by_pid(pid)
 
-    try:
-        sci_model = d1_gmn.app.model_util.get_sci_model(pid)
-    except d1_gmn.app.models.ScienceObject.DoesNotExist:
-        sci_model = d1_gmn.app.models.ScienceObject()
-        sci_model.pid = d1_gmn.app.did.get_or_create_did(pid)
-        sci_model.url = sciobj_url
-        sci_model.serial_version = sysmeta_pyxb.serialVersion
-        sci_model.uploaded_timestamp = d1_common.date_time.normalize_datetime_to_utc(
-            sysmeta_pyxb.dateUploaded
-        )
+    obsoletes_pid = d1_common.xml.get_opt_val(sysmeta_pyxb, "obsoletes")
+    obsoleted_by_pid = d1_common.xml.get_opt_val(sysmeta_pyxb, "obsoletedBy")
 
-    _base_pyxb_to_model(sci_model, sysmeta_pyxb)
+    with d1_gmn.app.query_count.track_sciobj_change():
+        try:
+            sci_model = d1_gmn.app.model_util.get_sci_model(pid)
+        except d1_gmn.app.models.ScienceObject.DoesNotExist:
+            sci_model = d1_gmn.app.models.ScienceObject()
+            sci_model.pid = d1_gmn.app.did.get_or_create_did(pid)
+            sci_model.url = sciobj_url
+            sci_model.serial_version = sysmeta_pyxb.serialVersion
+            sci_model.uploaded_timestamp = d1_common.date_time.normalize_datetime_to_utc(
+                sysmeta_pyxb.dateUploaded
+            )
 
-    sci_model.save()
+        subject_dict = d1_gmn.app.models.subject_dict(_get_subject_set(sysmeta_pyxb))
+        node_dict = d1_gmn.app.models.node_dict(_get_node_urn_set(sysmeta_pyxb))
 
-    if _has_media_type_pyxb(sysmeta_pyxb):
-        _media_type_pyxb_to_model(sci_model, sysmeta_pyxb)
+        _base_pyxb_to_model(sci_model, sysmeta_pyxb, subject_dict, node_dict)
+        d1_gmn.app.revision.set_revision_fields(
+            sci_model, obsoletes_pid, obsoleted_by_pid
+        )
 
-    _access_policy_pyxb_to_model(sci_model, sysmeta_pyxb)
+        sci_model.save()
 
-    if _has_replication_policy_pyxb(sysmeta_pyxb):
-        _replication_policy_pyxb_to_model(sci_model, sysmeta_pyxb)
-
-    replica_pyxb_to_model(sci_model, sysmeta_pyxb)
-    revision_pyxb_to_model(sci_model, sysmeta_pyxb, pid)
+        _media_type_pyxb_to_model(sci_model, sysmeta_pyxb)
+        _access_policy_pyxb_to_model(sci_model, sysmeta_pyxb, subject_dict)
+        _replication_policy_pyxb_to_model(sci_model, sysmeta_pyxb, node_dict)
+        replica_pyxb_to_model(sci_model, sysmeta_pyxb, node_dict)
 
-    sci_model.save()
+        d1_gmn.app.revision.set_revision_reverse_links(
+            pid, obsoletes_pid, obsoleted_by_pid
+        )
+        d1_gmn.app.revision.create_or_update_chain(
+            pid,
+            d1_common.xml.get_opt_val(sysmeta_pyxb, "seriesId"),
+            obsoletes_pid,
+            obsoleted_by_pid,
+        )
 
     return sci_model
 
@@ -176,28 +212,147 @@ def get_filename(sciobj_model):
 
 
 def update_modified_timestamp(pid):
-    sci_model = d1_gmn.app.model_util.get_sci_model(pid)
-    _update_modified_timestamp(sci_model)
+    with d1_gmn.app.query_count.track_sciobj_change():
+        sci_model = d1_gmn.app.model_util.get_sci_model(pid)
+        _update_modified_timestamp(sci_model)
 
 
 def model_to_pyxb(pid):
     return _model_to_pyxb(pid)
 
 
+def model_to_pyxb_many(pid_iter, batch_size=MODEL_TO_PYXB_BATCH_SIZE):
+    """Generate System Metadata for many objects.
+
+    The objects are read in batches of ``batch_size``. The related rows for all the
+    objects in a batch are read with a single query per table, so the number of
+    queries does not depend on the number of objects in the batch.
+
+    PIDs for which there is no local System Metadata are skipped.
+
+    Args:
+        pid_iter: iterable of str
+        batch_size: int
+
+    Yields:
+        tuple: (pid, sysmeta_pyxb), in the order of ``pid_iter``.
+
+    """
+    pid_list = []
+    for pid in pid_iter:
+        pid_list.append(pid)
+        if len(pid_list) == batch_size:
+            yield from _model_to_pyxb_batch(pid_list)
+            pid_list = []
+    if pid_list:
+        yield from _model_to_pyxb_batch(pid_list)
+
+
 def _model_to_pyxb(pid):
-    sciobj_model = d1_gmn.app.model_util.get_sci_model(pid)
-    sysmeta_pyxb = _base_model_to_pyxb(sciobj_model)
-    if _has_media_type_db(sciobj_model):
-        sysmeta_pyxb.mediaType = _media_type_model_to_pyxb(sciobj_model)
-    if _has_access_policy_db(sciobj_model):
-        sysmeta_pyxb.accessPolicy = _access_policy_model_to_pyxb(sciobj_model)
-    if _has_replication_policy_db(sciobj_model):
-        sysmeta_pyxb.replicationPolicy = _replication_policy_model_to_pyxb(sciobj_model)
+    sciobj_model = _query_sciobj_with_related().get(pid__did=pid)
+    return _sciobj_model_to_pyxb(sciobj_model, d1_gmn.app.revision.get_sid_by_pid(pid))
+
+
+def _model_to_pyxb_batch(pid_list):
+    sciobj_dict = {
+        sciobj_model.pid.did: sciobj_model
+        for sciobj_model in _query_sciobj_with_related().filter(pid__did__in=pid_list)
+    }
+    sid_dict = dict(
+        d1_gmn.app.models.ChainMember.objects.filter(
+            pid__did__in=pid_list, chain__sid__isnull=False
+        ).values_list("pid__did", "chain__sid__did")
+    )
+    for pid in pid_list:
+        sciobj_model = sciobj_dict.get(pid)
+        if sciobj_model is not None:
+            yield pid, _sciobj_model_to_pyxb(sciobj_model, sid_dict.get(pid))
+
+
+def _query_sciobj_with_related():
+    """Query ScienceObject with the related rows required for generating System
+    Metadata.
+
+    The related rows are read with a single query per table for all the objects
+    returned by the query.
+
+    """
+    return d1_gmn.app.models.ScienceObject.objects.select_related(
+        "pid",
+        "format",
+        "checksum_algorithm",
+        "submitter",
+        "rights_holder",
+        "origin_member_node",
+        "authoritative_member_node",
+        "obsoletes",
+        "obsoleted_by",
+        "replicationpolicy",
+    ).prefetch_related(
+        "mediatype_set__mediatypeproperty_set",
+        django.db.models.Prefetch(
+            "permission_set",
+            queryset=d1_gmn.app.models.Permission.objects.select_related("subject"),
+        ),
+        django.db.models.Prefetch(
+            "replicationpolicy__preferredmembernode_set",
+            queryset=d1_gmn.app.models.PreferredMemberNode.objects.select_related(
+                "node"
+            ),
+        ),
+        django.db.models.Prefetch(
+            "replicationpolicy__blockedmembernode_set",
+            queryset=d1_gmn.app.models.BlockedMemberNode.objects.select_related("node"),
+        ),
+        django.db.models.Prefetch(
+            "remotereplica_set",
+            queryset=d1_gmn.app.models.RemoteReplica.objects.select_related(
+                "info__member_node", "info__status"
+            ),
+        ),
+    )
+
+
+def _sciobj_model_to_pyxb(sciobj_model, sid):
+    """Generate System Metadata from a ScienceObject with related rows from
+    ``_query_sciobj_with_related()``."""
+    sysmeta_pyxb = _base_model_to_pyxb(sciobj_model, sid)
+    sysmeta_pyxb.mediaType = _media_type_model_to_pyxb(sciobj_model)
+    sysmeta_pyxb.accessPolicy = _access_policy_model_to_pyxb(sciobj_model)
+    sysmeta_pyxb.replicationPolicy = _replication_policy_model_to_pyxb(sciobj_model)
     sysmeta_pyxb.replica = replica_model_to_pyxb(sciobj_model)
     return sysmeta_pyxb
 
 
-def _base_pyxb_to_model(sci_model, sysmeta_pyxb):
+def _get_subject_set(sysmeta_pyxb):
+    """Get all the subjects referenced in the System Metadata."""
+    subject_set = {d1_common.xml.get_req_val(sysmeta_pyxb.rightsHolder)}
+    if sysmeta_pyxb.submitter:
+        subject_set.add(d1_common.xml.get_req_val(sysmeta_pyxb.submitter))
+    if _has_access_policy_pyxb(sysmeta_pyxb):
+        for allow_rule in sysmeta_pyxb.accessPolicy.allow:
+            subject_set.update(d1_common.xml.get_req_val(s) for s in allow_rule.subject)
+    return subject_set
+
+
+def _get_node_urn_set(sysmeta_pyxb):
+    """Get all the Node URNs referenced in the System Metadata."""
+    node_urn_set = {
+        d1_common.xml.get_req_val(sysmeta_pyxb.originMemberNode),
+        d1_common.xml.get_req_val(sysmeta_pyxb.authoritativeMemberNode),
+    }
+    if _has_replication_policy_pyxb(sysmeta_pyxb):
+        for node_ref_pyxb in (
+            sysmeta_pyxb.replicationPolicy.preferredMemberNode,
+            sysmeta_pyxb.replicationPolicy.blockedMemberNode,
+        ):
+            node_urn_set.update(d1_common.xml.get_req_val(v) for v in node_ref_pyxb)
+    for replica_pyxb in sysmeta_pyxb.replica:
+        node_urn_set.add(d1_common.xml.get_req_val(replica_pyxb.replicaMemberNode))
+    return node_urn_set
+
+
+def _base_pyxb_to_model(sci_model, sysmeta_pyxb, subject_dict, node_dict):
     sci_model.modified_timestamp = d1_common.date_time.normalize_datetime_to_utc(
         sysmeta_pyxb.dateSysMetadataModified
     )
@@ -209,22 +364,22 @@ def _base_pyxb_to_model(sci_model, sysmeta_pyxb):
     )
     sci_model.size = sysmeta_pyxb.size
     if sysmeta_pyxb.submitter:
-        sci_model.submitter = d1_gmn.app.models.subject(
+        sci_model.submitter = subject_dict[
             d1_common.xml.get_req_val(sysmeta_pyxb.submitter)
-        )
-    sci_model.rights_holder = d1_gmn.app.models.subject(
+        ]
+    sci_model.rights_holder = subject_dict[
         d1_common.xml.get_req_val(sysmeta_pyxb.rightsHolder)
-    )
-    sci_model.origin_member_node = d1_gmn.app.models.node(
+    ]
+    sci_model.origin_member_node = node_dict[
         d1_common.xml.get_req_val(sysmeta_pyxb.originMemberNode)
-    )
-    sci_model.authoritative_member_node = d1_gmn.app.models.node(
+    ]
+    sci_model.authoritative_member_node = node_dict[
         d1_common.xml.get_req_val(sysmeta_pyxb.authoritativeMemberNode)
-    )
+    ]
     sci_model.is_archived = sysmeta_pyxb.archived or False
 
 
-def _base_model_to_pyxb(sciobj_model):
+def _base_model_to_pyxb(sciobj_model, sid):
     base_pyxb = d1_common.types.dataoneTypes.systemMetadata()
     base_pyxb.identifier = d1_common.types.dataoneTypes.Identifier(sciobj_model.pid.did)
     base_pyxb.serialVersion = sciobj_model.serial_version
@@ -248,7 +403,7 @@ def _base_model_to_pyxb(sciobj_model):
         sciobj_model.obsoleted_by
     )
     base_pyxb.archived = sciobj_model.is_archived
-    base_pyxb.seriesId = d1_gmn.app.revision.get_sid_by_pid(sciobj_model.pid.did)
+    base_pyxb.seriesId = sid
     return base_pyxb
 
 
@@ -275,45 +430,78 @@ def _has_media_type_pyxb(sysmeta_pyxb):
 
 
 def _media_type_pyxb_to_model(sci_model, sysmeta_pyxb):
-    _delete_existing_media_type(sysmeta_pyxb)
-    media_type_model = _insert_media_type_name_row(sci_model, sysmeta_pyxb.mediaType)
-    _insert_media_type_property_rows(media_type_model, sysmeta_pyxb.mediaType)
+    """Create, replace or remove the media type of the object.
 
+    The existing rows are kept if the media type has not changed.
 
-def _delete_existing_media_type(sysmeta_pyxb):
-    d1_gmn.app.models.MediaType.objects.filter(
-        sciobj__pid__did=d1_common.xml.get_req_val(sysmeta_pyxb.identifier)
-    ).delete()
-
-
-def _insert_media_type_name_row(sci_model, media_type_pyxb):
-    media_type_model = d1_gmn.app.models.MediaType(
-        sciobj=sci_model, name=media_type_pyxb.name
+    """
+    if _has_media_type_pyxb(sysmeta_pyxb):
+        media_type_pyxb = sysmeta_pyxb.mediaType
+        new_media_type_tup = (
+            media_type_pyxb.name,
+            sorted(
+                (p.name, d1_common.xml.get_req_val(p))
+                for p in media_type_pyxb.property_
+            ),
+        )
+    else:
+        new_media_type_tup = None
+    media_type_tup_list = _get_media_type_tup_list(sci_model)
+    if media_type_tup_list == ([new_media_type_tup] if new_media_type_tup else []):
+        return
+    if media_type_tup_list:
+        d1_gmn.app.models.MediaType.objects.filter(sciobj=sci_model).delete()
+    if new_media_type_tup is None:
+        return
+    name_str, property_list = new_media_type_tup
+    media_type_model = d1_gmn.app.models.MediaType.objects.create(
+        sciobj=sci_model, name=name_str
+    )
+    d1_gmn.app.models.MediaTypeProperty.objects.bulk_create(
+        [
+            d1_gmn.app.models.MediaTypeProperty(
+                media_type=media_type_model, name=property_name_str, value=value_str
+            )
+            for property_name_str, value_str in property_list
+        ]
     )
-    media_type_model.save()
-    return media_type_model
 
 
-def _insert_media_type_property_rows(media_type_model, media_type_pyxb):
-    for p in media_type_pyxb.property_:
-        media_type_property_model = d1_gmn.app.models.MediaTypeProperty(
-            media_type=media_type_model, name=p.name, value=d1_common.xml.get_req_val(p)
+def _get_media_type_tup_list(sci_model):
+    """Get the media types stored for the object as (name, [(property name, property
+    value), ...]) tuples, with the properties sorted."""
+    media_type_list = list(
+        d1_gmn.app.models.MediaType.objects.filter(sciobj=sci_model).values_list(
+            "id", "name"
         )
-        media_type_property_model.save()
-
-
-def _has_media_type_db(sciobj_model):
-    return d1_gmn.app.models.MediaType.objects.filter(sciobj=sciobj_model).exists()
+    )
+    if not media_type_list:
+        return []
+    property_dict = {}
+    property_query = d1_gmn.app.models.MediaTypeProperty.objects.filter(
+        media_type__sciobj=sci_model
+    )
+    for media_type_id, name_str, value_str in property_query.values_list(
+        "media_type_id", "name", "value"
+    ):
+        property_dict.setdefault(media_type_id, []).append((name_str, value_str))
+    return [
+        (name_str, sorted(property_dict.get(media_type_id, [])))
+        for media_type_id, name_str in media_type_list
+    ]
 
 
 def _media_type_model_to_pyxb(sciobj_model):
-    media_type_model = d1_gmn.app.models.MediaType.objects.get(sciobj=sciobj_model)
+    media_type_model_list = list(sciobj_model.mediatype_set.all())
+    if not media_type_model_list:
+        return None
+    media_type_model = media_type_model_list[0]
     media_type_pyxb = d1_common.types.dataoneTypes.MediaType()
     media_type_pyxb.name = media_type_model.name
 
-    for media_type_property_model in d1_gmn.app.models.MediaTypeProperty.objects.filter(
-        media_type=media_type_model
-    ).order_by("name", "value"):
+    for media_type_property_model in sorted(
+        media_type_model.mediatypeproperty_set.all(), key=lambda m: (m.name, m.value)
+    ):
         media_type_property_pyxb = d1_common.types.dataoneTypes.MediaTypeProperty(
             media_type_property_model.value, name=media_type_property_model.name
         )
@@ -327,12 +515,17 @@ def _media_type_model_to_pyxb(sciobj_model):
 # ------------------------------------------------------------------------------
 
 
-def _access_policy_pyxb_to_model(sci_model, sysmeta_pyxb):
+def _access_policy_pyxb_to_model(sci_model, sysmeta_pyxb, subject_dict=None):
     """Create or update the database representation of the sysmeta_pyxb access policy.
 
     If called without an access policy, any existing permissions on the object
     are removed and the access policy for the rights holder is recreated.
 
+    Args:
+        subject_dict: dict
+            Subject string to Subject for the subjects in the access policy. If not
+            provided, the Subjects are looked up and created as required.
+
     Preconditions:
       - Subject has changePermission for object.
 
@@ -343,33 +536,65 @@ def _access_policy_pyxb_to_model(sci_model, sysmeta_pyxb):
       - There can be multiple rules in a policy and each rule can contain multiple
         subjects. So there are two ways that the same subject can be specified multiple
         times in a policy. If this happens, multiple, conflicting action levels may be
-        provided for the subject. This is handled by checking for an existing row for
-        the subject for this object and updating it if it contains a lower action
-        level. The end result is that there is one row for each combination of subject
-        and object, and this row contains the highest action level.
+        provided for the subject. This is handled by keeping only the highest action
+        level for each subject. The end result is that there is one row for each
+        combination of subject and object, and this row contains the highest action
+        level.
+      - The new policy is compared with the existing rows. Rows for subjects that have
+        been removed are deleted, rows for which the level has changed are updated
+        and rows for new subjects are inserted, each with a single statement.
 
     """
-    _delete_existing_access_policy(sysmeta_pyxb)
-    # Add changePermission for rights holder.
-    allow_rights_holder = d1_common.types.dataoneTypes.AccessRule()
-    permission = d1_common.types.dataoneTypes.Permission(
-        d1_gmn.app.auth.CHANGEPERMISSION_STR
-    )
-    allow_rights_holder.permission.append(permission)
-    allow_rights_holder.subject.append(
-        d1_common.xml.get_req_val(sysmeta_pyxb.rightsHolder)
-    )
-    top_level = _get_highest_level_action_for_rule(allow_rights_holder)
-    _insert_permission_rows(sci_model, allow_rights_holder, top_level)
-    # Create db entries for all subjects for which permissions have been granted.
+    level_dict = _get_access_policy_level_dict(sysmeta_pyxb)
+    if subject_dict is None:
+        subject_dict = d1_gmn.app.models.subject_dict(level_dict)
+    delete_id_list = []
+    update_model_list = []
+    for permission_model in d1_gmn.app.models.Permission.objects.filter(
+        sciobj=sci_model
+    ).select_related("subject"):
+        level = level_dict.pop(permission_model.subject.subject, None)
+        if level is None:
+            delete_id_list.append(permission_model.id)
+        elif level != permission_model.level:
+            permission_model.level = level
+            update_model_list.append(permission_model)
+    if delete_id_list:
+        d1_gmn.app.models.Permission.objects.filter(id__in=delete_id_list).delete()
+    if update_model_list:
+        d1_gmn.app.models.Permission.objects.bulk_update(update_model_list, ["level"])
+    if level_dict:
+        d1_gmn.app.models.Permission.objects.bulk_create(
+            [
+                d1_gmn.app.models.Permission(
+                    sciobj=sci_model, subject=subject_dict[subject_str], level=level
+                )
+                for subject_str, level in level_dict.items()
+            ]
+        )
+
+
+def _get_access_policy_level_dict(sysmeta_pyxb):
+    """Get the highest action level for each subject in the access policy.
+
+    The rights holder is included with changePermission.
+
+    Returns:
+        dict: Subject string to action level.
+
+    """
+    level_dict = {
+        d1_common.xml.get_req_val(
+            sysmeta_pyxb.rightsHolder
+        ): d1_gmn.app.auth.CHANGEPERMISSION_LEVEL
+    }
     if _has_access_policy_pyxb(sysmeta_pyxb):
         for allow_rule in sysmeta_pyxb.accessPolicy.allow:
             top_level = _get_highest_level_action_for_rule(allow_rule)
-            _insert_permission_rows(sci_model, allow_rule, top_level)
-
-
-def _has_access_policy_db(sciobj_model):
-    return d1_gmn.app.models.Permission.objects.filter(sciobj=sciobj_model).exists()
+            for s in allow_rule.subject:
+                subject_str = d1_common.xml.get_req_val(s)
+                level_dict[subject_str] = max(level_dict.get(subject_str, 0), top_level)
+    return level_dict
 
 
 def _has_access_policy_pyxb(sysmeta_pyxb):
@@ -378,12 +603,6 @@ def _has_access_policy_pyxb(sysmeta_pyxb):
     )
 
 
-def _delete_existing_access_policy(sysmeta_pyxb):
-    d1_gmn.app.models.Permission.objects.filter(
-        sciobj__pid__did=d1_common.xml.get_req_val(sysmeta_pyxb.identifier)
-    ).delete()
-
-
 def _get_highest_level_action_for_rule(allow_rule):
     top_level = 0
     for permission in allow_rule.permission:
@@ -393,21 +612,11 @@ def _get_highest_level_action_for_rule(allow_rule):
     return top_level
 
 
-def _insert_permission_rows(sci_model, allow_rule, top_level):
-    for s in allow_rule.subject:
-        permission_model = d1_gmn.app.models.Permission(
-            sciobj=sci_model,
-            subject=d1_gmn.app.models.subject(d1_common.xml.get_req_val(s)),
-            level=top_level,
-        )
-        permission_model.save()
-
-
 def _access_policy_model_to_pyxb(sciobj_model):
     access_policy_pyxb = d1_common.types.dataoneTypes.AccessPolicy()
-    for permission_model in d1_gmn.app.models.Permission.objects.filter(
-        sciobj=sciobj_model
-    ).order_by("subject", "level", "sciobj__pid__did"):
+    for permission_model in sorted(
+        sciobj_model.permission_set.all(), key=lambda m: (m.subject_id, m.level)
+    ):
         # Skip implicit permissions for rightsHolder.
         if permission_model.subject.subject == sciobj_model.rights_holder.subject:
             continue
@@ -434,59 +643,90 @@ def _access_policy_model_to_pyxb(sciobj_model):
 # </replicationPolicy>
 
 
-def _replication_policy_pyxb_to_model(sciobj_model, sysmeta_pyxb):
-    _delete_existing_replication_policy(sciobj_model)
+def _replication_policy_pyxb_to_model(sciobj_model, sysmeta_pyxb, node_dict=None):
+    """Create, update or remove the replication policy of the object.
 
-    replication_policy_model = d1_gmn.app.models.ReplicationPolicy()
-    replication_policy_model.sciobj = sciobj_model
-    replication_policy_model.replication_is_allowed = d1_common.xml.get_opt_attr(
-        sysmeta_pyxb.replicationPolicy,
+    Args:
+        node_dict: dict
+            URN to Node for the preferred and blocked nodes. If not provided, the Nodes
+            are looked up and created as required.
+
+    """
+    replication_policy_model = d1_gmn.app.models.ReplicationPolicy.objects.filter(
+        sciobj=sciobj_model
+    ).first()
+    if not _has_replication_policy_pyxb(sysmeta_pyxb):
+        if replication_policy_model:
+            replication_policy_model.delete()
+        return None
+
+    replication_policy_pyxb = sysmeta_pyxb.replicationPolicy
+    replication_is_allowed = d1_common.xml.get_opt_attr(
+        replication_policy_pyxb,
         "replicationAllowed",
         d1_common.const.DEFAULT_REPLICATION_ALLOWED,
     )
-    replication_policy_model.desired_number_of_replicas = d1_common.xml.get_opt_attr(
-        sysmeta_pyxb.replicationPolicy,
+    desired_number_of_replicas = d1_common.xml.get_opt_attr(
+        replication_policy_pyxb,
         "numberReplicas",
         d1_common.const.DEFAULT_NUMBER_OF_REPLICAS,
     )
 
-    replication_policy_model.save()
-
-    def add(node_ref_pyxb, rep_node_model):
-        for rep_node_urn in node_ref_pyxb:
-            # node_urn_model = d1_gmn.app.models.Node.objects.get_or_create(
-            #   urn=rep_node_urn.value()
-            # )[0]
-            node_urn_model = d1_gmn.app.models.node(
-                d1_common.xml.get_req_val(rep_node_urn)
+    if replication_policy_model is None:
+        replication_policy_model = d1_gmn.app.models.ReplicationPolicy.objects.create(
+            sciobj=sciobj_model,
+            replication_is_allowed=replication_is_allowed,
+            desired_number_of_replicas=desired_number_of_replicas,
+        )
+        is_created = True
+    else:
+        if (
+            replication_policy_model.replication_is_allowed,
+            replication_policy_model.desired_number_of_replicas,
+        ) != (replication_is_allowed, desired_number_of_replicas):
+            replication_policy_model.replication_is_allowed = replication_is_allowed
+            replication_policy_model.desired_number_of_replicas = (
+                desired_number_of_replicas
+            )
+            replication_policy_model.save()
+        is_created = False
+
+    if node_dict is None:
+        node_dict = d1_gmn.app.models.node_dict(_get_node_urn_set(sysmeta_pyxb))
+
+    def sync(node_ref_pyxb, rep_node_model):
+        node_urn_set = {d1_common.xml.get_req_val(v) for v in node_ref_pyxb}
+        delete_id_list = []
+        if not is_created:
+            for rep_node_id, node_urn in rep_node_model.objects.filter(
+                replication_policy=replication_policy_model
+            ).values_list("id", "node__urn"):
+                if node_urn in node_urn_set:
+                    node_urn_set.remove(node_urn)
+                else:
+                    delete_id_list.append(rep_node_id)
+        if delete_id_list:
+            rep_node_model.objects.filter(id__in=delete_id_list).delete()
+        if node_urn_set:
+            rep_node_model.objects.bulk_create(
+                [
+                    rep_node_model(
+                        node=node_dict[node_urn],
+                        replication_policy=replication_policy_model,
+                    )
+                    for node_urn in sorted(node_urn_set)
+                ]
             )
-            rep_node_obj = rep_node_model()
-            rep_node_obj.node = node_urn_model
-            rep_node_obj.replication_policy = replication_policy_model
-            rep_node_obj.save()
 
-    add(
-        sysmeta_pyxb.replicationPolicy.preferredMemberNode,
+    sync(
+        replication_policy_pyxb.preferredMemberNode,
         d1_gmn.app.models.PreferredMemberNode,
     )
-    add(
-        sysmeta_pyxb.replicationPolicy.blockedMemberNode,
-        d1_gmn.app.models.BlockedMemberNode,
-    )
+    sync(replication_policy_pyxb.blockedMemberNode, d1_gmn.app.models.BlockedMemberNode)
 
     return replication_policy_model
 
 
-def _has_replication_policy_db(sciobj_model):
-    return d1_gmn.app.models.ReplicationPolicy.objects.filter(
-        sciobj=sciobj_model
-    ).exists()
-
-
-def _delete_existing_replication_policy(sciobj_model):
-    d1_gmn.app.models.ReplicationPolicy.objects.filter(sciobj=sciobj_model).delete()
-
-
 def _has_replication_policy_pyxb(sysmeta_pyxb):
     return (
         hasattr(sysmeta_pyxb, "replicationPolicy")
@@ -495,9 +735,10 @@ def _has_replication_policy_pyxb(sysmeta_pyxb):
 
 
 def _replication_policy_model_to_pyxb(sciobj_model):
-    replication_policy_model = d1_gmn.app.models.ReplicationPolicy.objects.get(
-        sciobj=sciobj_model
-    )
+    try:
+        replication_policy_model = sciobj_model.replicationpolicy
+    except d1_gmn.app.models.ReplicationPolicy.DoesNotExist:
+        return None
     replication_policy_pyxb = d1_common.types.dataoneTypes.ReplicationPolicy()
     replication_policy_pyxb.replicationAllowed = (
         replication_policy_model.replication_is_allowed
@@ -506,31 +747,22 @@ def _replication_policy_model_to_pyxb(sciobj_model):
         replication_policy_model.desired_number_of_replicas
     )
 
-    def add(rep_pyxb, rep_node_model):
-        for rep_node in rep_node_model.objects.filter(
-            replication_policy=replication_policy_model
-        ).order_by("node__urn"):
-            rep_pyxb.append(rep_node.node.urn)
+    def add(rep_pyxb, rep_node_manager):
+        for node_urn in sorted(m.node.urn for m in rep_node_manager.all()):
+            rep_pyxb.append(node_urn)
 
     add(
         replication_policy_pyxb.preferredMemberNode,
-        d1_gmn.app.models.PreferredMemberNode,
+        replication_policy_model.preferredmembernode_set,
+    )
+    add(
+        replication_policy_pyxb.blockedMemberNode,
+        replication_policy_model.blockedmembernode_set,
     )
-    add(replication_policy_pyxb.blockedMemberNode, d1_gmn.app.models.BlockedMemberNode)
 
     return replication_policy_pyxb
 
 
-def revision_pyxb_to_model(sci_model, sysmeta_pyxb, pid):
-    sid = d1_common.xml.get_opt_val(sysmeta_pyxb, "seriesId")
-    obsoletes_pid = d1_common.xml.get_opt_val(sysmeta_pyxb, "obsoletes")
-    obsoleted_by_pid = d1_common.xml.get_opt_val(sysmeta_pyxb, "obsoletedBy")
-    d1_gmn.app.revision.set_revision_links(sci_model, obsoletes_pid, obsoleted_by_pid)
-    d1_gmn.app.revision.create_or_update_chain(
-        pid, sid, obsoletes_pid, obsoleted_by_pid
-    )
-
-
 # ------------------------------------------------------------------------------
 # Remote Replica
 # ------------------------------------------------------------------------------
@@ -542,30 +774,88 @@ def revision_pyxb_to_model(sci_model, sysmeta_pyxb, pid):
 # </replica>
 
 
-def replica_pyxb_to_model(sciobj_model, sysmeta_pyxb):
-    d1_gmn.app.models.RemoteReplica.objects.filter(sciobj=sciobj_model).delete()
-    for replica_pyxb in sysmeta_pyxb.replica:
-        _register_remote_replica(sciobj_model, replica_pyxb)
+def replica_pyxb_to_model(sciobj_model, sysmeta_pyxb, node_dict=None):
+    """Create, update or remove the remote replicas of the object.
 
+    Replicas are matched with the existing rows by replica Member Node. The rows of
+    replicas that are no longer listed are deleted, the rows of replicas for which
+    the status or verification timestamp has changed are updated and rows for new
+    replicas are inserted, each with a single statement.
+
+    Args:
+        node_dict: dict
+            URN to Node for the replica Member Nodes. If not provided, the Nodes are
+            looked up and created as required.
+
+    """
+    replica_dict = {
+        d1_common.xml.get_req_val(replica_pyxb.replicaMemberNode): replica_pyxb
+        for replica_pyxb in sysmeta_pyxb.replica
+    }
+    status_dict = {
+        status_str: d1_gmn.app.models.replica_status(status_str)
+        for status_str in {r.replicationStatus for r in replica_dict.values()}
+    }
+
+    delete_id_list = []
+    update_model_list = []
+    for replica_info_model in d1_gmn.app.models.ReplicaInfo.objects.filter(
+        remotereplica__sciobj=sciobj_model
+    ).select_related("member_node"):
+        replica_pyxb = replica_dict.pop(replica_info_model.member_node.urn, None)
+        if replica_pyxb is None:
+            delete_id_list.append(replica_info_model.id)
+            continue
+        status_model = status_dict[replica_pyxb.replicationStatus]
+        timestamp = _get_replica_verified_timestamp(replica_pyxb)
+        if (replica_info_model.status_id, replica_info_model.timestamp) != (
+            status_model.id,
+            timestamp,
+        ):
+            replica_info_model.status = status_model
+            replica_info_model.timestamp = timestamp
+            update_model_list.append(replica_info_model)
+
+    if delete_id_list:
+        # Cascades to RemoteReplica
+        d1_gmn.app.models.ReplicaInfo.objects.filter(id__in=delete_id_list).delete()
+    if update_model_list:
+        d1_gmn.app.models.ReplicaInfo.objects.bulk_update(
+            update_model_list, ["status", "timestamp"]
+        )
+    if replica_dict:
+        if node_dict is None:
+            node_dict = d1_gmn.app.models.node_dict(replica_dict)
+        replica_info_list = d1_gmn.app.models.ReplicaInfo.objects.bulk_create(
+            [
+                d1_gmn.app.models.ReplicaInfo(
+                    status=status_dict[replica_pyxb.replicationStatus],
+                    member_node=node_dict[node_urn],
+                    timestamp=_get_replica_verified_timestamp(replica_pyxb),
+                )
+                for node_urn, replica_pyxb in replica_dict.items()
+            ]
+        )
+        d1_gmn.app.models.RemoteReplica.objects.bulk_create(
+            [
+                d1_gmn.app.models.RemoteReplica(
+                    sciobj=sciobj_model, info=replica_info_model
+                )
+                for replica_info_model in replica_info_list
+            ]
+        )
 
-def _register_remote_replica(sciobj_model, replica_pyxb):
-    replica_info_model = d1_gmn.app.models.replica_info(
-        status_str=replica_pyxb.replicationStatus,
-        source_node_urn=d1_common.xml.get_req_val(replica_pyxb.replicaMemberNode),
-        timestamp=d1_common.date_time.normalize_datetime_to_utc(
-            replica_pyxb.replicaVerified
-        ),
-    )
-    d1_gmn.app.models.remote_replica(
-        sciobj_model=sciobj_model, replica_info_model=replica_info_model
-    )
+
+def _get_replica_verified_timestamp(replica_pyxb):
+    return d1_common.date_time.normalize_datetime_to_utc(replica_pyxb.replicaVerified)
 
 
 def replica_model_to_pyxb(sciobj_model):
     replica_pyxb_list = []
-    for replica_model in d1_gmn.app.models.RemoteReplica.objects.filter(
-        sciobj=sciobj_model
-    ).order_by("info__timestamp", "info__member_node__urn"):
+    for replica_model in sorted(
+        sciobj_model.remotereplica_set.all(),
+        key=lambda m: (m.info.timestamp, m.info.member_node.urn),
+    ):
         replica_pyxb = d1_common.types.dataoneTypes.Replica()
         replica_pyxb.replicaMemberNode = replica_model.info.member_node.urn
         replica_pyxb.replicationStatus = replica_model.info.status.status
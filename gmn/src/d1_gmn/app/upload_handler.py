@@ -0,0 +1,121 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Receive SciObj bytes for MNStorage.create() and MNStorage.update() in a single
+pass.
+
+Django's default upload handlers store the SciObj bytes in memory or in a temporary
+file. GMN then iterates over the bytes once to calculate the checksum, once more to
+copy them into the SciObj store, and validation of Science Metadata reads them again.
+
+SciObjUploadHandler handles the ``object`` MIME part. As each chunk arrives, it is
+added to the checksums for all supported algorithms and written to a temporary file
+in the SciObj store. When the upload completes, the size and checksums are available
+on the uploaded file, and the file can be moved into its final location in the store
+with a rename, since it is already on the same filesystem.
+
+The file is not written directly to the final location, as the PID has not been
+validated at that point and an existing object could be overwritten.
+
+Other MIME parts are passed on to the next handler in ``FILE_UPLOAD_HANDLERS``.
+
+"""
+import logging
+
+import d1_common.checksum
+
+import django.core.files.temp
+import django.core.files.uploadedfile
+import django.core.files.uploadhandler
+
+import d1_gmn.app.sciobj_store
+
+SCIOBJ_FIELD_NAME = "object"
+
+log = logging.getLogger(__name__)
+
+
+class SciObjUploadedFile(django.core.files.uploadedfile.TemporaryUploadedFile):
+    """SciObj bytes received into a temporary file in the SciObj store.
+
+    ``checksum_dict`` maps each supported checksum algorithm to the checksum of the
+    bytes, as a hex string.
+
+    """
+
+    def __init__(self, name, content_type, size, charset, content_type_extra=None):
+        sciobj_file = django.core.files.temp.NamedTemporaryFile(
+            suffix=".upload", dir=d1_gmn.app.sciobj_store.get_abs_upload_dir_path()
+        )
+        django.core.files.uploadedfile.UploadedFile.__init__(
+            self, sciobj_file, name, content_type, size, charset, content_type_extra
+        )
+        self.checksum_dict = {}
+
+
+class SciObjUploadHandler(django.core.files.uploadhandler.FileUploadHandler):
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.is_sciobj = False
+        self.calculator_dict = {}
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.is_sciobj = field_name == SCIOBJ_FIELD_NAME
+        if not self.is_sciobj:
+            return
+        # Algorithm names that designate the same hash function share a calculator.
+        self.calculator_dict = {}
+        for algorithm_str in d1_common.checksum.get_supported_algorithms():
+            hash_func = d1_common.checksum.DATAONE_TO_PYTHON_CHECKSUM_ALGORITHM_MAP[
+                algorithm_str
+            ]
+            self.calculator_dict.setdefault(hash_func, [hash_func(), []])[1].append(
+                algorithm_str
+            )
+        self.file = SciObjUploadedFile(
+            self.file_name, self.content_type, 0, self.charset, self.content_type_extra
+        )
+        raise django.core.files.uploadhandler.StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.is_sciobj:
+            return raw_data
+        for calculator, _ in self.calculator_dict.values():
+            calculator.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        if not self.is_sciobj:
+            return None
+        self.file.flush()
+        self.file.seek(0)
+        self.file.size = file_size
+        for calculator, algorithm_list in self.calculator_dict.values():
+            checksum_str = calculator.hexdigest()
+            for algorithm_str in algorithm_list:
+                self.file.checksum_dict[algorithm_str] = checksum_str
+        log.debug(
+            "Received SciObj. size={} checksum_dict={}".format(
+                file_size, self.file.checksum_dict
+            )
+        )
+        return self.file
+
+    def upload_interrupted(self):
+        if self.is_sciobj and hasattr(self, "file"):
+            self.file.close()
@@ -176,10 +176,7 @@ def _has_correct_file_size(request, sysmeta_pyxb):
 
 
 def _is_correct_checksum(request, sysmeta_pyxb):
-    checksum_calculator = d1_common.checksum.get_checksum_calculator_by_dataone_designator(
-        sysmeta_pyxb.checksum.algorithm
-    )
-    checksum_str = calculate_checksum(request, checksum_calculator)
+    checksum_str = calculate_checksum(request, sysmeta_pyxb.checksum.algorithm)
     if sysmeta_pyxb.checksum.value().lower() != checksum_str.lower():
         raise d1_common.types.exceptions.InvalidSystemMetadata(
             0,
@@ -205,7 +202,20 @@ def _is_supported_checksum_algorithm(sysmeta_pyxb):
         )
 
 
-def calculate_checksum(request, checksum_calculator):
-    for chunk in request.FILES["object"].chunks():
+def calculate_checksum(request, algorithm_str):
+    """Get the checksum of the uploaded SciObj bytes.
+
+    The checksum calculated by SciObjUploadHandler while the bytes were received is
+    used if available. Otherwise, the bytes are read and the checksum calculated here.
+
+    """
+    sciobj_file = request.FILES["object"]
+    checksum_dict = getattr(sciobj_file, "checksum_dict", {})
+    if algorithm_str in checksum_dict:
+        return checksum_dict[algorithm_str]
+    checksum_calculator = d1_common.checksum.get_checksum_calculator_by_dataone_designator(
+        algorithm_str
+    )
+    for chunk in sciobj_file.chunks():
         checksum_calculator.update(chunk)
     return checksum_calculator.hexdigest()
@@ -123,8 +123,10 @@ def _save_sciobj_bytes_from_request(request, pid):
     Uploads stored in memory are represented by UploadedFile and on disk,
     TemporaryUploadedFile. To store an UploadedFile on disk, it's iterated and saved in
     chunks. To store a TemporaryUploadedFile, it's moved from the temporary to the final
-    location. Django automatically handles this when using the file related fields in
-    the models, but GMN is not using those, so has to do it manually here.
+    location. SciObjUploadHandler receives the SciObj bytes into a TemporaryUploadedFile
+    in the SciObj store, so the move is a rename. Django automatically handles this when
+    using the file related fields in the models, but GMN is not using those, so has to
+    do it manually here.
 
     """
     sciobj_path = d1_gmn.app.sciobj_store.get_abs_sciobj_file_path_by_pid(pid)
@@ -30,6 +30,8 @@ import d1_client.cnclient
 
 import django.conf
 import django.http
+import django.utils.cache
+import django.utils.http
 
 import d1_gmn.app.auth
 import d1_gmn.app.db_filter
@@ -41,6 +43,7 @@ import d1_gmn.app.models
 import d1_gmn.app.node
 import d1_gmn.app.object_format_cache
 import d1_gmn.app.proxy
+import d1_gmn.app.query_count
 import d1_gmn.app.sciobj_store
 import d1_gmn.app.sysmeta
 import d1_gmn.app.util
@@ -49,6 +52,7 @@ import d1_gmn.app.views.assert_sysmeta
 import d1_gmn.app.views.create
 import d1_gmn.app.views.decorators
 import d1_gmn.app.views.headers
+import d1_gmn.app.views.sciobj_response
 import d1_gmn.app.views.slice
 import d1_gmn.app.views.util
 
@@ -127,11 +131,13 @@ def get_log(request):
 
     """
     query = d1_gmn.app.models.EventLog.objects.all().order_by("timestamp", "id")
+    field_list = list(d1_gmn.app.views.util.LOG_FIELD_LIST)
     if not d1_gmn.app.auth.is_trusted_subject(request):
         query = d1_gmn.app.db_filter.add_access_policy_filter(
-            request, query, "sciobj__id"
+            request, query, "sciobj_id"
         )
         query = d1_gmn.app.db_filter.add_redact_annotation(request, query)
+        field_list.append("redact")
     query = d1_gmn.app.db_filter.add_datetime_filter(
         request, query, "timestamp", "fromDate", "gte"
     )
@@ -151,7 +157,10 @@ def get_log(request):
         )
     else:
         assert False, "Unable to determine API version"
-    total_int = query.count()
+    query = query.values(*field_list)
+    total_int = d1_gmn.app.query_count.get_total(
+        request, d1_gmn.app.query_count.LOG, query
+    )
     query, start, count = d1_gmn.app.views.slice.add_slice_filter(
         request, query, total_int
     )
@@ -168,8 +177,18 @@ def get_log(request):
 def get_node(request):
     """MNCore.getCapabilities() → Node."""
     api_major_int = 2 if d1_gmn.app.views.util.is_v2_api(request) else 1
-    node_pretty_xml = d1_gmn.app.node.get_pretty_xml(api_major_int)
-    return django.http.HttpResponse(node_pretty_xml, d1_common.const.CONTENT_TYPE_XML)
+    node_doc = d1_gmn.app.node.get_doc(api_major_int)
+    response = django.http.HttpResponse(
+        node_doc.xml_bytes, d1_common.const.CONTENT_TYPE_XML
+    )
+    response["ETag"] = node_doc.etag_str
+    last_modified = None
+    if node_doc.modified_timestamp is not None:
+        last_modified = int(node_doc.modified_timestamp.timestamp())
+        response["Last-Modified"] = django.utils.http.http_date(last_modified)
+    return django.utils.cache.get_conditional_response(
+        request, etag=node_doc.etag_str, last_modified=last_modified, response=response
+    )
 
 
 # ------------------------------------------------------------------------------
@@ -188,11 +207,12 @@ def get_object(request, pid):
         sciobj.format.format
     )
     # Return local or proxy SciObj bytes
-    response = django.http.StreamingHttpResponse(
-        _get_sciobj_iter(sciobj), content_type_str
+    response = d1_gmn.app.views.sciobj_response.create_sciobj_response(
+        request, sciobj, content_type_str
     )
-    d1_gmn.app.views.headers.add_sciobj_properties_headers_to_response(response, sciobj)
-    d1_gmn.app.event_log.log_read_event(pid, request)
+    # Conditional requests that are answered with 304 do not transfer the object.
+    if response.status_code in (200, 206):
+        d1_gmn.app.event_log.log_read_event(pid, request)
     return response
 
 
@@ -208,11 +228,19 @@ def _get_sciobj_iter(sciobj):
 @d1_gmn.app.views.decorators.read_permission
 def get_meta(request, pid):
     """MNRead.getSystemMetadata(session, pid) → SystemMetadata."""
+    sciobj = d1_gmn.app.models.ScienceObject.objects.get(pid__did=pid)
+    conditional_response = d1_gmn.app.views.headers.get_conditional_response(
+        request, sciobj, d1_gmn.app.views.headers.get_sysmeta_etag(request, sciobj)
+    )
+    if conditional_response is not None:
+        return conditional_response
     d1_gmn.app.event_log.log_read_event(pid, request)
-    return django.http.HttpResponse(
+    response = django.http.HttpResponse(
         d1_gmn.app.views.util.generate_sysmeta_xml_matching_api_version(request, pid),
         d1_common.const.CONTENT_TYPE_XML,
     )
+    d1_gmn.app.views.headers.add_sysmeta_headers_to_response(response, request, sciobj)
+    return response
 
 
 @d1_gmn.app.views.decorators.decode_did
@@ -221,6 +249,11 @@ def get_meta(request, pid):
 def head_object(request, pid):
     """MNRead.describe(session, did) → DescribeResponse."""
     sciobj = d1_gmn.app.models.ScienceObject.objects.get(pid__did=pid)
+    conditional_response = d1_gmn.app.views.headers.get_conditional_response(
+        request, sciobj, d1_gmn.app.views.headers.get_sciobj_etag(sciobj)
+    )
+    if conditional_response is not None:
+        return conditional_response
     response = django.http.HttpResponse()
     d1_gmn.app.views.headers.add_sciobj_properties_headers_to_response(response, sciobj)
     d1_gmn.app.event_log.log_read_event(pid, request)
@@ -330,13 +363,13 @@ def get_replica(request, pid):
     content_type_str = d1_gmn.app.object_format_cache.get_content_type(
         sciobj.format.format
     )
-    # Replica is always a local file that can be handled with FileResponse()
-    response = django.http.FileResponse(
-        d1_gmn.app.sciobj_store.open_sciobj_file_by_pid(pid), content_type_str
+    # Replica is always a local file
+    response = d1_gmn.app.views.sciobj_response.create_sciobj_response(
+        request, sciobj, content_type_str
     )
-    d1_gmn.app.views.headers.add_sciobj_properties_headers_to_response(response, sciobj)
     # Log the replication of this object.
-    d1_gmn.app.event_log.log_replicate_event(pid, request)
+    if response.status_code in (200, 206):
+        d1_gmn.app.event_log.log_replicate_event(pid, request)
     return response
 
 
@@ -21,10 +21,15 @@ import d1_common.checksum
 import d1_common.const
 import d1_common.iter.bytes
 import d1_common.types.exceptions
+import d1_common.xml
 
+import django.conf
 import django.http
 
 import d1_gmn.app.model_util
+import d1_gmn.app.models
+import d1_gmn.app.object_format_cache
+import d1_gmn.app.package_cache
 import d1_gmn.app.resource_map
 import d1_gmn.app.sciobj_store
 import d1_gmn.app.sysmeta
@@ -52,8 +57,10 @@ def _get_package(request, pid, package_type):
             ),
         )
     pid_list = d1_gmn.app.resource_map.get_resource_map_members(pid)
-    sciobj_info_list = _create_sciobj_info_list(request, pid_list)
-    bagit_file = d1_common.bagit.create_bagit_stream(pid, sciobj_info_list)
+    if django.conf.settings.PACKAGE_CACHE_ENABLED:
+        bagit_file = _get_cached_bagit_stream(request, pid, pid_list)
+    else:
+        bagit_file = _create_bagit_stream(request, pid, pid_list)
     response = django.http.StreamingHttpResponse(
         bagit_file, content_type="application/zip"
     )
@@ -64,43 +71,71 @@ def _get_package(request, pid, package_type):
     return response
 
 
+def _get_cached_bagit_stream(request, pid, pid_list):
+    package_path = d1_gmn.app.package_cache.get_path(request, pid, pid_list)
+    bagit_file = d1_gmn.app.package_cache.get_iter(package_path)
+    if bagit_file is not None:
+        return bagit_file
+    return d1_gmn.app.package_cache.write_iter(
+        package_path, _create_bagit_stream(request, pid, pid_list)
+    )
+
+
+def _create_bagit_stream(request, pid, pid_list):
+    return d1_common.bagit.create_bagit_stream(
+        pid, _create_sciobj_info_list(request, pid_list)
+    )
+
+
 def _create_sciobj_info_list(request, pid_list):
     sciobj_info_list = []
-    for pid in pid_list:
-        # Skip any sciobj which are aggregated by the package but do not exist locally.
-        # TODO: Handle proxy sciobj.
-        if not d1_gmn.app.sciobj_store.is_existing_sciobj_file(pid):
-            continue
-        sciobj_model = d1_gmn.app.model_util.get_sci_model(pid)
-        sciobj_info_list.append(_create_sciobj_info_dict(sciobj_model))
-        sciobj_info_list.append(_create_sysmeta_info_dict(request, sciobj_model))
+    # Skip any sciobj which are aggregated by the package but do not exist locally.
+    # TODO: Handle proxy sciobj.
+    pid_list = [
+        pid for pid in pid_list if d1_gmn.app.sciobj_store.is_existing_sciobj_file(pid)
+    ]
+    filename_dict = _get_filename_dict(pid_list)
+    for pid, sysmeta_pyxb in d1_gmn.app.sysmeta.model_to_pyxb_many(pid_list):
+        filename = filename_dict[pid]
+        sciobj_info_list.append(_create_sciobj_info_dict(pid, filename, sysmeta_pyxb))
+        sciobj_info_list.append(
+            _create_sysmeta_info_dict(request, pid, filename, sysmeta_pyxb)
+        )
     return sciobj_info_list
 
 
-def _create_sciobj_info_dict(sciobj_model):
+def _get_filename_dict(pid_list):
+    """Get the safe filename of each object, with a single query."""
     return {
-        "pid": sciobj_model.pid.did,
-        "filename": d1_gmn.app.sysmeta.get_filename(sciobj_model),
-        "iter": d1_gmn.app.sciobj_store.get_sciobj_iter_by_pid(sciobj_model.pid.did),
-        "checksum": sciobj_model.checksum,
-        "checksum_algorithm": sciobj_model.checksum_algorithm.checksum_algorithm,
+        sciobj_model.pid.did: d1_gmn.app.sysmeta.get_filename(sciobj_model)
+        for sciobj_model in d1_gmn.app.models.ScienceObject.objects.filter(
+            pid__did__in=pid_list
+        ).select_related("pid", "format")
     }
 
 
-def _create_sysmeta_info_dict(request, sciobj_model):
-    sysmeta_iter = _create_sysmeta_iterator(request, sciobj_model.pid.did)
+def _create_sciobj_info_dict(pid, filename, sysmeta_pyxb):
     return {
-        "pid": sciobj_model.pid.did,
-        "filename": "{}.sysmeta.xml".format(
-            d1_gmn.app.sysmeta.get_filename(sciobj_model)
+        "pid": pid,
+        "filename": filename,
+        "iter": d1_gmn.app.sciobj_store.get_sciobj_iter_by_pid(pid),
+        "checksum": d1_common.xml.get_req_val(sysmeta_pyxb.checksum),
+        "checksum_algorithm": sysmeta_pyxb.checksum.algorithm,
+        "compress": d1_gmn.app.object_format_cache.is_compressible(
+            sysmeta_pyxb.formatId
         ),
-        "iter": sysmeta_iter,
-        "checksum": d1_common.checksum.calculate_checksum_on_iterator(sysmeta_iter),
-        "checksum_algorithm": d1_common.const.DEFAULT_CHECKSUM_ALGORITHM,
     }
 
 
-def _create_sysmeta_iterator(request, pid):
-    return d1_common.iter.bytes.BytesIterator(
-        d1_gmn.app.views.util.generate_sysmeta_xml_matching_api_version(request, pid)
+def _create_sysmeta_info_dict(request, pid, filename, sysmeta_pyxb):
+    # The serialized System Metadata is used for both the checksum and the payload.
+    sysmeta_xml_bytes = d1_gmn.app.views.util.serialize_sysmeta_matching_api_version(
+        request, sysmeta_pyxb
     )
+    return {
+        "pid": pid,
+        "filename": "{}.sysmeta.xml".format(filename),
+        "iter": d1_common.iter.bytes.BytesIterator(sysmeta_xml_bytes),
+        "checksum": d1_common.checksum.calculate_checksum_on_bytes(sysmeta_xml_bytes),
+        "checksum_algorithm": d1_common.const.DEFAULT_CHECKSUM_ALGORITHM,
+    }
@@ -23,11 +23,14 @@ import d1_common.date_time
 import d1_common.url
 
 import django.conf
+import django.http
+import django.utils.cache
 
 import d1_gmn.app
 import d1_gmn.app.object_format_cache
 import d1_gmn.app.revision
 import d1_gmn.app.sysmeta
+import d1_gmn.app.views.util
 
 
 def add_sciobj_properties_headers_to_response(response, sciobj_model):
@@ -53,6 +56,73 @@ def add_bagit_zip_properties_headers_to_response(response, sciobj_model):
     _add_bagit_custom_dataone(response)
 
 
+def add_sysmeta_headers_to_response(response, request, sciobj_model):
+    """Add headers for the SysMeta of SciObj to response."""
+    _add_standard(response, sciobj_model)
+    response["ETag"] = get_sysmeta_etag(request, sciobj_model)
+
+
+def get_sciobj_etag(sciobj_model):
+    """Get an ETag for the bytes of SciObj.
+
+    The bytes of a SciObj cannot change, so the stored checksum is used as a strong
+    ETag.
+
+    """
+    return '"{}:{}"'.format(
+        sciobj_model.checksum_algorithm.checksum_algorithm, sciobj_model.checksum
+    )
+
+
+def get_sysmeta_etag(request, sciobj_model):
+    """Get an ETag for the SysMeta of SciObj.
+
+    The SysMeta can change without changes to the bytes, and is serialized differently
+    for v1 and v2 of the API, so the checksum is combined with the modified timestamp
+    and API version.
+
+    """
+    return '"{}:{}:{}:{}"'.format(
+        sciobj_model.checksum_algorithm.checksum_algorithm,
+        sciobj_model.checksum,
+        int(
+            d1_common.date_time.normalize_datetime_to_utc(
+                sciobj_model.modified_timestamp
+            ).timestamp()
+            * 1000000
+        ),
+        "v1" if d1_gmn.app.views.util.is_v1_api(request) else "v2",
+    )
+
+
+def get_conditional_response(request, sciobj_model, etag_str):
+    """Get a response for a conditional request.
+
+    Returns:
+        HttpResponse: 304 Not Modified if ``If-None-Match`` or ``If-Modified-Since``
+        show that the client already has the current version, or 412 Precondition
+        Failed if ``If-Match`` or ``If-Unmodified-Since`` do not match.
+
+        None: The request is not conditional, or the conditions are met, so a full
+        response must be returned.
+
+    """
+    response = django.http.HttpResponse()
+    _add_standard(response, sciobj_model)
+    response["ETag"] = etag_str
+    conditional_response = django.utils.cache.get_conditional_response(
+        request,
+        etag=etag_str,
+        last_modified=int(
+            d1_common.date_time.normalize_datetime_to_utc(
+                sciobj_model.modified_timestamp
+            ).timestamp()
+        ),
+        response=response,
+    )
+    return None if conditional_response is response else conditional_response
+
+
 def add_cors(response, request):
     """Add Cross-Origin Resource Sharing (CORS) headers to response.
 
@@ -88,6 +158,7 @@ def _add_standard(response, sciobj_model):
 
 def _add_sciobj_standard(response, sciobj_model):
     response["Content-Length"] = str(sciobj_model.size)
+    response["ETag"] = get_sciobj_etag(sciobj_model)
     response["Content-Type"] = d1_gmn.app.object_format_cache.get_content_type(
         sciobj_model
     )
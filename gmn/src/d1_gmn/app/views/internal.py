@@ -40,6 +40,8 @@ import django.http
 import django.shortcuts
 import django.urls.base
 
+import d1_gmn.app.cache
+import d1_gmn.app.middleware.session_jwt
 import d1_gmn.app.models
 
 
@@ -139,6 +141,8 @@ def get_context_dict():
         "sciobjCountByFormat": get_object_count_by_format(),
         "description": django.conf.settings.NODE_DESCRIPTION,
         "mnLogoUrl": django.conf.settings.NODE_LOGO_URL,
+        "jwtCacheStats": d1_gmn.app.middleware.session_jwt.get_cache_stats(),
+        "cacheStats": d1_gmn.app.cache.get_stats(),
     }
 
 
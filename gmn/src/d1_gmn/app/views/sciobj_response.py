@@ -0,0 +1,358 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Create responses that deliver the bytes of a SciObj.
+
+Locally stored SciObj are delivered according to the SCIOBJ_DELIVERY_MODE setting:
+
+- ``stream``: The file is read in chunks by GMN and streamed to the client.
+
+- ``file``: The file is returned in a FileResponse. If the WSGI server provides
+  ``wsgi.file_wrapper``, such as mod_wsgi and Gunicorn, the file is sent with
+  ``sendfile()`` without passing through Python.
+
+- ``x_sendfile``: The file path is returned in an ``X-Sendfile`` header and the file is
+  sent by the front-end server, e.g., Apache with mod_xsendfile.
+
+- ``x_accel_redirect``: A URL for the file, based on SCIOBJ_X_ACCEL_REDIRECT_URL, is
+  returned in an ``X-Accel-Redirect`` header and the file is sent by Nginx.
+
+Byte ranges requested in the ``Range`` header are served from the local store, as a
+single part for a single range, and as ``multipart/byteranges`` for multiple ranges.
+For the ``x_sendfile`` and ``x_accel_redirect`` modes, ranges are handled by the
+front-end server. For proxy objects, the ``Range`` header is forwarded to the remote
+server.
+
+Conditional requests (``If-None-Match``, ``If-Modified-Since``, ``If-Match``,
+``If-Unmodified-Since`` and ``If-Range``) are evaluated against an ETag that is based
+on the stored checksum, and the modified timestamp of the SciObj.
+
+"""
+
+import os
+import re
+import uuid
+
+import d1_common.date_time
+
+import django.conf
+import django.http
+
+import d1_gmn.app.proxy
+import d1_gmn.app.sciobj_store
+import d1_gmn.app.views.headers
+
+RANGE_SPEC_RX = re.compile(r"\s*(\d*)\s*-\s*(\d*)\s*$")
+
+# Range headers with more than this number of ranges are ignored, and the full object
+# is returned.
+MAX_RANGE_COUNT = 100
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def create_sciobj_response(request, sciobj_model, content_type_str):
+    """Create a response that delivers the bytes of a local or proxy SciObj."""
+    etag_str = d1_gmn.app.views.headers.get_sciobj_etag(sciobj_model)
+    conditional_response = d1_gmn.app.views.headers.get_conditional_response(
+        request, sciobj_model, etag_str
+    )
+    if conditional_response is not None:
+        return conditional_response
+    if d1_gmn.app.proxy.is_proxy_url(sciobj_model.url):
+        return _create_proxy_response(request, sciobj_model, content_type_str)
+    abs_path = d1_gmn.app.sciobj_store.get_abs_sciobj_file_path_by_url(sciobj_model.url)
+    response = _create_front_end_response(abs_path, content_type_str)
+    if response is not None:
+        d1_gmn.app.views.headers.add_sciobj_properties_headers_to_response(
+            response, sciobj_model
+        )
+        # The front-end server sets the length of the file, or range, it sends.
+        del response["Content-Length"]
+        return response
+    try:
+        byte_range_list = get_byte_range_list(
+            request, sciobj_model.size, _get_validator_list(sciobj_model)
+        )
+    except RangeNotSatisfiable:
+        return _create_range_not_satisfiable_response(sciobj_model.size)
+    if byte_range_list is None:
+        response = _create_local_response(
+            abs_path, content_type_str, sciobj_model.size, None
+        )
+        _add_local_headers(response, sciobj_model)
+        return response
+    if len(byte_range_list) == 1:
+        first_byte, last_byte = byte_range_list[0]
+        response = _create_local_response(
+            abs_path, content_type_str, sciobj_model.size, (first_byte, last_byte)
+        )
+        _add_local_headers(response, sciobj_model)
+        response.status_code = 206
+        response["Content-Length"] = str(last_byte - first_byte + 1)
+        response["Content-Range"] = "bytes {}-{}/{}".format(
+            first_byte, last_byte, sciobj_model.size
+        )
+        return response
+    response, content_length = _create_multipart_response(
+        abs_path, content_type_str, sciobj_model.size, byte_range_list
+    )
+    multipart_content_type = response["Content-Type"]
+    _add_local_headers(response, sciobj_model)
+    response.status_code = 206
+    response["Content-Length"] = str(content_length)
+    response["Content-Type"] = multipart_content_type
+    return response
+
+
+def get_byte_range_list(request, size, validator_list=None):
+    """Get the byte ranges requested in the Range header.
+
+    Args:
+        validator_list: The ETag and Last-Modified values for the current version of
+        the SciObj. If an ``If-Range`` header is present and does not match one of the
+        values, the Range header is ignored.
+
+    Returns:
+        list of 2-tuple of int: First and last byte, inclusive, of each of the
+        requested ranges that overlap the object.
+
+        None: The full object was requested. Range headers that cannot be parsed, that
+        hold more than MAX_RANGE_COUNT ranges, or for which the ``If-Range`` condition
+        fails, are ignored, as required by RFC 7233.
+
+    Raises:
+        RangeNotSatisfiable: None of the ranges overlap the object.
+
+    """
+    range_str = request.META.get("HTTP_RANGE")
+    if range_str is None:
+        return None
+    if_range_str = request.META.get("HTTP_IF_RANGE")
+    if if_range_str is not None and if_range_str.strip() not in (validator_list or []):
+        return None
+    unit_str, sep_str, range_set_str = range_str.partition("=")
+    if unit_str.strip().lower() != "bytes" or not sep_str:
+        return None
+    spec_list = [v for v in range_set_str.split(",") if v.strip()]
+    if not spec_list or len(spec_list) > MAX_RANGE_COUNT:
+        return None
+    byte_range_list = []
+    for spec_str in spec_list:
+        m = RANGE_SPEC_RX.match(spec_str)
+        if not m or m.group(1) == m.group(2) == "":
+            return None
+        if m.group(1) != "" and m.group(2) != "" and int(m.group(2)) < int(m.group(1)):
+            return None
+        byte_range = _get_satisfiable_range(m.group(1), m.group(2), size)
+        if byte_range is not None:
+            byte_range_list.append(byte_range)
+    if not byte_range_list:
+        raise RangeNotSatisfiable()
+    return byte_range_list
+
+
+def _get_satisfiable_range(first_str, last_str, size):
+    """Get the part of a range spec that overlaps the object.
+
+    Returns None if the range does not overlap the object.
+
+    """
+    if first_str == "":
+        suffix_len = int(last_str)
+        if suffix_len == 0 or size == 0:
+            return None
+        return max(size - suffix_len, 0), size - 1
+    first_byte = int(first_str)
+    if first_byte >= size:
+        return None
+    last_byte = size - 1 if last_str == "" else min(int(last_str), size - 1)
+    return first_byte, last_byte
+
+
+def _get_validator_list(sciobj_model):
+    return [
+        d1_gmn.app.views.headers.get_sciobj_etag(sciobj_model),
+        d1_common.date_time.http_datetime_str_from_dt(
+            d1_common.date_time.normalize_datetime_to_utc(
+                sciobj_model.modified_timestamp
+            )
+        ),
+    ]
+
+
+def _create_range_not_satisfiable_response(size):
+    response = django.http.HttpResponse(status=416)
+    response["Content-Range"] = "bytes */{}".format(size)
+    return response
+
+
+def _create_proxy_response(request, sciobj_model, content_type_str):
+    """Create a response that streams a proxy object from the remote server.
+
+    The Range header is forwarded to the remote server, unless an If-Range condition
+    fails. If the remote server does not support ranges, the full object is returned.
+
+    """
+    header_dict = {}
+    if "HTTP_RANGE" in request.META:
+        try:
+            if get_byte_range_list(
+                request, sciobj_model.size, _get_validator_list(sciobj_model)
+            ):
+                header_dict["Range"] = request.META["HTTP_RANGE"]
+        except RangeNotSatisfiable:
+            return _create_range_not_satisfiable_response(sciobj_model.size)
+    remote_response = d1_gmn.app.proxy.get_sciobj_response_remote(
+        sciobj_model.url, header_dict
+    )
+    response = django.http.StreamingHttpResponse(
+        remote_response.iter_content(chunk_size=django.conf.settings.NUM_CHUNK_BYTES),
+        content_type_str,
+    )
+    d1_gmn.app.views.headers.add_sciobj_properties_headers_to_response(
+        response, sciobj_model
+    )
+    if header_dict and remote_response.status_code == 206:
+        response.status_code = 206
+        if "Content-Length" in remote_response.headers:
+            response["Content-Length"] = remote_response.headers["Content-Length"]
+        else:
+            del response["Content-Length"]
+        if "Content-Range" in remote_response.headers:
+            response["Content-Range"] = remote_response.headers["Content-Range"]
+        else:
+            # Multiple ranges, so the Content-Type holds the multipart boundary.
+            response["Content-Type"] = remote_response.headers["Content-Type"]
+    return response
+
+
+def _create_front_end_response(abs_path, content_type_str):
+    """Create a response that hands delivery of the file to the front-end server.
+
+    Returns None if delivery is not handled by the front-end server in the current
+    SCIOBJ_DELIVERY_MODE, or if the file is outside of the SciObj store, so cannot be
+    mapped to a URL for ``X-Accel-Redirect``.
+
+    """
+    delivery_mode = django.conf.settings.SCIOBJ_DELIVERY_MODE
+    if delivery_mode == "x_sendfile":
+        response = django.http.HttpResponse(content_type=content_type_str)
+        response["X-Sendfile"] = abs_path
+        return response
+    if delivery_mode == "x_accel_redirect":
+        store_path = d1_gmn.app.sciobj_store.get_abs_sciobj_store_path()
+        rel_path = os.path.relpath(abs_path, store_path)
+        if rel_path.startswith(os.pardir):
+            return None
+        response = django.http.HttpResponse(content_type=content_type_str)
+        response["X-Accel-Redirect"] = "{}/{}".format(
+            django.conf.settings.SCIOBJ_X_ACCEL_REDIRECT_URL.rstrip("/"), rel_path
+        )
+        return response
+    return None
+
+
+def _create_local_response(abs_path, content_type_str, size, byte_range):
+    """Create a response that delivers the file, or a range of the file, from GMN.
+
+    FileResponse is used for the ``file`` delivery mode when the response extends to
+    the end of the file, so that the WSGI server can send it with ``sendfile()``.
+
+    """
+    sciobj_file = d1_gmn.app.sciobj_store.open_sciobj_file_by_path(abs_path)
+    first_byte, last_byte = byte_range or (0, size - 1)
+    if django.conf.settings.SCIOBJ_DELIVERY_MODE != "stream" and last_byte == size - 1:
+        sciobj_file.seek(first_byte)
+        response = django.http.FileResponse(sciobj_file, content_type=content_type_str)
+        response.block_size = django.conf.settings.NUM_CHUNK_BYTES
+        return response
+    return django.http.StreamingHttpResponse(
+        _iter_file_range_and_close(sciobj_file, first_byte, last_byte),
+        content_type_str,
+    )
+
+
+def _add_local_headers(response, sciobj_model):
+    d1_gmn.app.views.headers.add_sciobj_properties_headers_to_response(
+        response, sciobj_model
+    )
+    response["Accept-Ranges"] = "bytes"
+
+
+def _create_multipart_response(abs_path, content_type_str, size, byte_range_list):
+    """Create a ``multipart/byteranges`` response for multiple ranges of the file.
+
+    Returns:
+        2-tuple: The response and the length of the multipart body.
+
+    """
+    boundary_str = uuid.uuid4().hex
+    part_list = []
+    content_length = 0
+    for first_byte, last_byte in byte_range_list:
+        part_header_bytes = (
+            "\r\n--{}\r\n"
+            "Content-Type: {}\r\n"
+            "Content-Range: bytes {}-{}/{}\r\n\r\n".format(
+                boundary_str, content_type_str, first_byte, last_byte, size
+            )
+        ).encode("utf-8")
+        part_list.append((part_header_bytes, first_byte, last_byte))
+        content_length += len(part_header_bytes) + last_byte - first_byte + 1
+    end_bytes = "\r\n--{}--\r\n".format(boundary_str).encode("utf-8")
+    content_length += len(end_bytes)
+    response = django.http.StreamingHttpResponse(
+        _iter_multipart(abs_path, part_list, end_bytes),
+        "multipart/byteranges; boundary={}".format(boundary_str),
+    )
+    return response, content_length
+
+
+def _iter_multipart(abs_path, part_list, end_bytes):
+    sciobj_file = d1_gmn.app.sciobj_store.open_sciobj_file_by_path(abs_path)
+    try:
+        for part_header_bytes, first_byte, last_byte in part_list:
+            yield part_header_bytes
+            yield from _iter_file_range(sciobj_file, first_byte, last_byte)
+        yield end_bytes
+    finally:
+        sciobj_file.close()
+
+
+def _iter_file_range_and_close(sciobj_file, first_byte, last_byte):
+    try:
+        yield from _iter_file_range(sciobj_file, first_byte, last_byte)
+    finally:
+        sciobj_file.close()
+
+
+def _iter_file_range(sciobj_file, first_byte, last_byte):
+    """Yield chunks of the file from ``first_byte`` up to and including
+    ``last_byte``."""
+    sciobj_file.seek(first_byte)
+    remaining_int = last_byte - first_byte + 1
+    while remaining_int > 0:
+        chunk_bytes = sciobj_file.read(
+            min(django.conf.settings.NUM_CHUNK_BYTES, remaining_int)
+        )
+        if not chunk_bytes:
+            break
+        remaining_int -= len(chunk_bytes)
+        yield chunk_bytes
@@ -15,13 +15,35 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-"""Handle slicing / paging of multi-page result set."""
+"""Handle slicing / paging of multi-page result set.
 
+Slices are selected with one of the following methods, in order of preference:
+
+- Resume token: The response for each slice includes a VENDOR-GMN-RESUME-TOKEN header
+  holding an opaque token that designates the position of the next slice. When the
+  client passes the token back in a VENDOR-GMN-RESUME-TOKEN request header, the slice
+  is selected with a keyset ("seek") filter on the sort fields. This does not depend
+  on any server side state, so it works across processes and restarts.
+
+- Slice cache: The sort key of the last item in each returned slice is cached under a
+  key generated from the URL that the client is expected to use for the next slice.
+
+- Checkpoints: The sort keys at every SLICE_CHECKPOINT_INTERVAL position in the
+  result set are cached, so that a slice at an arbitrary ``start`` can be selected
+  with a keyset filter from the nearest checkpoint followed by a short OFFSET.
+  Missing checkpoints are created on demand, each by an OFFSET of at most
+  SLICE_CHECKPOINT_INTERVAL from the previous checkpoint.
+
+"""
+
+import base64
 import copy
 import hashlib
+import json
 import logging
 
 import d1_common.const
+import d1_common.date_time
 import d1_common.types
 import d1_common.types.exceptions
 import d1_common.url
@@ -29,51 +51,94 @@ import d1_common.util
 import d1_common.utils.ulog
 
 import django.conf
-import django.core.cache
 import django.db.models
 
+import d1_gmn.app.cache
+
 # import logging
 
+RESUME_TOKEN_HEADER = "VENDOR-GMN-RESUME-TOKEN"
+RESUME_TOKEN_META_KEY = "HTTP_VENDOR_GMN_RESUME_TOKEN"
+
+SORT_FIELD_LIST = ["timestamp", "id"]
+
 
 def add_slice_filter(request, query, total_int):
     url_dict = d1_common.url.parseUrl(request.get_full_path())
-    start_int = _get_and_assert_slice_param(url_dict, "start", 0)
+    authn_subj_list = _get_authenticated_subj_list(request)
+    resume_tup = _get_resume_token(request, url_dict, authn_subj_list)
+    if resume_tup:
+        start_int, last_ts_tup = resume_tup
+    else:
+        start_int = _get_and_assert_slice_param(url_dict, "start", 0)
+        last_ts_tup = None
     count_int = _get_and_assert_slice_param(
         url_dict, "count", d1_common.const.DEFAULT_SLICE_SIZE
     )
     _assert_valid_start(start_int, count_int, total_int)
     count_int = _adjust_count_if_required(start_int, count_int, total_int)
-    authn_subj_list = _get_authenticated_subj_list(request)
     logging.debug(
         "Adding slice filter. start={} count={} total={} subj={}".format(
             start_int, count_int, total_int, ",".join(authn_subj_list)
         )
     )
-    last_ts_tup = _cache_get_last_in_slice(
-        url_dict, start_int, total_int, authn_subj_list
-    )
+    if not last_ts_tup:
+        last_ts_tup = _cache_get_last_in_slice(
+            url_dict, start_int, total_int, authn_subj_list
+        )
     if last_ts_tup:
         query = _add_fast_slice_filter(query, last_ts_tup, count_int)
+    elif start_int >= _get_checkpoint_interval() and count_int:
+        query = _add_checkpoint_slice_filter(
+            query, url_dict, start_int, count_int, total_int, authn_subj_list
+        )
     else:
         query = _add_fallback_slice_filter(query, start_int, count_int, total_int)
     return query, start_int, count_int
 
 
-def cache_add_last_in_slice(request, query, start_int, total_int, sort_field_list):
-    """"""
+def get_count_and_last_in_slice(query, sort_field_list):
+    """Return the number of items in the slice and the sort key of the last item.
+
+    Both are read with a single query that selects only the sort fields. The sort key
+    is None if the slice is empty.
+
+    """
+    count_int = 0
+    last_ts_tup = None
+    for last_ts_tup in query.values_list(*sort_field_list).iterator():
+        count_int += 1
+    return count_int, last_ts_tup
+
+
+def cache_add_last_in_slice(request, start_int, count_int, total_int, last_ts_tup):
+    """Cache the sort key of the last item in the slice, for selecting the slice that
+    starts after it."""
     url_dict = d1_common.url.parseUrl(request.get_full_path())
     authn_subj_list = _get_authenticated_subj_list(request)
     key_str = _gen_cache_key_for_slice(
-        url_dict, start_int + query.count(), total_int, authn_subj_list
-    )
-    last_model = query[query.count() - 1] if query.count() else None
-    last_ts_tup = (
-        tuple([getattr(last_model, f) for f in sort_field_list]) if last_model else None
+        url_dict, start_int + count_int, total_int, authn_subj_list
     )
-    django.core.cache.cache.set(key_str, last_ts_tup)
+    d1_gmn.app.cache.get_cache("slice").set(key_str, last_ts_tup)
     logging.debug('Cache set. key="{}" last={}'.format(key_str, last_ts_tup))
 
 
+def add_resume_token_header(response, request, next_start_int, last_ts_tup):
+    """Add a header holding a token that the client can pass back in order to get the
+    slice starting at ``next_start_int``.
+
+    No header is added for empty slices.
+
+    """
+    if not last_ts_tup:
+        return
+    url_dict = d1_common.url.parseUrl(request.get_full_path())
+    authn_subj_list = _get_authenticated_subj_list(request)
+    response[RESUME_TOKEN_HEADER] = _gen_resume_token(
+        url_dict, authn_subj_list, next_start_int, last_ts_tup
+    )
+
+
 # Private
 
 
@@ -146,11 +211,7 @@ def _add_fast_slice_filter(query, last_ts_tup, count_int):
     logging.debug(
         "Adding fast slice filter. last={} count={}".format(last_ts_tup, count_int)
     )
-    last_timestamp, last_id = last_ts_tup
-    return query.filter(
-        django.db.models.Q(timestamp__gt=last_timestamp)
-        | django.db.models.Q(timestamp__exact=last_timestamp, id__gt=last_id)
-    )[:count_int]
+    return _add_keyset_filter(query, last_ts_tup)[:count_int]
 
 
 def _add_fallback_slice_filter(query, start_int, count_int, total_int):
@@ -171,12 +232,141 @@ def _add_fallback_slice_filter(query, start_int, count_int, total_int):
         return query[start_int : start_int + count_int]
 
 
+def _add_checkpoint_slice_filter(
+    query, url_dict, start_int, count_int, total_int, authn_subj_list
+):
+    """Create a slice of a query using a keyset filter from the nearest checkpoint at
+    or before ``start_int``.
+
+    This adds `OFFSET <start - checkpoint> LIMIT <count>` to the SQL query, where the
+    offset is always lower than SLICE_CHECKPOINT_INTERVAL.
+
+    """
+    try:
+        checkpoint_start_int, checkpoint_ts_tup = _get_checkpoint(
+            query, url_dict, start_int, total_int, authn_subj_list
+        )
+    except IndexError:
+        # The result set changed while the checkpoints were being created.
+        return _add_fallback_slice_filter(query, start_int, count_int, total_int)
+    offset_int = start_int - checkpoint_start_int
+    logging.debug(
+        "Adding checkpoint slice filter. start={} count={} checkpoint={} offset={} "
+        "last={}".format(
+            start_int, count_int, checkpoint_start_int, offset_int, checkpoint_ts_tup
+        )
+    )
+    return _add_keyset_filter(query, checkpoint_ts_tup)[
+        offset_int : offset_int + count_int
+    ]
+
+
+def _get_checkpoint(query, url_dict, start_int, total_int, authn_subj_list):
+    """Return the checkpoint closest to, but not after, ``start_int``.
+
+    Returns:
+        2-tup: (checkpoint_start_int, checkpoint_ts_tup). ``checkpoint_ts_tup`` is the
+        sort key of the item directly before ``checkpoint_start_int``, so the slice
+        at the checkpoint starts with the first item after ``checkpoint_ts_tup``.
+
+    Checkpoints that are missing between the last known checkpoint and
+    ``start_int`` are created and cached.
+
+    Raises IndexError if the result set has fewer items than expected.
+
+    """
+    interval_int = _get_checkpoint_interval()
+    key_str = _gen_cache_key_for_checkpoints(url_dict, total_int, authn_subj_list)
+    checkpoint_list = d1_gmn.app.cache.get_cache("slice").get(key_str) or []
+    target_idx = start_int // interval_int
+    if len(checkpoint_list) < target_idx:
+        if checkpoint_list:
+            prev_ts_tup = checkpoint_list[-1]
+            sort_key_query = _add_keyset_filter(query, prev_ts_tup)
+        else:
+            sort_key_query = query
+        while len(checkpoint_list) < target_idx:
+            ts_tup = tuple(
+                sort_key_query.values_list(*SORT_FIELD_LIST)[interval_int - 1]
+            )
+            checkpoint_list.append(ts_tup)
+            sort_key_query = _add_keyset_filter(query, ts_tup)
+        d1_gmn.app.cache.get_cache("slice").set(key_str, checkpoint_list)
+        logging.debug(
+            'Checkpoints set. key="{}" count={}'.format(key_str, len(checkpoint_list))
+        )
+    return target_idx * interval_int, checkpoint_list[target_idx - 1]
+
+
+def _get_checkpoint_interval():
+    return django.conf.settings.SLICE_CHECKPOINT_INTERVAL
+
+
+def _add_keyset_filter(query, last_ts_tup):
+    """Filter the query to only include the items sorted after ``last_ts_tup``."""
+    last_timestamp, last_id = last_ts_tup
+    return query.filter(
+        django.db.models.Q(timestamp__gt=last_timestamp)
+        | django.db.models.Q(timestamp__exact=last_timestamp, id__gt=last_id)
+    )
+
+
+def _get_resume_token(request, url_dict, authn_subj_list):
+    """Return (start_int, last_ts_tup) from the resume token in the request, or None if
+    the request does not include a resume token.
+
+    Raise InvalidRequest if the token is invalid or was issued for a different query or
+    different authenticated subjects.
+
+    """
+    token_str = request.META.get(RESUME_TOKEN_META_KEY)
+    if not token_str:
+        return None
+    try:
+        token_dict = json.loads(
+            base64.urlsafe_b64decode(token_str.encode("ascii")).decode("utf-8")
+        )
+        start_int = int(token_dict["start"])
+        last_ts_tup = (
+            d1_common.date_time.dt_from_iso8601_str(token_dict["timestamp"]),
+            int(token_dict["id"]),
+        )
+        query_key_str = token_dict["query"]
+    except (ValueError, KeyError, TypeError, UnicodeError) as e:
+        raise d1_common.types.exceptions.InvalidRequest(
+            0, 'Invalid resume token. token="{}" error="{}"'.format(token_str, str(e))
+        )
+    if query_key_str != _gen_query_key(url_dict, authn_subj_list):
+        raise d1_common.types.exceptions.InvalidRequest(
+            0,
+            "Resume token was issued for a different query or session. "
+            'token="{}"'.format(token_str),
+        )
+    logging.debug(
+        "Resume token. start={} last_ts_tup={}".format(start_int, last_ts_tup)
+    )
+    return start_int, last_ts_tup
+
+
+def _gen_resume_token(url_dict, authn_subj_list, next_start_int, last_ts_tup):
+    last_timestamp, last_id = last_ts_tup
+    token_json = d1_common.util.serialize_to_normalized_compact_json(
+        {
+            "start": next_start_int,
+            "timestamp": last_timestamp.isoformat(),
+            "id": last_id,
+            "query": _gen_query_key(url_dict, authn_subj_list),
+        }
+    )
+    return base64.urlsafe_b64encode(token_json.encode("utf-8")).decode("ascii")
+
+
 def _cache_get_last_in_slice(url_dict, start_int, total_int, authn_subj_list):
     """Return None if cache entry does not exist."""
     key_str = _gen_cache_key_for_slice(url_dict, start_int, total_int, authn_subj_list)
     # TODO: Django docs state that cache.get() should return None on unknown key.
     try:
-        last_ts_tup = django.core.cache.cache.get(key_str)
+        last_ts_tup = d1_gmn.app.cache.get_cache("slice").get(key_str)
     except KeyError:
         last_ts_tup = None
     logging.debug('Cache get. key="{}" -> last_ts_tup={}'.format(key_str, last_ts_tup))
@@ -216,12 +406,9 @@ def _gen_cache_key_for_slice(url_dict, start_int, total_int, authn_subj_list):
 
     """
     # logging.debug('Gen key. result_record_count={}'.format(result_record_count))
-    key_url_dict = copy.deepcopy(url_dict)
-    key_url_dict["query"].pop("start", None)
-    key_url_dict["query"].pop("count", None)
     key_json = d1_common.util.serialize_to_normalized_compact_json(
         {
-            "url_dict": key_url_dict,
+            "url_dict": _gen_key_url_dict(url_dict),
             "start": start_int,
             "total": total_int,
             "subject": authn_subj_list,
@@ -229,3 +416,38 @@ def _gen_cache_key_for_slice(url_dict, start_int, total_int, authn_subj_list):
     )
     logging.debug("key_json={}".format(key_json))
     return hashlib.sha256(key_json.encode("utf-8")).hexdigest()
+
+
+def _gen_cache_key_for_checkpoints(url_dict, total_int, authn_subj_list):
+    """Generate cache key for the list of checkpoints for the result set of the REST
+    URL the client is currently accessing.
+
+    The total number of items in the result set is included in the key, so that
+    checkpoints are discarded when items are added to or removed from the result set.
+
+    """
+    key_json = d1_common.util.serialize_to_normalized_compact_json(
+        {
+            "url_dict": _gen_key_url_dict(url_dict),
+            "checkpoint_interval": _get_checkpoint_interval(),
+            "total": total_int,
+            "subject": authn_subj_list,
+        }
+    )
+    return hashlib.sha256(key_json.encode("utf-8")).hexdigest()
+
+
+def _gen_query_key(url_dict, authn_subj_list):
+    """Generate a key that identifies the filtered result set of the REST URL and
+    authenticated subjects, independent of the slice position."""
+    key_json = d1_common.util.serialize_to_normalized_compact_json(
+        {"url_dict": _gen_key_url_dict(url_dict), "subject": authn_subj_list}
+    )
+    return hashlib.sha256(key_json.encode("utf-8")).hexdigest()
+
+
+def _gen_key_url_dict(url_dict):
+    key_url_dict = copy.deepcopy(url_dict)
+    key_url_dict["query"].pop("start", None)
+    key_url_dict["query"].pop("count", None)
+    return key_url_dict
@@ -37,9 +37,32 @@ import d1_gmn.app.auth
 import d1_gmn.app.db_filter
 import d1_gmn.app.did
 import d1_gmn.app.models
+import d1_gmn.app.query_count
 import d1_gmn.app.sysmeta
 import d1_gmn.app.views.slice
 
+# Fields of ScienceObject and EventLog that are retrieved for listObjects() and
+# getLogRecords(). The related values are retrieved with joins in the same query as
+# the objects and events.
+OBJECT_LIST_FIELD_LIST = [
+    "id",
+    "pid__did",
+    "format__format",
+    "checksum",
+    "checksum_algorithm__checksum_algorithm",
+    "modified_timestamp",
+    "size",
+]
+LOG_FIELD_LIST = [
+    "id",
+    "sciobj__pid__did",
+    "ip_address__ip_address",
+    "user_agent__user_agent",
+    "subject__subject",
+    "event__event",
+    "timestamp",
+]
+
 
 def dataoneTypes(request):
     """Return the PyXB binding to use when handling a request."""
@@ -119,7 +142,12 @@ def assert_xml_file_is_under_size_limit(xml_file):
 
 
 def generate_sysmeta_xml_matching_api_version(request, pid):
-    sysmeta_pyxb = d1_gmn.app.sysmeta.model_to_pyxb(pid)
+    return serialize_sysmeta_matching_api_version(
+        request, d1_gmn.app.sysmeta.model_to_pyxb(pid)
+    )
+
+
+def serialize_sysmeta_matching_api_version(request, sysmeta_pyxb):
     sysmeta_xml_str = d1_gmn.app.sysmeta.serialize(sysmeta_pyxb)
     if is_v1_api(request):
         return d1_common.type_conversions.str_to_v1_str(sysmeta_xml_str)
@@ -161,7 +189,11 @@ def query_object_list(request, type_name):
                 request, query, "pid__did", "identifier"
             )
     query = d1_gmn.app.db_filter.add_replica_filter(request, query)
-    total_int = query.count()
+    if type_name == "object_list":
+        query = query.values(*OBJECT_LIST_FIELD_LIST)
+    total_int = d1_gmn.app.query_count.get_total(
+        request, d1_gmn.app.query_count.OBJECT_LIST, query
+    )
     query, start, count = d1_gmn.app.views.slice.add_slice_filter(
         request, query, total_int
     )
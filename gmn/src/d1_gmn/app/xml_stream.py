@@ -0,0 +1,223 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Streaming serializer for ObjectList and Log responses.
+
+Generate the XML docs directly from database rows, without creating PyXB objects and
+a DOM for the complete document.
+
+The generated XML is byte-identical to the XML generated by serializing the
+corresponding PyXB objects with ``d1_common.xml.serialize_for_transport()``. The
+DataONE types are simple and flat, so the elements are written with string formatting
+and escaping that matches the minidom serializer used by PyXB.
+
+The ``count`` attribute on the root element must hold the number of elements in the
+list, so the caller passes in the number of rows in the slice. The rows are read with a
+database cursor and serialized while the response is being sent, so memory use does not
+depend on the number of rows.
+
+"""
+
+import d1_common.date_time
+
+import django.conf
+
+import d1_gmn.app.views.util
+
+# Number of serialized list elements per chunk returned by the generators.
+CHUNK_ELEMENT_COUNT = 100
+
+
+class XmlStream:
+    """Serialized XML doc that is generated in chunks while it is iterated.
+
+    The elements are generated from a database cursor, so the doc can only be iterated
+    once.
+
+    Attributes:
+        count: Number of elements in the list
+
+    """
+
+    def __init__(self, root_xml, element_xml_iter, count, end_xml):
+        self._root_xml = root_xml
+        self._element_xml_iter = element_xml_iter
+        self._end_xml = end_xml
+        self.count = count
+
+    def __iter__(self):
+        yield self._root_xml
+        if self.count:
+            chunk_list = []
+            for element_xml in self._element_xml_iter:
+                chunk_list.append(element_xml)
+                if len(chunk_list) == CHUNK_ELEMENT_COUNT:
+                    yield b"".join(chunk_list)
+                    chunk_list = []
+            if chunk_list:
+                yield b"".join(chunk_list)
+        yield self._end_xml
+
+    def getvalue(self):
+        return b"".join(self)
+
+
+def object_list(request, db_query, start, count, total, xslt_url=None):
+    """Serialize ScienceObject rows to ObjectList XML.
+
+    ``db_query`` must be a ``values()`` query with the fields in
+    ``d1_gmn.app.views.util.OBJECT_LIST_FIELD_LIST``, and ``count`` must be the number
+    of rows returned by the query.
+
+    Returns:
+        XmlStream
+    """
+    return _create_stream(
+        d1_gmn.app.views.util.dataoneTypes(request).objectList,
+        start,
+        count,
+        total,
+        (_object_info_xml(row) for row in db_query.iterator()),
+        xslt_url,
+    )
+
+
+def log(request, db_query, start, count, total, xslt_url=None):
+    """Serialize EventLog rows to Log XML.
+
+    ``db_query`` must be a ``values()`` query with the fields in
+    ``d1_gmn.app.views.util.LOG_FIELD_LIST``, and optionally, ``redact``. Rows that
+    have a true ``redact`` value are serialized with ipAddress and
+    subject set to "<NotAuthorized>". ``count`` must be the number of rows returned by
+    the query.
+
+    Returns:
+        XmlStream
+    """
+    node_identifier_xml = _element(
+        "nodeIdentifier", django.conf.settings.NODE_IDENTIFIER
+    )
+    return _create_stream(
+        d1_gmn.app.views.util.dataoneTypes(request).log,
+        start,
+        count,
+        total,
+        (_log_entry_xml(row, node_identifier_xml) for row in db_query.iterator()),
+        xslt_url,
+    )
+
+
+def _object_info_xml(row):
+    return "".join(
+        (
+            "<objectInfo>",
+            _element("identifier", row["pid__did"]),
+            _element("formatId", row["format__format"]),
+            '<checksum algorithm="{}">{}</checksum>'.format(
+                _escape(row["checksum_algorithm__checksum_algorithm"]),
+                _escape(row["checksum"]),
+            ),
+            _element(
+                "dateSysMetadataModified", _datetime_str(row["modified_timestamp"])
+            ),
+            _element("size", str(row["size"])),
+            "</objectInfo>",
+        )
+    ).encode("utf-8")
+
+
+def _log_entry_xml(row, node_identifier_xml):
+    if row.get("redact", False):
+        ip_address = subject = "<NotAuthorized>"
+    else:
+        ip_address = row["ip_address__ip_address"]
+        subject = row["subject__subject"]
+    return "".join(
+        (
+            "<logEntry>",
+            _element("entryId", str(row["id"])),
+            _element("identifier", row["sciobj__pid__did"]),
+            _element("ipAddress", ip_address),
+            _element("userAgent", row["user_agent__user_agent"]),
+            _element("subject", subject),
+            _element("event", row["event__event"]),
+            _element("dateLogged", _datetime_str(row["timestamp"])),
+            node_identifier_xml,
+            "</logEntry>",
+        )
+    ).encode("utf-8")
+
+
+def _create_stream(root_element, start, count, total, element_xml_iter, xslt_url):
+    expanded_name = root_element.name()
+    root_xml_list = ['<?xml version="1.0" encoding="utf-8"?>']
+    if xslt_url:
+        root_xml_list.append(
+            '<?xml-stylesheet type="text/xsl" href="{}"?>'.format(xslt_url)
+        )
+    # Attributes are ordered by name, as in minidom.
+    root_xml_list.append(
+        '<ns1:{} count="{}" start="{}" total="{}" xmlns:ns1="{}"'.format(
+            expanded_name.localName(),
+            count,
+            start,
+            total,
+            _escape(expanded_name.namespace().uri()),
+        )
+    )
+    if count:
+        root_xml_list.append(">")
+        end_xml = "</ns1:{}>".format(expanded_name.localName())
+    else:
+        root_xml_list.append("/>")
+        end_xml = ""
+    return XmlStream(
+        "".join(root_xml_list).encode("utf-8"),
+        element_xml_iter,
+        count,
+        end_xml.encode("utf-8"),
+    )
+
+
+def _element(tag_str, text_str):
+    return "<{0}>{1}</{0}>".format(tag_str, _escape(text_str))
+
+
+def _escape(s):
+    """Escape text and attribute values in the same way as minidom."""
+    return (
+        s.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace('"', "&quot;")
+        .replace(">", "&gt;")
+    )
+
+
+def _datetime_str(dt):
+    """Format datetime as xs:dateTime in UTC, in the same way as PyXB.
+
+    Trailing zeros are removed from the fractional seconds.
+
+    """
+    iso_str = (
+        d1_common.date_time.normalize_datetime_to_utc(dt)
+        .replace(tzinfo=None)
+        .isoformat()
+    )
+    if "." in iso_str:
+        iso_str = iso_str.rstrip("0")
+    return iso_str + "Z"
@@ -242,6 +242,34 @@ LOG_IGNORE_TRUSTED_SUBJECT = True
 # - Do not apply this filter.
 LOG_IGNORE_NODE_SUBJECT = True
 
+# Write read events to the Event Log asynchronously, in batches.
+#
+# - False (default): Each read event (MNRead.get(), MNRead.getSystemMetadata(),
+#   MNRead.describe() and MNRead.getChecksum()) is written to the database while the
+#   request is being processed.
+# - True: Read events are added to an in-memory buffer that is written to the database
+#   by a background thread in each GMN process. This removes the database writes from
+#   the read requests, but causes read events to appear in MNCore.getLogRecords() with
+#   a delay of up to EVENT_LOG_BUFFER_MAX_AGE seconds. Other events, such as create and
+#   update, are always written while the request is being processed.
+EVENT_LOG_BUFFER_ENABLED = False
+
+# The number of buffered read events that triggers a write to the database.
+EVENT_LOG_BUFFER_SIZE = 500
+
+# The maximum time, in seconds, between writes of buffered read events to the
+# database.
+EVENT_LOG_BUFFER_MAX_AGE = 5
+
+# Directory in which buffered read events are stored until they have been written to
+# the database. If a GMN process stops before writing its buffered events, the events
+# are recovered from this directory by another GMN process. Must be writable by GMN.
+EVENT_LOG_BUFFER_SPILL_DIR_PATH = "/var/tmp"
+
+# The maximum number of values from the event, IP address, user agent and subject
+# tables for which GMN caches database ids in memory when writing Event Log records.
+EVENT_LOG_LOOKUP_CACHE_SIZE = 10000
+
 # ==============================================================================
 
 # Path to the client side certificate that GMN uses when initiating TLS/SSL
@@ -297,6 +325,16 @@ REPLICATION_ALLOWEDOBJECTFORMAT = ()
 # to be retried for 24 hours.
 REPLICATION_MAX_ATTEMPTS = 24
 
+# The maximum number of replicas that are downloaded at the same time when the queue
+# of replication requests is processed. Set to 1 to process the requests one at a
+# time, in the order in which they were received.
+REPLICATION_CONCURRENCY = 4
+
+# The maximum number of replicas that are downloaded at the same time from a single
+# source Member Node. This limits the load that GMN places on each source node while
+# allowing downloads from different nodes to proceed in parallel.
+REPLICATION_CONCURRENCY_PER_NODE = 2
+
 # Accept only public objects for replication
 # True:
 # - This node will deny any replication requests for access controlled objects.
@@ -474,6 +512,19 @@ SCIMETA_VALIDATION_MAX_SIZE = 100 * 1024 ** 2
 #   synchronization.
 SCIMETA_VALIDATION_OVER_SIZE_ACTION = "reject"
 
+# Compile the XML Schema validators for all supported SciMeta formats when GMN starts.
+#
+# This setting applies only when SCIMETA_VALIDATION_ENABLED is set to True.
+#
+# Compiled validators are cached for the lifetime of the GMN process, so the XSD files
+# for a given formatId are loaded and compiled only once.
+#
+# - True (default): Validators are compiled when GMN starts. This increases the
+#   startup time of each GMN process but removes the compile time from the first
+#   MNStorage.create() and MNStorage.update() for each formatId.
+# - False: Validators are compiled on first use.
+SCIMETA_VALIDATION_WARM_UP = True
+
 # GMN implements a vendor specific extension for MNStorage.create(). Instead of
 # providing an object for GMN to manage, the object can be left empty and the URL of the
 # object on a 3rd party server be provided instead. In that case, GMN will stream the
@@ -512,12 +563,188 @@ MAX_XML_DOCUMENT_SIZE = 10 * 1024 ** 2
 # E.g.: 1 MiB = 1024**2 (default)
 NUM_CHUNK_BYTES = 1024 ** 2
 
+# How GMN delivers the bytes of science objects that are stored locally, in
+# MNRead.get().
+#
+# - 'stream': GMN reads the file in chunks of NUM_CHUNK_BYTES and streams it to the
+#   client.
+# - 'file' (default): GMN returns the file to the WSGI server, which sends it with
+#   sendfile() if supported. mod_wsgi and Gunicorn support this.
+# - 'x_sendfile': GMN returns the path to the file in an X-Sendfile header, and the
+#   front-end server sends the file. For Apache, this requires mod_xsendfile, with
+#   "XSendFile On" and "XSendFilePath" set to OBJECT_STORE_PATH and any other
+#   locations holding science objects.
+# - 'x_accel_redirect': GMN returns a URL for the file in an X-Accel-Redirect header,
+#   and Nginx sends the file. See SCIOBJ_X_ACCEL_REDIRECT_URL.
+#
+# In all modes, byte ranges requested with the HTTP Range header are supported.
+SCIOBJ_DELIVERY_MODE = "file"
+
+# URL of the Nginx "internal" location that maps to OBJECT_STORE_PATH. Only used when
+# SCIOBJ_DELIVERY_MODE is 'x_accel_redirect'. Science objects stored outside of
+# OBJECT_STORE_PATH are delivered as for 'file'. E.g.:
+#
+# location /gmn_object_store/ {
+#   internal;
+#   alias /var/local/dataone/gmn_object_store/;
+# }
+SCIOBJ_X_ACCEL_REDIRECT_URL = "/gmn_object_store/"
+
+# Cache the BagIt zip archives generated by MNPackage.getPackage()
+# - True: A package is written to PACKAGE_CACHE_DIR_PATH while it is streamed to the
+#   client, and later requests for the same package are served from the file. A
+#   package is regenerated when the System Metadata of any of its members is updated.
+#   The Bagging-Date in bag-info.txt of a package served from the cache is the date at
+#   which the package was generated. Check that there is room for
+#   PACKAGE_CACHE_MAX_SIZE bytes in PACKAGE_CACHE_DIR_PATH before enabling the cache.
+# - False (default): A package is generated for each request.
+PACKAGE_CACHE_ENABLED = False
+
+# Directory in which cached packages are stored. Created if it does not exist. Must be
+# writable by GMN.
+PACKAGE_CACHE_DIR_PATH = "/var/tmp/gmn_package_cache"
+
+# The maximum total size, in bytes, of the cached packages. When the size is exceeded,
+# the packages that were least recently used are removed.
+PACKAGE_CACHE_MAX_SIZE = 10 * 1024 ** 3
+
+# Cache used for slice cursors and checkpoints, the CN subjects, the subject of the
+# client side certificate, session certificate subjects, JWT validations, the Node
+# document render generation and the Member Node base URLs used for replication.
+#
+# The default in-memory cache is separate for each GMN process. When GMN runs in
+# several worker processes, values cached by one worker are not available to the
+# others. E.g., when a client pages through a listObjects() result set, the cursor for
+# the next page is found only if the next request is handled by the same worker.
+#
+# To share the cache between workers, use a file based cache:
+#
+# CACHES = {
+#     "default": {
+#         "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+#         "LOCATION": "/var/tmp/gmn_cache",
+#         "TIMEOUT": 60 * 60,
+#     }
+# }
+#
+# Or Memcached, which requires the pymemcache package and a Memcached server:
+#
+# CACHES = {
+#     "default": {
+#         "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+#         "LOCATION": "127.0.0.1:11211",
+#         "TIMEOUT": 60 * 60,
+#     }
+# }
+#
+# A namespace can also be placed in a separate cache by adding a cache with the same
+# name as the namespace to CACHES.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "TIMEOUT": 60 * 60,
+    }
+}
+
+# Default timeout, in seconds, and maximum number of entries for each namespace in the
+# cache. A timeout of None caches values until they are replaced. MAX_ENTRIES applies
+# to the in-memory and file based caches. Memcached manages its own size limit.
+#
+# The hit rate for each namespace is logged when GMN starts and is shown in the
+# status page at /home.
+CACHE_NAMESPACES = {
+    "slice": {"TIMEOUT": 60 * 60, "MAX_ENTRIES": 10000},
+    "cn_subjects": {"TIMEOUT": 60 * 60, "MAX_ENTRIES": 100},
+    "client_cert": {"TIMEOUT": 60 * 60, "MAX_ENTRIES": 100},
+    "session_cert": {"TIMEOUT": 60 * 60, "MAX_ENTRIES": 10000},
+    "session_jwt": {"TIMEOUT": 60 * 60, "MAX_ENTRIES": 10000},
+    "node_base_url": {"TIMEOUT": 60 * 60, "MAX_ENTRIES": 10},
+}
+
 # The maximum number of items that can be returned in a single page of results
 # from MNRead.listObjects() (ObjectList) and MNCore.getLogRecords() (Log). A
 # lower number reduces memory usage, but causes more round-trips between client
 # and server.
 MAX_SLICE_ITEMS = 5000
 
+# Interval, in number of items, between the checkpoints that GMN keeps for the result
+# sets of MNRead.listObjects() (ObjectList) and MNCore.getLogRecords() (Log). When a
+# client requests a slice at an arbitrary start position, GMN uses the closest
+# checkpoint to locate the slice with an index lookup, so at most this many items must
+# be skipped by the database. Checkpoints are created on demand and stored in the
+# cache. Clients that page through a result set can avoid checkpoint lookups by
+# passing back the token returned in the VENDOR-GMN-RESUME-TOKEN response header in a
+# VENDOR-GMN-RESUME-TOKEN request header.
+SLICE_CHECKPOINT_INTERVAL = 10000
+
+# Cache the total counts for MNRead.listObjects() (ObjectList) and
+# MNCore.getLogRecords() (Log)
+# - True: The total number of matching items is stored in the database for each
+#   combination of the fromDate, toDate, formatId, replicaStatus and event filters and
+#   the set of authenticated subjects, so paging through a large result set does not
+#   require a full count for each page. Requests that use other filters, such as
+#   identifier and idFilter, are counted directly in the database.
+#
+#   Creating, updating or deleting an object invalidates all the counts, which are then
+#   recounted when next requested. The invalidation updates a single row in the same
+#   transaction as the change, so concurrent creates, updates and deletes, including
+#   those made by replication, wait for each other. The cache is intended for nodes
+#   where objects change rarely compared to how often large object lists are paged.
+#
+#   Events that are logged after a Log count was stored are counted by their ID and
+#   added to the count. An event that is committed after an event with a higher ID has
+#   been counted may be missing from the count until it is refreshed after
+#   QUERY_COUNT_CACHE_MAX_AGE.
+# - False (default): The total number of matching items is counted directly in the
+#   database for each page.
+QUERY_COUNT_CACHE_ENABLED = False
+
+# Maximum number of filter combinations for which counts are cached. When the limit is
+# reached, the counts that were least recently refreshed are removed.
+QUERY_COUNT_CACHE_SIZE = 1000
+
+# Maximum time, in seconds, to use a cached count before refreshing it with a direct
+# count in the database. This limits the effect of any changes that were made to the
+# database outside of GMN, e.g., with SQL.
+QUERY_COUNT_CACHE_MAX_AGE = 24 * 60 * 60
+
+# Cache the subjects extracted from client side certificates.
+#
+# True (default):
+# - The primary subject and the equivalent identities and group memberships from the
+#   SubjectInfo extension are cached, keyed by the fingerprint of the certificate.
+#   Repeated requests with the same certificate do not require the certificate to be
+#   deserialized and the SubjectInfo to be parsed again.
+# - The cache is held in the session_cert namespace of the cache. By default, this is
+#   a separate in-memory cache in each GMN process. To share the cache between
+#   processes, configure CACHES with a shared backend. See CACHES.
+# False:
+# - The subjects are extracted from the certificate for each request.
+SESSION_CERT_CACHE_ENABLED = True
+
+# Maximum time, in seconds, to use the cached subjects for a certificate. Entries also
+# expire when the certificate expires.
+SESSION_CERT_CACHE_MAX_AGE = 60 * 60
+
+# Cache successful validations of JSON Web Tokens (JWTs).
+#
+# True (default):
+# - The subject of a JWT that has been validated is cached, keyed by a hash of the
+#   token. Repeated requests with the same token do not require the signature to be
+#   verified again. The cache is held in the session_jwt namespace of the
+#   cache.
+# False:
+# - The signature of the JWT is verified for each request.
+JWT_CACHE_ENABLED = True
+
+# Maximum time, in seconds, to use a cached JWT validation. Cached validations also
+# expire when the JWT expires.
+JWT_CACHE_MAX_AGE = 60 * 60
+
+# Interval, in seconds, at which the CN certificate used for validating JWTs is
+# downloaded again, so that a new certificate is picked up without restarting GMN.
+JWT_CN_CERT_REFRESH_INTERVAL = 24 * 60 * 60
+
 # Postgres database connection.
 d1_common.util.nested_update(
     DATABASES,
@@ -75,6 +75,8 @@ ADMINS = (("GMN Unit Test Admin", "admin@test.tld"),)
 
 RESOURCE_MAP_CREATE = "block"
 
+SCIMETA_VALIDATION_WARM_UP = False
+
 PROXY_MODE_BASIC_AUTH_ENABLED = False
 PROXY_MODE_BASIC_AUTH_USERNAME = ""
 PROXY_MODE_BASIC_AUTH_PASSWORD = ""
@@ -82,7 +84,26 @@ PROXY_MODE_STREAM_TIMEOUT = 30
 
 MAX_XML_DOCUMENT_SIZE = 10 * 1024 ** 2
 NUM_CHUNK_BYTES = 1024 ** 2
+SCIOBJ_DELIVERY_MODE = "file"
+SCIOBJ_X_ACCEL_REDIRECT_URL = "/gmn_object_store/"
+# Generate a package for each request, so that tests do not share cached packages.
+PACKAGE_CACHE_ENABLED = False
+PACKAGE_CACHE_DIR_PATH = "/tmp/gmn_test_package_cache"
+PACKAGE_CACHE_MAX_SIZE = 100 * 1024 ** 2
+# Tests run in a transaction that is not visible to other threads.
+REPLICATION_CONCURRENCY = 1
+REPLICATION_CONCURRENCY_PER_NODE = 1
 MAX_SLICE_ITEMS = 5000
+SLICE_CHECKPOINT_INTERVAL = 50
+# Tests modify the database directly, which is not tracked by the count cache.
+QUERY_COUNT_CACHE_ENABLED = False
+QUERY_COUNT_CACHE_SIZE = 1000
+QUERY_COUNT_CACHE_MAX_AGE = 24 * 60 * 60
+SESSION_CERT_CACHE_ENABLED = True
+SESSION_CERT_CACHE_MAX_AGE = 60 * 60
+JWT_CACHE_ENABLED = True
+JWT_CACHE_MAX_AGE = 60 * 60
+JWT_CN_CERT_REFRESH_INTERVAL = 24 * 60 * 60
 
 # mk_db_fixture:
 # - Uses DATABASES.default
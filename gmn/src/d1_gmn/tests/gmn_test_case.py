@@ -40,6 +40,7 @@ import django.conf
 import django.core.management
 import django.db
 import django.test
+import django.test.utils
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "d1_gmn.settings_test")
 django.setup()
@@ -52,6 +53,7 @@ import requests
 import pytest
 
 import d1_gmn.app
+import d1_gmn.app.event_log
 import d1_gmn.app.models
 import d1_gmn.app.revision
 import d1_gmn.app.sciobj_store
@@ -276,6 +278,9 @@ class GMNTestCase(d1_test.d1_test_case.D1TestCase):
         """Run for each test method that derives from GMNTestCase."""
         # logger.error('GMNTestCase.setup_method()')
         d1_test.mock_api.django_client.add_callback(MOCK_GMN_BASE_URL)
+        # Each test runs in a fresh database, so cached ids from previous tests are
+        # invalid.
+        d1_gmn.app.event_log.clear_lookup_id_cache()
         # d1_test.mock_api.get.add_callback(d1_test.d1_test_case.MOCK_BASE_URL)
         self.client_v1 = d1_client.mnclient_1_2.MemberNodeClient_1_2(MOCK_GMN_BASE_URL)
         self.client_v2 = d1_client.mnclient_2_0.MemberNodeClient_2_0(MOCK_GMN_BASE_URL)
@@ -430,6 +435,12 @@ class GMNTestCase(d1_test.d1_test_case.D1TestCase):
             assert self.get_pyxb_value(sysmeta_pyxb, "seriesId") == sid
             i += 1
 
+    def count_sql_queries(self, func, *args, **kwargs):
+        """Call ``func`` and return the number of SQL queries it issued."""
+        with django.test.utils.CaptureQueriesContext(django.db.connection) as ctx:
+            func(*args, **kwargs)
+        return len(ctx.captured_queries)
+
     def are_equivalent_pyxb(self, a_pyxb, b_pyxb):
         a_xml = d1_common.xml.serialize_pretty(a_pyxb)
         b_xml = d1_common.xml.serialize_pretty(b_pyxb)
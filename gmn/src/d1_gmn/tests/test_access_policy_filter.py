@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the access policy filters that are applied to listObjects() and
+getLogRecords()."""
+
+import logging
+
+import django.test
+
+import d1_gmn.app.auth
+import d1_gmn.app.db_filter
+import d1_gmn.app.models
+import d1_gmn.tests.gmn_test_case
+
+logger = logging.getLogger(__name__)
+
+SUBJECT_SET_LIST = [
+    set(),
+    {"public"},
+    {"unknown_subject"},
+    {"public", "unknown_subject"},
+]
+
+
+def _create_request(subject_set):
+    request = django.test.RequestFactory().get("/v2/")
+    request.all_subjects_set = set(subject_set)
+    return request
+
+
+def _get_subject_set_list():
+    """Get subject sets that include the subjects in the DB fixture."""
+    subject_list = sorted(
+        d1_gmn.app.models.Subject.objects.values_list("subject", flat=True)
+    )[:10]
+    return SUBJECT_SET_LIST + [{s} for s in subject_list[:5]] + [set(subject_list)]
+
+
+def _get_readable_id_set(subject_set):
+    """Get the ids of the objects on which one or more of the subjects have read access,
+    without using the DB filter."""
+    return {
+        p.sciobj_id
+        for p in d1_gmn.app.models.Permission.objects.select_related("subject")
+        if p.subject.subject in subject_set
+    }
+
+
+def _get_redact_id_set(subject_set):
+    """Get the ids of the objects on which none of the subjects have write access."""
+    write_id_set = {
+        p.sciobj_id
+        for p in d1_gmn.app.models.Permission.objects.select_related("subject")
+        if p.subject.subject in subject_set and p.level >= d1_gmn.app.auth.WRITE_LEVEL
+    }
+    return set(
+        d1_gmn.app.models.ScienceObject.objects.values_list("id", flat=True)
+    ).difference(write_id_set)
+
+
+class TestAccessPolicyFilter(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def test_1000(self):
+        """add_access_policy_filter(): Returns the objects that are readable by the
+        session subjects."""
+        for subject_set in _get_subject_set_list():
+            query = d1_gmn.app.db_filter.add_access_policy_filter(
+                _create_request(subject_set),
+                d1_gmn.app.models.ScienceObject.objects.all(),
+                "id",
+            )
+            assert set(query.values_list("id", flat=True)) == _get_readable_id_set(
+                subject_set
+            )
+
+    def test_1010(self):
+        """add_access_policy_filter(): Returns the events for objects that are readable
+        by the session subjects."""
+        for subject_set in _get_subject_set_list():
+            query = d1_gmn.app.db_filter.add_access_policy_filter(
+                _create_request(subject_set),
+                d1_gmn.app.models.EventLog.objects.all(),
+                "sciobj_id",
+            )
+            readable_id_set = _get_readable_id_set(subject_set)
+            assert sorted(query.values_list("id", flat=True)) == sorted(
+                e.id
+                for e in d1_gmn.app.models.EventLog.objects.all()
+                if e.sciobj_id in readable_id_set
+            )
+
+    def test_1020(self):
+        """add_redact_annotation(): Records are redacted for objects on which none of
+        the session subjects have write access."""
+        for subject_set in _get_subject_set_list():
+            query = d1_gmn.app.db_filter.add_redact_annotation(
+                _create_request(subject_set), d1_gmn.app.models.EventLog.objects.all()
+            )
+            redact_id_set = _get_redact_id_set(subject_set)
+            for sciobj_id, redact_bool in query.values_list("sciobj_id", "redact"):
+                assert redact_bool == (sciobj_id in redact_id_set)
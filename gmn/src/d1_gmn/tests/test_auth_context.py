@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test that authorization state is resolved once per request."""
+
+import django.test
+import mock
+
+import d1_gmn.app.auth
+import d1_gmn.app.models
+import d1_gmn.tests.gmn_test_case
+
+
+def _create_request(subject_set):
+    request = django.test.RequestFactory().get("/v2/")
+    request.all_subjects_set = set(subject_set)
+    return request
+
+
+class TestAuthContext(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def test_1000(self):
+        """is_trusted_subject(): Trusted subjects are resolved once per request."""
+        request = _create_request({"subj_1", "trusted_subj"})
+        with mock.patch(
+            "d1_gmn.app.auth.get_trusted_subjects", return_value={"trusted_subj"}
+        ) as trusted_mock:
+            assert d1_gmn.app.auth.is_trusted_subject(request)
+            assert d1_gmn.app.auth.is_trusted_subject(request)
+            assert trusted_mock.call_count == 1
+
+    def test_1010(self):
+        """has_create_update_delete_permission(): Whitelist is resolved once per
+        request."""
+        request = _create_request({"subj_1"})
+        with mock.patch(
+            "d1_gmn.app.auth.get_trusted_subjects", return_value=set()
+        ), mock.patch(
+            "d1_gmn.app.auth.get_whitelisted_subject_set", return_value={"subj_1"}
+        ) as whitelist_mock:
+            assert d1_gmn.app.auth.has_create_update_delete_permission(request)
+            assert d1_gmn.app.auth.has_create_update_delete_permission(request)
+            assert whitelist_mock.call_count == 1
+
+    def test_1020(self):
+        """is_allowed(): Permission level for a PID is queried once per request, and
+        matches the access policy in the database."""
+        permission_model = d1_gmn.app.models.Permission.objects.select_related(
+            "sciobj__pid", "subject"
+        ).first()
+        pid = permission_model.sciobj.pid.did
+        request = _create_request({permission_model.subject.subject})
+        with mock.patch("d1_gmn.app.auth.get_trusted_subjects", return_value=set()):
+            assert d1_gmn.app.auth.is_allowed(request, permission_model.level, pid)
+            assert (
+                self.count_sql_queries(
+                    d1_gmn.app.auth.is_allowed, request, permission_model.level, pid
+                )
+                == 0
+            )
+            assert not d1_gmn.app.auth.is_allowed(
+                _create_request({"unknown_subj"}), d1_gmn.app.auth.READ_LEVEL, pid
+            )
+
+    def test_1030(self):
+        """get_auth_context(): Context is recreated when the session subjects
+        change."""
+        request = _create_request({"subj_1"})
+        auth_context = d1_gmn.app.auth.get_auth_context(request)
+        assert d1_gmn.app.auth.get_auth_context(request) is auth_context
+        request.all_subjects_set.add("subj_2")
+        assert d1_gmn.app.auth.get_auth_context(request) is not auth_context
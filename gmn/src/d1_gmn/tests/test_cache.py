@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the namespaced cache."""
+
+import os
+import threading
+
+import pytest
+
+import django.test
+
+import d1_gmn.app.cache
+import d1_gmn.tests.gmn_test_case
+
+
+@pytest.fixture(scope="function")
+def file_based_cache(tmp_path):
+    """Use a file based cache as a stand-in for a cache shared between processes."""
+    with django.test.override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": str(tmp_path),
+            }
+        }
+    ):
+        yield str(tmp_path)
+
+
+def _get_in_new_thread(namespace, key):
+    """Get a value using the separate cache backend instances of a new thread."""
+    result_list = []
+    thread = threading.Thread(
+        target=lambda: result_list.append(
+            d1_gmn.app.cache.get_cache(namespace).get(key)
+        )
+    )
+    thread.start()
+    thread.join()
+    return result_list[0]
+
+
+@pytest.mark.usefixtures("clear_cache")
+class TestCache(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    @pytest.fixture(scope="function")
+    def clear_cache(self):
+        d1_gmn.app.cache.clear_all()
+        yield
+        d1_gmn.app.cache.clear_all()
+
+    def test_1000(self):
+        """get_cache(): Values with the same key in different namespaces are
+        separate."""
+        d1_gmn.app.cache.get_cache("slice").set("key", "slice value")
+        d1_gmn.app.cache.get_cache("cn_subjects").set("key", "cn_subjects value")
+        assert d1_gmn.app.cache.get_cache("slice").get("key") == "slice value"
+        assert d1_gmn.app.cache.get_cache("cn_subjects").get("key") == "cn_subjects value"
+        d1_gmn.app.cache.get_cache("slice").clear()
+        assert d1_gmn.app.cache.get_cache("slice").get("key") is None
+        assert d1_gmn.app.cache.get_cache("cn_subjects").get("key") == "cn_subjects value"
+
+    def test_1010(self):
+        """get_cache(): MAX_ENTRIES limits each in-memory namespace separately."""
+        with django.test.override_settings(
+            CACHE_NAMESPACES={
+                "slice": {"TIMEOUT": 60, "MAX_ENTRIES": 10},
+                "cn_subjects": {"TIMEOUT": None, "MAX_ENTRIES": 10},
+            }
+        ):
+            d1_gmn.app.cache.get_cache("cn_subjects").set("key", "cn_subjects value")
+            for i in range(100):
+                d1_gmn.app.cache.get_cache("slice").set("key_{}".format(i), i)
+            slice_backend = d1_gmn.app.cache.get_cache("slice").backend
+            assert len(slice_backend._cache) <= 10
+            assert d1_gmn.app.cache.get_cache("cn_subjects").get("key") == "cn_subjects value"
+            assert slice_backend.default_timeout == 60
+
+    def test_1020(self, file_based_cache):
+        """get_cache(): Values in a file based cache are shared between backend
+        instances and each namespace is stored in a separate directory."""
+        d1_gmn.app.cache.get_cache("slice").set("key", ("shared", 1))
+        assert _get_in_new_thread("slice", "key") == ("shared", 1)
+        assert d1_gmn.app.cache.is_shared("slice")
+        assert os.listdir(os.path.join(file_based_cache, "slice"))
+        assert not os.path.exists(os.path.join(file_based_cache, "cn_subjects"))
+
+    def test_1030(self):
+        """get_cache(): In-memory namespace is not reported as shared."""
+        assert not d1_gmn.app.cache.is_shared("slice")
+
+    def test_1040(self, file_based_cache):
+        """get_namespace_stats(): Hits and misses are added to counters held in the
+        namespace."""
+        slice_cache = d1_gmn.app.cache.get_cache("slice")
+        slice_cache.set("key", "value")
+        for _ in range(3):
+            slice_cache.get("key")
+        slice_cache.get("unknown_key")
+        _get_in_new_thread("slice", "key")
+        stats_dict = d1_gmn.app.cache.get_namespace_stats("slice")
+        assert stats_dict["hit"] == 4
+        assert stats_dict["miss"] == 1
+        assert stats_dict["hit_rate"] == 0.8
+        assert stats_dict["backend"] == "FileBasedCache"
+        assert stats_dict["shared"]
+
+    def test_1050(self):
+        """get_stats(): Returns stats for all namespaces, with hit_rate None for
+        namespaces that have not been used."""
+        stats_dict = d1_gmn.app.cache.get_stats()
+        assert sorted(stats_dict) == d1_gmn.app.cache.get_namespace_list()
+        assert stats_dict["session_jwt"]["hit_rate"] is None
+
+    def test_1060(self):
+        """get_cache(): A cache in CACHES with the same name as the namespace is
+        used for the namespace."""
+        with django.test.override_settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                "slice": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+            }
+        ):
+            d1_gmn.app.cache.get_cache("slice").set("key", "value")
+            assert d1_gmn.app.cache.get_cache("slice").get("key") is None
+            assert d1_gmn.app.cache.check_namespace("slice") is not None
+            assert d1_gmn.app.cache.check_namespace("cn_subjects") is None
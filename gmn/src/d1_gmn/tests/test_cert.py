@@ -17,8 +17,16 @@
 # limitations under the License.
 """Test subject extraction from certificate and SubjectInfo."""
 
+import cryptography.hazmat.primitives.hashes
+import freezegun
+import mock
 import responses
 
+import django.test
+
+import d1_common.cert.x509
+
+import d1_gmn.app.cache
 import d1_gmn.app.middleware.session_cert
 import d1_gmn.tests.gmn_test_case
 
@@ -47,3 +55,71 @@ class TestCert(d1_gmn.tests.gmn_test_case.GMNTestCase):
             "public",
             "verifiedUser",
         ]
+
+    def test_1010(self):
+        """get_cert_fingerprint(): Matches the SHA-256 fingerprint of the
+        certificate."""
+        cert_obj = d1_common.cert.x509.deserialize_pem(self.cert_simple_subject_info_pem)
+        assert (
+            d1_gmn.app.middleware.session_cert.get_cert_fingerprint(
+                self.cert_simple_subject_info_pem
+            )
+            == cert_obj.fingerprint(cryptography.hazmat.primitives.hashes.SHA256()).hex()
+        )
+        assert (
+            d1_gmn.app.middleware.session_cert.get_cert_fingerprint(b"not a cert")
+            is None
+        )
+
+    @freezegun.freeze_time("2016-10-01")
+    def test_1020(self):
+        """get_authenticated_subjects_cached(): Subjects are cached for a certificate
+        that has not expired and later requests skip the certificate parsing."""
+        d1_gmn.app.cache.clear_all()
+        expected_tup = d1_gmn.app.middleware.session_cert.get_authenticated_subjects(
+            self.cert_simple_subject_info_pem
+        )
+        assert (
+            d1_gmn.app.middleware.session_cert.get_authenticated_subjects_cached(
+                self.cert_simple_subject_info_pem
+            )
+            == expected_tup
+        )
+        with mock.patch(
+            "d1_common.cert.x509.deserialize_pem", side_effect=AssertionError
+        ):
+            assert (
+                d1_gmn.app.middleware.session_cert.get_authenticated_subjects_cached(
+                    self.cert_simple_subject_info_pem
+                )
+                == expected_tup
+            )
+
+    @freezegun.freeze_time("2016-10-25 20:42:00")
+    def test_1030(self):
+        """get_authenticated_subjects_cached(): Cache expiry is limited by the
+        notAfter date of the certificate."""
+        d1_gmn.app.cache.clear_all()
+        with mock.patch("d1_gmn.app.cache.NamespaceCache.set") as set_mock:
+            d1_gmn.app.middleware.session_cert.get_authenticated_subjects_cached(
+                self.cert_simple_subject_info_pem
+            )
+        assert set_mock.call_args[0][2] == 42
+
+    def test_1040(self):
+        """get_authenticated_subjects_cached(): Expired certificate is not cached."""
+        d1_gmn.app.cache.clear_all()
+        with mock.patch("d1_gmn.app.cache.NamespaceCache.set") as set_mock:
+            d1_gmn.app.middleware.session_cert.get_authenticated_subjects_cached(
+                self.cert_simple_subject_info_pem
+            )
+        assert not set_mock.called
+
+    def test_1050(self):
+        """get_authenticated_subjects_cached(): Cache can be disabled."""
+        with django.test.override_settings(SESSION_CERT_CACHE_ENABLED=False):
+            with mock.patch("d1_gmn.app.cache.NamespaceCache.get") as get_mock:
+                d1_gmn.app.middleware.session_cert.get_authenticated_subjects_cached(
+                    self.cert_simple_subject_info_pem
+                )
+        assert not get_mock.called
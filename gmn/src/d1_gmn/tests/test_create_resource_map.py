@@ -137,3 +137,33 @@ class TestCreateResourceMap(d1_gmn.tests.gmn_test_case.GMNTestCase):
                     len(uncreated_pid_set), len(avail_pid_set), is_ore, len(aggr_list)
                 )
             )
+
+    def test_1050(self):
+        """create_or_update(): Number of queries does not depend on the number of
+        members, and only added and removed members are written."""
+        small_count = self.count_sql_queries(
+            d1_gmn.app.resource_map._create_or_update_map,
+            "map_pid",
+            ["member_{}".format(i) for i in range(10)],
+        )
+        large_count = self.count_sql_queries(
+            d1_gmn.app.resource_map._create_or_update_map,
+            "map_pid",
+            ["member_{}".format(i) for i in range(5, 1000)],
+        )
+        assert large_count <= small_count + 1
+        assert sorted(
+            d1_gmn.app.resource_map.get_resource_map_members_by_map("map_pid")
+        ) == sorted("member_{}".format(i) for i in range(5, 1000))
+
+    def test_1060(self):
+        """get_resource_map_members_by_member(): Returns the members of all Resource
+        Maps that aggregate the member."""
+        d1_gmn.app.resource_map._create_or_update_map("map_a", ["a_1", "shared"])
+        d1_gmn.app.resource_map._create_or_update_map("map_b", ["b_1", "shared"])
+        assert sorted(
+            d1_gmn.app.resource_map.get_resource_map_members_by_member("a_1")
+        ) == ["a_1", "shared"]
+        assert sorted(
+            d1_gmn.app.resource_map.get_resource_map_members_by_member("shared")
+        ) == ["a_1", "b_1", "shared"]
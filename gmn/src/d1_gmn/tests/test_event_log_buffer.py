@@ -0,0 +1,154 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test buffered writing of read events to the Event Log."""
+
+import datetime
+import json
+import os
+import tempfile
+
+import mock
+import pytest
+import responses
+
+import django.test
+
+import d1_gmn.app.event_log
+import d1_gmn.app.event_log_buffer
+import d1_gmn.app.models
+import d1_gmn.tests.gmn_mock
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+
+
+@pytest.fixture(scope="function")
+def buffer_settings():
+    with tempfile.TemporaryDirectory() as spill_dir_path:
+        with django.test.override_settings(
+            EVENT_LOG_BUFFER_ENABLED=True,
+            EVENT_LOG_BUFFER_SIZE=1000,
+            EVENT_LOG_BUFFER_SPILL_DIR_PATH=spill_dir_path,
+            LOG_IGNORE_TRUSTED_SUBJECT=False,
+        ):
+            # Write the buffer synchronously from the test instead of from the writer
+            # thread.
+            with mock.patch(
+                "d1_gmn.app.event_log_buffer._start_writer_if_required"
+            ), mock.patch("d1_gmn.app.event_log_buffer._spill_file", None):
+                yield spill_dir_path
+            d1_gmn.app.event_log_buffer._event_list.clear()
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestEventLogBuffer")
+class TestEventLogBuffer(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _count_read_events(self, pid):
+        return d1_gmn.app.models.EventLog.objects.filter(
+            sciobj__pid__did=pid, event__event="read"
+        ).count()
+
+    @responses.activate
+    def test_1000(self, gmn_client_v2, buffer_settings):
+        """Read events are buffered and written to the database on flush."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(gmn_client_v2)
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            gmn_client_v2.get(pid)
+            gmn_client_v2.getSystemMetadata(pid)
+        assert self._count_read_events(pid) == 0
+        assert len(d1_gmn.app.event_log_buffer._event_list) == 2
+        assert d1_gmn.app.event_log_buffer.flush() == 2
+        assert self._count_read_events(pid) == 2
+        assert not d1_gmn.app.event_log_buffer._event_list
+
+    def test_1010(self, buffer_settings):
+        """write_events(): Timestamps and lookup values are stored as provided."""
+        pid = self.get_pid_list()[0]
+        timestamp = datetime.datetime(2001, 2, 3, 4, 5, 6, 7, datetime.timezone.utc)
+        d1_gmn.app.event_log_buffer.enqueue(
+            pid,
+            "read",
+            "1.2.3.4",
+            "buffer-test-agent",
+            "buffer-test-subject",
+            timestamp,
+        )
+        d1_gmn.app.event_log_buffer.flush()
+        event_log_model = d1_gmn.app.models.EventLog.objects.get(
+            user_agent__user_agent="buffer-test-agent"
+        )
+        assert event_log_model.sciobj.pid.did == pid
+        assert event_log_model.timestamp == timestamp
+        assert event_log_model.ip_address.ip_address == "1.2.3.4"
+        assert event_log_model.subject.subject == "buffer-test-subject"
+
+    def test_1020(self, buffer_settings):
+        """write_events(): Events for non-existing objects are dropped."""
+        d1_gmn.app.event_log_buffer.enqueue(
+            "unknown-pid", "read", "1.2.3.4", "buffer-test-agent", "subj"
+        )
+        assert d1_gmn.app.event_log_buffer.flush() == 0
+
+    def test_1030(self, buffer_settings):
+        """Events are recovered from spill files left behind by stopped processes."""
+        pid = self.get_pid_list()[0]
+        # PIDs are never this high, so the process is not running.
+        spill_path = d1_gmn.app.event_log_buffer._get_spill_path(2**30)
+        with open(spill_path, "w") as f:
+            f.write(
+                json.dumps(
+                    {
+                        "pid": pid,
+                        "event": "read",
+                        "ip_address": "5.6.7.8",
+                        "user_agent": "spill-test-agent",
+                        "subject": "spill-test-subject",
+                        "timestamp": "2001-02-03T04:05:06+00:00",
+                    }
+                )
+                + "\n"
+            )
+        d1_gmn.app.event_log_buffer._recover_orphaned_spill_files()
+        assert not os.path.exists(spill_path)
+        assert d1_gmn.app.event_log_buffer.flush() == 1
+        assert d1_gmn.app.models.EventLog.objects.filter(
+            user_agent__user_agent="spill-test-agent"
+        ).exists()
+
+    def test_1040(self, buffer_settings):
+        """write_events(): Events are written after their subject has been deleted as
+        unused, and after a cached lookup id has become stale."""
+        pid = self.get_pid_list()[0]
+        d1_gmn.app.event_log_buffer.enqueue(
+            pid, "read", "1.2.3.4", "stale-test-agent", "stale-test-subject"
+        )
+        d1_gmn.app.event_log_buffer.flush()
+        d1_gmn.app.models.EventLog.objects.filter(
+            user_agent__user_agent="stale-test-agent"
+        ).delete()
+        d1_gmn.app.models.Subject.objects.filter(subject="stale-test-subject").delete()
+        d1_gmn.app.models.UserAgent.objects.filter(
+            user_agent="stale-test-agent"
+        ).delete()
+        d1_gmn.app.event_log_buffer.enqueue(
+            pid, "read", "1.2.3.4", "stale-test-agent", "stale-test-subject"
+        )
+        assert d1_gmn.app.event_log_buffer.flush() == 1
+        assert d1_gmn.app.models.EventLog.objects.filter(
+            user_agent__user_agent="stale-test-agent",
+            subject__subject="stale-test-subject",
+        ).exists()
@@ -18,9 +18,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Test MNCore.getCapabilities()"""
+import os
+import sys
 
 import responses
 
+import django.conf
+import django.test
+import django.urls
+
+import d1_gmn.app.node
 import d1_gmn.tests.gmn_mock
 import d1_gmn.tests.gmn_test_case
 
@@ -32,3 +39,52 @@ class TestGetCapabilities(d1_gmn.tests.gmn_test_case.GMNTestCase):
         with d1_gmn.tests.gmn_mock.disable_auth():
             node = gmn_client_v1_v2.getCapabilities()
             assert isinstance(node, gmn_client_v1_v2.pyxb_binding.Node)
+
+    @responses.activate
+    def test_1010(self, gmn_client_v1_v2):
+        """MNCore.getCapabilities(): Returns 304 Not Modified when If-None-Match
+        matches the ETag of the rendered document."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            response = gmn_client_v1_v2.getCapabilitiesResponse()
+            etag_str = response.headers["ETag"]
+            assert "Last-Modified" in response.headers
+            response = gmn_client_v1_v2.getCapabilitiesResponse(
+                vendorSpecific={"If-None-Match": etag_str}
+            )
+            assert response.status_code == 304
+
+    def test_1020(self):
+        """MNCore.getCapabilities(): Document is rendered once and rendered again when
+        settings change."""
+        doc = d1_gmn.app.node.get_doc(2)
+        assert d1_gmn.app.node.get_doc(2) is doc
+        with django.test.override_settings(NODE_NAME="Changed Name"):
+            assert b"<name>Changed Name</name>" in d1_gmn.app.node.get_doc(2).xml_bytes
+        assert d1_gmn.app.node.get_doc(2).etag_str == doc.etag_str
+
+    def test_1030(self):
+        """MNCore.getCapabilities(): Stylesheet URL includes the script prefix under
+        which GMN is deployed."""
+        prev_prefix = django.urls.get_script_prefix()
+        try:
+            django.urls.set_script_prefix("/")
+            root_xml = d1_gmn.app.node.get_doc(2).xml_bytes
+            django.urls.set_script_prefix("/mn/")
+            mn_xml = d1_gmn.app.node.get_doc(2).xml_bytes
+        finally:
+            django.urls.set_script_prefix(prev_prefix)
+        assert b'href="/mn/' in mn_xml
+        assert b'href="/mn/' not in root_xml
+
+    def test_1040(self):
+        """MNCore.getCapabilities(): Modified timestamp is the time at which the
+        settings module was last modified, and does not change when the document is
+        rendered again."""
+        doc = d1_gmn.app.node.get_doc(2)
+        settings_path = sys.modules[django.conf.settings.SETTINGS_MODULE].__file__
+        assert doc.modified_timestamp.timestamp() == int(
+            os.path.getmtime(settings_path)
+        )
+        d1_gmn.app.node.clear()
+        assert d1_gmn.app.node.get_doc(2) is not doc
+        assert d1_gmn.app.node.get_doc(2).modified_timestamp == doc.modified_timestamp
@@ -227,3 +227,31 @@ class TestGetLogRecords(d1_gmn.tests.gmn_test_case.GMNTestCase):
             pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(gmn_client_v1_v2)
             log = gmn_client_v1_v2.getLogRecords(idFilter=sid)
             print(log)
+
+    @responses.activate
+    def test_1140(self, gmn_client_v1_v2):
+        """MNCore.getLogRecords(): The number of SQL queries does not depend on the
+        number of events in the slice."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            n_small = self.count_sql_queries(
+                gmn_client_v1_v2.getLogRecords, start=0, count=2
+            )
+            n_large = self.count_sql_queries(
+                gmn_client_v1_v2.getLogRecords, start=0, count=50
+            )
+            assert n_small == n_large
+
+    @responses.activate
+    def test_1150(self, gmn_client_v1_v2):
+        """MNCore.getLogRecords(): The number of SQL queries does not depend on the
+        number of events in the slice when records are redacted."""
+        with d1_gmn.tests.gmn_mock.set_auth_context(
+            session_subj_list=["public"], trusted_subj_list=[]
+        ):
+            n_small = self.count_sql_queries(
+                gmn_client_v1_v2.getLogRecords, start=0, count=2
+            )
+            n_large = self.count_sql_queries(
+                gmn_client_v1_v2.getLogRecords, start=0, count=50
+            )
+            assert n_small == n_large
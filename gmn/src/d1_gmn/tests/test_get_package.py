@@ -19,6 +19,7 @@
 # limitations under the License.
 """Test MNPackage.getPackage()"""
 import io
+import os
 import tempfile
 import zipfile
 
@@ -26,9 +27,12 @@ import freezegun
 import pytest
 import responses
 
+import django.test
+
 import d1_common.bagit
 import d1_common.types.exceptions
 
+import d1_gmn.app.sysmeta
 import d1_gmn.tests.gmn_test_case
 
 import d1_test.d1_test_case
@@ -112,3 +116,56 @@ class TestGetPackage(d1_gmn.tests.gmn_test_case.GMNTestCase):
         assert "zip" in response.headers["Content-Disposition"].lower()
         assert "Content-Length" not in response.headers
         self.sample.assert_equals(response.headers, "bagit_headers")
+
+    @responses.activate
+    def test_1040(self, gmn_client_v2):
+        """MNPackage.getPackage(): Members with formats that are already compressed are
+        stored in the ZIP archive without compression."""
+        jpeg_pid, _, _, _ = self.create_obj(gmn_client_v2, formatId="image/jpeg")
+        csv_pid, _, _, _ = self.create_obj(gmn_client_v2, formatId="text/csv")
+        ore_pid = self.create_resource_map(gmn_client_v2, [jpeg_pid, csv_pid])
+        response = self.call_d1_client(gmn_client_v2.getPackage, ore_pid)
+        bagit_zip = zipfile.ZipFile(io.BytesIO(response.content))
+        compress_type_set = {
+            o.compress_type
+            for o in bagit_zip.filelist
+            if o.filename.endswith(".jpg") or o.filename.endswith(".csv")
+        }
+        assert compress_type_set == {zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED}
+
+    @responses.activate
+    def test_1050(self, gmn_client_v2, tmp_path):
+        """MNPackage.getPackage(): Package is served from the package cache until the
+        System Metadata of a member is updated."""
+        with django.test.override_settings(
+            PACKAGE_CACHE_ENABLED=True, PACKAGE_CACHE_DIR_PATH=str(tmp_path)
+        ):
+            pid_list = self.create_multiple_objects(gmn_client_v2, 2)
+            ore_pid = self.create_resource_map(gmn_client_v2, pid_list)
+            first_bytes = self.call_d1_client(gmn_client_v2.getPackage, ore_pid).content
+            assert len(os.listdir(str(tmp_path))) == 1
+            with freezegun.freeze_time("2000-01-01"):
+                second_bytes = self.call_d1_client(
+                    gmn_client_v2.getPackage, ore_pid
+                ).content
+            # Same archive, including the Bagging-Date.
+            assert second_bytes == first_bytes
+            with freezegun.freeze_time("2001-01-01"):
+                d1_gmn.app.sysmeta.update_modified_timestamp(pid_list[0])
+            self.call_d1_client(gmn_client_v2.getPackage, ore_pid)
+            assert len(os.listdir(str(tmp_path))) == 2
+
+    @responses.activate
+    def test_1060(self, gmn_client_v2):
+        """MNPackage.getPackage(): Members without a fileName are named after the PID
+        and the extension for the formatId."""
+        pid, _, _, _ = self.create_obj(
+            gmn_client_v2, pid="no/file_name", fileName="", formatId="text/csv"
+        )
+        ore_pid = self.create_resource_map(gmn_client_v2, [pid])
+        response = self.call_d1_client(gmn_client_v2.getPackage, ore_pid)
+        bagit_zip = zipfile.ZipFile(io.BytesIO(response.content))
+        name_list = [os.path.basename(o.filename) for o in bagit_zip.filelist]
+        assert "no%2Ffile_name.csv" in name_list
+        assert "no%2Ffile_name.csv.sysmeta.xml" in name_list
+        assert not [n for n in name_list if n.startswith("None")]
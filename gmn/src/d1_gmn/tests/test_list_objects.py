@@ -205,3 +205,16 @@ class TestListObjects(d1_gmn.tests.gmn_test_case.GMNTestCase):
                 "replica_status_filter",
                 gmn_client_v1_v2,
             )
+
+    @responses.activate
+    def test_1130(self, gmn_client_v1_v2):
+        """MNRead.listObjects(): The number of SQL queries does not depend on the
+        number of objects in the slice."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            n_small = self.count_sql_queries(
+                gmn_client_v1_v2.listObjects, start=0, count=2
+            )
+            n_large = self.count_sql_queries(
+                gmn_client_v1_v2.listObjects, start=0, count=50
+            )
+            assert n_small == n_large
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the "audit-sync-mn-to-cn" management command.
+
+The calls to the CN are replaced, so these tests check only the retrieval, sorting
+and merging of the object lists.
+
+"""
+import asyncio
+import importlib
+import logging
+import os
+
+import d1_common.types.dataoneTypes
+import d1_common.utils.progress_tracker
+
+import d1_gmn.tests.gmn_test_case
+
+# The command name contains dashes, so the module cannot be imported with an import
+# statement.
+audit_cmd = importlib.import_module(
+    "d1_gmn.app.management.commands.audit-sync-mn-to-cn"
+)
+
+
+class _CnClient:
+    """Replacement for the AsyncDataONEClient that returns no more than
+    ``max_page_size`` objects from CNRead.listObjects()."""
+
+    def __init__(self, pid_list, max_page_size):
+        self.pid_list = pid_list
+        self.max_page_size = max_page_size
+        self.start_list = []
+
+    async def list_objects(self, nodeId=None, start=0, count=100):
+        object_list_pyxb = d1_common.types.dataoneTypes.objectList()
+        object_list_pyxb.total = len(self.pid_list)
+        if count:
+            self.start_list.append(start)
+        for pid in self.pid_list[start : start + min(count, self.max_page_size)]:
+            object_info_pyxb = d1_common.types.dataoneTypes.ObjectInfo()
+            object_info_pyxb.identifier = pid
+            object_list_pyxb.objectInfo.append(object_info_pyxb)
+        object_list_pyxb.count = len(object_list_pyxb.objectInfo)
+        object_list_pyxb.start = start
+        return object_list_pyxb
+
+
+class TestMgmtAuditSyncMnToCn(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _audit(self, cmd, audit_func):
+        """Run ``audit_func`` on an event loop, with the CN check replaced.
+
+        Returns:
+            list: PIDs that were checked and synchronized.
+
+        """
+        checked_list = []
+
+        async def check_and_sync(pid):
+            checked_list.append(pid)
+
+        cmd.check_and_sync = check_and_sync
+        with d1_common.utils.progress_tracker.ProgressTracker(
+            logging.getLogger(__name__)
+        ) as tracker:
+            cmd.tracker = tracker
+
+            async def audit():
+                await audit_func()
+                await cmd.await_all()
+
+            asyncio.run(audit())
+        return checked_list
+
+    def test_1000(self):
+        """ExternalSorter: Yields unique PIDs in sorted order and removes its temporary
+        files."""
+        pid_list = ["pid_{}".format(i % 25) for i in range(100, 0, -1)]
+        pid_list.append('pid with "quotes"\nand newline')
+        with audit_cmd.ExternalSorter(chunk_size=7) as sorter:
+            for pid in pid_list:
+                sorter.add(pid)
+            assert sorter.count == len(pid_list)
+            run_path_list = list(sorter._run_path_list)
+            assert len(run_path_list) == len(pid_list) // 7
+            assert list(sorter) == sorted(set(pid_list))
+        assert not any(os.path.exists(p) for p in run_path_list)
+
+    def test_1010(self):
+        """iter_merge_by_pid(): Local PIDs that are not on the CN are flagged."""
+        assert list(
+            audit_cmd.iter_merge_by_pid(["a", "b", "d", "f"], ["b", "c", "d", "e"])
+        ) == [("a", False), ("b", True), ("d", True), ("f", False)]
+        assert list(audit_cmd.iter_merge_by_pid(["a"], [])) == [("a", False)]
+
+    def test_1020(self):
+        """load_cn_pids(): All objects are retrieved when the CN returns shorter pages
+        than requested."""
+        cn_pid_list = ["pid_{}".format(i) for i in range(23)]
+        cmd = audit_cmd.Command()
+        cmd.async_d1_client = _CnClient(cn_pid_list, max_page_size=5)
+        cmd.opt_dict = {"list_page_size": 10}
+        with d1_common.utils.progress_tracker.ProgressTracker(
+            logging.getLogger(__name__)
+        ) as tracker:
+            cmd.tracker = tracker
+            with audit_cmd.ExternalSorter() as sorter:
+                asyncio.run(cmd.load_cn_pids(sorter))
+                assert list(sorter) == sorted(cn_pid_list)
+        assert cmd.async_d1_client.start_list == [0, 5, 10, 15, 20]
+
+    def test_1030(self):
+        """audit_by_object_list(): Only local objects that are missing in the CN
+        object list are checked and synchronized."""
+        cmd = audit_cmd.Command()
+        cmd.async_d1_client = _CnClient(["pid_1", "pid_3"], max_page_size=10)
+        cmd.opt_dict = {"list_page_size": 10, "max_concurrent": 2}
+        cmd.load_local_pids = lambda sorter: [
+            sorter.add(pid) for pid in ["pid_3", "pid_2", "pid_1", "pid_0"]
+        ]
+        checked_list = self._audit(cmd, cmd.audit_by_object_list)
+        assert sorted(checked_list) == ["pid_0", "pid_2"]
+
+    def test_1040(self):
+        """audit_by_object_list(): The local object list is read from the DB without
+        blocking the event loop, and objects missing on the CN are checked."""
+        pid_list = sorted(self.get_pid_list())
+        cmd = audit_cmd.Command()
+        cmd.async_d1_client = _CnClient(pid_list[::2], max_page_size=10)
+        cmd.opt_dict = {"list_page_size": 10, "max_concurrent": 2}
+        checked_list = self._audit(cmd, cmd.audit_by_object_list)
+        assert sorted(checked_list) == pid_list[1::2]
+
+    def test_1050(self):
+        """audit_per_pid(): The local objects in the PID list are read from the DB
+        without blocking the event loop, and each is checked."""
+        pid_list = self.get_random_pid_sample(5)
+        cmd = audit_cmd.Command()
+        cmd.pid_set = set(pid_list + ["unknown_pid"])
+        cmd.opt_dict = {"max_concurrent": 2}
+        checked_list = self._audit(cmd, cmd.audit_per_pid)
+        assert sorted(checked_list) == sorted(pid_list)
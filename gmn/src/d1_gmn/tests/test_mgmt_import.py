@@ -16,9 +16,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Test the bulk importer management command."""
+import asyncio
+import importlib
+import logging
+import os
+
 import pytest
 import responses
 
+import d1_common.utils.progress_tracker
+
+import django.core.management.base
+
 import d1_gmn.tests.gmn_test_case
 
 import d1_test.d1_test_case
@@ -27,6 +36,24 @@ import d1_test.mock_api.get_log_records
 import d1_test.mock_api.get_system_metadata
 import d1_test.mock_api.list_objects
 
+# "import" is a keyword, so the module cannot be imported with an import statement.
+import_cmd = importlib.import_module("d1_gmn.app.management.commands.import")
+
+
+class _EmptyListIter:
+    """Replacement for the async object list and event log iterators, for a source MN
+    that has no objects or events."""
+
+    @property
+    async def total(self):
+        return 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise StopAsyncIteration
+
 
 @pytest.mark.skip("Need to find if responses can be mocked for aiohttp")
 # See: https://docs.aiohttp.org/en/stable/testing.html
@@ -69,3 +96,90 @@ class TestMgmtImport(d1_gmn.tests.gmn_test_case.GMNTestCase):
         # log_str = re.sub(r'(?:total_run_sec=)[\d.]*', '[SEC]', log_str)
         # log_str = re.sub(r'(?:total_run_dhm=)[\ddhm"]*', '[DHM]', log_str)
         self.sample.assert_equals(log_str, "bulk_import_log")
+
+
+class TestMgmtImportPipeline(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def test_1000(self, tmp_path):
+        """ImportCheckpoint: Records are available after reopening the checkpoint,
+        and an incomplete last line is ignored."""
+        checkpoint_path = str(tmp_path / "import.checkpoint")
+        checkpoint = import_cmd.ImportCheckpoint(checkpoint_path)
+        assert not checkpoint.is_resumed()
+        checkpoint.add("sciobj", ["pid_1", "pid_2"])
+        checkpoint.add("event", ["entry_1"])
+        checkpoint.close()
+        with open(checkpoint_path, "a") as f:
+            f.write('["sciobj", "pid_')
+        checkpoint = import_cmd.ImportCheckpoint(checkpoint_path)
+        assert checkpoint.is_resumed()
+        assert checkpoint.contains("sciobj", "pid_2")
+        assert checkpoint.contains("event", "entry_1")
+        assert not checkpoint.contains("event", "pid_1")
+        assert checkpoint.count("sciobj") == 2
+        checkpoint.close()
+        checkpoint.remove()
+        assert not os.path.exists(checkpoint_path)
+
+    def test_1010(self, tmp_path):
+        """ImportCheckpoint.clear(): Removes only the records of the given kind."""
+        checkpoint_path = str(tmp_path / "import.checkpoint")
+        checkpoint = import_cmd.ImportCheckpoint(checkpoint_path)
+        checkpoint.add("sciobj", ["pid_1"])
+        checkpoint.add("event", ["entry_1"])
+        checkpoint.clear("event")
+        checkpoint.close()
+        checkpoint = import_cmd.ImportCheckpoint(checkpoint_path)
+        assert checkpoint.contains("sciobj", "pid_1")
+        assert not checkpoint.contains("event", "entry_1")
+        checkpoint.close()
+
+    def test_1020(self):
+        """write_db_batch(): Items in a failed batch are written one by one."""
+        cmd = import_cmd.Command()
+        written_list = []
+
+        def write_batch(item_list):
+            if "invalid" in item_list:
+                raise ValueError("invalid item")
+            written_list.extend(item_list)
+
+        cmd.write_db_batch(write_batch, ["a", "invalid", "b"])
+        assert written_list == ["a", "b"]
+
+    def _handle_async(self, checkpoint_path, **opt_dict):
+        """Run the import from a source MN that has no objects or events."""
+        cmd = import_cmd.Command()
+        cmd.opt_dict = {
+            "checkpoint_path": checkpoint_path,
+            "force": False,
+            "clear": False,
+            "only_log": False,
+            "pid_path": None,
+            "file_workers": 2,
+            "db_batch_size": 10,
+            "max_concurrent": 2,
+            **opt_dict,
+        }
+        cmd.async_object_list_iter = _EmptyListIter()
+        cmd.async_event_log_iter = _EmptyListIter()
+        with d1_common.utils.progress_tracker.ProgressTracker(
+            logging.getLogger(__name__)
+        ) as tracker:
+            cmd.tracker = tracker
+            asyncio.run(cmd.handle_async())
+
+    def test_1030(self, tmp_path):
+        """handle_async(): The check for an empty DB runs without blocking the event
+        loop, and the import is refused if the DB already holds objects."""
+        checkpoint_path = str(tmp_path / "import.checkpoint")
+        with pytest.raises(
+            django.core.management.base.CommandError, match="already local objects"
+        ):
+            self._handle_async(checkpoint_path)
+
+    def test_1040(self, tmp_path):
+        """handle_async(): With --force, the import runs to completion and removes the
+        checkpoint file."""
+        checkpoint_path = str(tmp_path / "import.checkpoint")
+        self._handle_async(checkpoint_path, force=True)
+        assert not os.path.exists(checkpoint_path)
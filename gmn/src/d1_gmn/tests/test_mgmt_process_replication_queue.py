@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the "process_replication_queue" management command.
+
+The calls to the CN and source MNs are replaced, so these tests check only the
+scheduling of the requests, the resolving of source nodes and the download of the
+object bytes.
+
+"""
+import collections
+import os
+import threading
+import time
+import types
+
+import pytest
+import requests.exceptions
+
+import django.core.management.base
+import django.test
+
+import d1_common.checksum
+import d1_common.types.dataoneTypes
+import d1_common.types.exceptions
+
+import d1_gmn.app.cache
+import d1_gmn.app.management.commands.process_replication_queue
+import d1_gmn.tests.gmn_test_case
+
+
+SCIOBJ_BYTES = b"0123456789" * 100
+
+
+def _create_queue_model(pid, node_urn):
+    return types.SimpleNamespace(
+        local_replica=types.SimpleNamespace(
+            pid=types.SimpleNamespace(did=pid),
+            info=types.SimpleNamespace(member_node=types.SimpleNamespace(urn=node_urn)),
+        ),
+        failed_attempts=0,
+    )
+
+
+def _create_sysmeta(sciobj_bytes):
+    return types.SimpleNamespace(
+        size=len(sciobj_bytes),
+        checksum=d1_common.checksum.create_checksum_object_from_bytes(sciobj_bytes),
+    )
+
+
+class _SourceNodeResponse:
+    """Response to MNReplication.getReplica() that honors Range requests and can be
+    cut off after a number of bytes, like a streamed response on a dropped
+    connection."""
+
+    def __init__(self, sciobj_bytes, headers, honor_range=True, cut_off_size=None):
+        first_byte = 0
+        range_str = (headers or {}).get("Range")
+        if range_str and honor_range:
+            first_byte = int(range_str[len("bytes=") : -1])
+            self.status_code = 206
+            self.headers = {
+                "Content-Range": "bytes {}-{}/{}".format(
+                    first_byte, len(sciobj_bytes) - 1, len(sciobj_bytes)
+                )
+            }
+        else:
+            self.status_code = 200
+            self.headers = {}
+        self._bytes = sciobj_bytes[first_byte:cut_off_size]
+        self._is_cut_off = cut_off_size is not None
+        self.requested_first_byte = first_byte
+        self.is_closed = False
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self._bytes), 100):
+            yield self._bytes[i : i + 100]
+        if self._is_cut_off:
+            raise requests.exceptions.ChunkedEncodingError("Connection broken")
+
+    def close(self):
+        self.is_closed = True
+
+
+def _create_node_list(node_urn_list):
+    node_list_pyxb = d1_common.types.dataoneTypes.nodeList()
+    for node_urn in node_urn_list:
+        node_pyxb = d1_common.types.dataoneTypes.Node()
+        node_pyxb.identifier = node_urn
+        node_pyxb.baseURL = "https://{}/mn".format(node_urn)
+        node_list_pyxb.node.append(node_pyxb)
+    return node_list_pyxb
+
+
+class TestMgmtProcessReplicationQueue(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    @pytest.fixture(scope="function")
+    def cmd(self):
+        d1_gmn.app.cache.get_cache("node_base_url").clear()
+        return d1_gmn.app.management.commands.process_replication_queue.Command()
+
+    def _set_source_node(self, cmd, sciobj_bytes, **response_kwargs):
+        """Replace the source node. Returns the list of responses."""
+        response_list = []
+
+        def get_replica_response(pid, headers=None):
+            response_list.append(
+                _SourceNodeResponse(sciobj_bytes, headers, **response_kwargs)
+            )
+            return response_list[-1]
+
+        mn_client = types.SimpleNamespace(
+            getReplicaResponse=get_replica_response,
+            getReplica=lambda pid: get_replica_response(pid),
+        )
+        cmd.resolve_source_node_id_to_base_url = lambda node_urn: "https://mn"
+        cmd.get_mn_client = lambda base_url: mn_client
+        return response_list
+
+    def test_1000(self, cmd):
+        """process_replication_requests_concurrently(): All requests are processed,
+        with no more than REPLICATION_CONCURRENCY_PER_NODE at a time for each source
+        node."""
+        lock = threading.Lock()
+        active_dict = collections.Counter()
+        max_active_dict = collections.Counter()
+        processed_list = []
+
+        def process_replication_request(queue_model):
+            node_urn = queue_model.local_replica.info.member_node.urn
+            with lock:
+                active_dict[node_urn] += 1
+                max_active_dict[node_urn] = max(
+                    max_active_dict[node_urn], active_dict[node_urn]
+                )
+            time.sleep(0.01)
+            with lock:
+                active_dict[node_urn] -= 1
+                processed_list.append(queue_model.local_replica.pid.did)
+
+        cmd.process_replication_request = process_replication_request
+        queue_model_list = [
+            _create_queue_model("pid_{}".format(i), "urn:node:n{}".format(i % 3))
+            for i in range(30)
+        ]
+        with django.test.override_settings(
+            REPLICATION_CONCURRENCY=4, REPLICATION_CONCURRENCY_PER_NODE=2
+        ):
+            cmd.process_replication_requests_concurrently(queue_model_list)
+        assert sorted(processed_list) == sorted("pid_{}".format(i) for i in range(30))
+        assert max(max_active_dict.values()) <= 2
+
+    def test_1010(self, cmd):
+        """resolve_source_node_id_to_base_url(): Node list is retrieved from the CN
+        once, and again only when a node is not in the cached list."""
+        node_list_list = [
+            _create_node_list(["urn:node:a"]),
+            _create_node_list(["urn:node:a", "urn:node:b"]),
+        ]
+        cmd.get_node_list = lambda: node_list_list.pop(0)
+        assert (
+            cmd.resolve_source_node_id_to_base_url("urn:node:a")
+            == "https://urn:node:a/mn"
+        )
+        assert (
+            cmd.resolve_source_node_id_to_base_url("urn:node:a")
+            == "https://urn:node:a/mn"
+        )
+        assert len(node_list_list) == 1
+        assert (
+            cmd.resolve_source_node_id_to_base_url("urn:node:b")
+            == "https://urn:node:b/mn"
+        )
+        assert not node_list_list
+
+    def test_1020(self, cmd):
+        """resolve_source_node_id_to_base_url(): Unknown node raises CommandError."""
+        cmd.get_node_list = lambda: _create_node_list(["urn:node:a"])
+        with pytest.raises(django.core.management.base.CommandError):
+            cmd.resolve_source_node_id_to_base_url("urn:node:unknown")
+
+    def test_1030(self, cmd):
+        """download_sciobj(): Interrupted download is resumed with a Range request."""
+        pid = "resume_pid"
+        queue_model = _create_queue_model(pid, "urn:node:a")
+        sysmeta_pyxb = _create_sysmeta(SCIOBJ_BYTES)
+        cut_off_list = self._set_source_node(cmd, SCIOBJ_BYTES, cut_off_size=300)
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            cmd.download_sciobj(queue_model, sysmeta_pyxb)
+        assert cut_off_list[0].is_closed
+        assert os.path.getsize(cmd.get_partial_sciobj_path(pid)) == 300
+        response_list = self._set_source_node(cmd, SCIOBJ_BYTES)
+        partial_sciobj_path = cmd.download_sciobj(queue_model, sysmeta_pyxb)
+        assert [r.requested_first_byte for r in response_list] == [300]
+        assert response_list[0].is_closed
+        with open(partial_sciobj_path, "rb") as f:
+            assert f.read() == SCIOBJ_BYTES
+        os.unlink(partial_sciobj_path)
+
+    def test_1040(self, cmd):
+        """download_sciobj(): Download is restarted if the source node does not honor
+        the Range request."""
+        pid = "restart_pid"
+        queue_model = _create_queue_model(pid, "urn:node:a")
+        sysmeta_pyxb = _create_sysmeta(SCIOBJ_BYTES)
+        cut_off_list = self._set_source_node(cmd, SCIOBJ_BYTES, cut_off_size=300)
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            cmd.download_sciobj(queue_model, sysmeta_pyxb)
+        assert cut_off_list[0].is_closed
+        assert os.path.getsize(cmd.get_partial_sciobj_path(pid)) == 300
+        response_list = self._set_source_node(cmd, SCIOBJ_BYTES, honor_range=False)
+        partial_sciobj_path = cmd.download_sciobj(queue_model, sysmeta_pyxb)
+        assert [r.status_code for r in response_list] == [200]
+        with open(partial_sciobj_path, "rb") as f:
+            assert f.read() == SCIOBJ_BYTES
+        os.unlink(partial_sciobj_path)
+
+    def test_1050(self, cmd):
+        """download_sciobj(): Download with a checksum that does not match the System
+        Metadata raises InvalidSystemMetadata and is discarded."""
+        queue_model = _create_queue_model("corrupt_pid", "urn:node:a")
+        sysmeta_pyxb = _create_sysmeta(SCIOBJ_BYTES)
+        self._set_source_node(cmd, SCIOBJ_BYTES[::-1])
+        with pytest.raises(d1_common.types.exceptions.InvalidSystemMetadata):
+            cmd.download_sciobj(queue_model, sysmeta_pyxb)
+        assert not os.path.exists(cmd.get_partial_sciobj_path("corrupt_pid"))
+
+    def test_1060(self, cmd):
+        """get_mn_client(): Client streams responses and is reused for the node."""
+        mn_client = cmd.get_mn_client("https://mn")
+        assert mn_client._default_request_arg_dict["stream"] is True
+        assert cmd.get_mn_client("https://mn") is mn_client
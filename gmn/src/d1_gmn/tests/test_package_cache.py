@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the on-disk cache of BagIt packages."""
+
+import os
+
+import pytest
+
+import django.test
+
+import d1_gmn.app.object_format_cache
+import d1_gmn.app.package_cache
+import d1_gmn.tests.gmn_test_case
+
+
+class TestPackageCache(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    @pytest.fixture(scope="function")
+    def cache_dir_path(self, tmp_path):
+        with django.test.override_settings(
+            PACKAGE_CACHE_DIR_PATH=str(tmp_path), PACKAGE_CACHE_MAX_SIZE=300
+        ):
+            yield str(tmp_path)
+
+    def _add(self, package_path, package_bytes):
+        package_iter = d1_gmn.app.package_cache.write_iter(
+            package_path, [package_bytes[:10], package_bytes[10:]]
+        )
+        assert b"".join(package_iter) == package_bytes
+
+    def test_1000(self, cache_dir_path):
+        """write_iter(): Package is available from the cache after it has been
+        streamed."""
+        package_path = os.path.join(cache_dir_path, "package.zip")
+        assert d1_gmn.app.package_cache.get_iter(package_path) is None
+        self._add(package_path, b"package bytes")
+        assert b"".join(d1_gmn.app.package_cache.get_iter(package_path)) == (
+            b"package bytes"
+        )
+
+    def test_1010(self, cache_dir_path):
+        """write_iter(): Package that is not streamed to the end is not added to the
+        cache."""
+        package_path = os.path.join(cache_dir_path, "package.zip")
+        package_iter = d1_gmn.app.package_cache.write_iter(
+            package_path, [b"first chunk", b"second chunk"]
+        )
+        assert next(package_iter) == b"first chunk"
+        package_iter.close()
+        assert os.listdir(cache_dir_path) == []
+
+    def test_1020(self, cache_dir_path):
+        """write_iter(): Least recently used packages are removed when the cache
+        exceeds PACKAGE_CACHE_MAX_SIZE."""
+        for i in range(3):
+            package_path = os.path.join(cache_dir_path, "package_{}.zip".format(i))
+            self._add(package_path, b"x" * 100)
+            os.utime(package_path, (i, i))
+        # Use the oldest package.
+        d1_gmn.app.package_cache.get_iter(
+            os.path.join(cache_dir_path, "package_0.zip")
+        ).close()
+        self._add(os.path.join(cache_dir_path, "package_3.zip"), b"x" * 100)
+        assert sorted(os.listdir(cache_dir_path)) == [
+            "package_0.zip",
+            "package_2.zip",
+            "package_3.zip",
+        ]
+
+    def test_1030(self):
+        """is_compressible(): Formats that are already compressed are not
+        compressible."""
+        assert not d1_gmn.app.object_format_cache.is_compressible("image/jpeg")
+        assert not d1_gmn.app.object_format_cache.is_compressible("application/zip")
+        assert d1_gmn.app.object_format_cache.is_compressible("text/csv")
+        assert d1_gmn.app.object_format_cache.is_compressible("unknown_format_id")
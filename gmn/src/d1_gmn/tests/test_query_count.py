@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test cached total counts for listObjects() and getLogRecords()."""
+
+import pytest
+import responses
+
+import django.db
+import django.test
+import django.test.utils
+
+import d1_gmn.app.delete
+import d1_gmn.app.event_log
+import d1_gmn.app.models
+import d1_gmn.app.query_count
+import d1_gmn.tests.gmn_mock
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+
+
+@pytest.fixture(scope="function")
+def count_cache_settings():
+    with django.test.override_settings(
+        QUERY_COUNT_CACHE_ENABLED=True, LOG_IGNORE_TRUSTED_SUBJECT=False
+    ):
+        yield
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestQueryCount")
+@pytest.mark.usefixtures("count_cache_settings")
+class TestQueryCount(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _get_live_total_objects(self, client, **filters):
+        with django.test.override_settings(QUERY_COUNT_CACHE_ENABLED=False):
+            return self.get_total_objects(client, **filters)
+
+    def _get_live_total_log_records(self, client, **filters):
+        with django.test.override_settings(QUERY_COUNT_CACHE_ENABLED=False):
+            return self.get_total_log_records(client, **filters)
+
+    @responses.activate
+    def test_1000(self, gmn_client_v1_v2):
+        """listObjects(): Count is cached and matches the count in the database."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            total_int = self.get_total_objects(gmn_client_v1_v2)
+            assert total_int == self._get_live_total_objects(gmn_client_v1_v2)
+            assert d1_gmn.app.models.QueryCount.objects.filter(
+                query_type="object_list", count=total_int
+            ).exists()
+
+    @responses.activate
+    def test_1010(self, gmn_client_v1_v2):
+        """listObjects(): Cached counts are updated when objects are created and
+        deleted."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            total_1 = self.get_total_objects(gmn_client_v1_v2)
+            format_1 = self.get_total_objects(
+                gmn_client_v1_v2, formatId="application/octet-stream"
+            )
+            pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(
+                gmn_client_v1_v2, formatId="application/octet-stream"
+            )
+            total_2 = self.get_total_objects(gmn_client_v1_v2)
+            assert total_2 == total_1 + 1
+            assert total_2 == self._get_live_total_objects(gmn_client_v1_v2)
+            assert (
+                self.get_total_objects(
+                    gmn_client_v1_v2, formatId="application/octet-stream"
+                )
+                == format_1 + 1
+            )
+            d1_gmn.app.delete.delete_sciobj_from_database(pid)
+            assert self.get_total_objects(gmn_client_v1_v2) == total_1
+
+    @responses.activate
+    def test_1020(self, gmn_client_v1_v2):
+        """listObjects(): Count for untrusted subject matches the count in the
+        database after an object is created."""
+        with d1_gmn.tests.gmn_mock.set_auth_context(["public"], []):
+            total_1 = self.get_total_objects(gmn_client_v1_v2)
+        self.create_obj(gmn_client_v1_v2)
+        with d1_gmn.tests.gmn_mock.set_auth_context(["public"], []):
+            total_2 = self.get_total_objects(gmn_client_v1_v2)
+            assert total_2 == self._get_live_total_objects(gmn_client_v1_v2)
+            assert total_2 in (total_1, total_1 + 1)
+
+    @responses.activate
+    def test_1030(self, gmn_client_v1_v2):
+        """getLogRecords(): Cached counts are updated when events are logged."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(gmn_client_v1_v2)
+            total_1 = self.get_total_log_records(gmn_client_v1_v2)
+            read_1 = self.get_total_log_records(gmn_client_v1_v2, event="read")
+            gmn_client_v1_v2.get(pid)
+            assert self.get_total_log_records(gmn_client_v1_v2) == total_1 + 1
+            assert (
+                self.get_total_log_records(gmn_client_v1_v2, event="read") == read_1 + 1
+            )
+            assert self.get_total_log_records(
+                gmn_client_v1_v2
+            ) == self._get_live_total_log_records(gmn_client_v1_v2)
+
+    @responses.activate
+    def test_1040(self, gmn_client_v1_v2):
+        """getLogRecords(): Cached counts are updated when the events are removed
+        together with the object."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(gmn_client_v1_v2)
+            gmn_client_v1_v2.get(pid)
+            total_1 = self.get_total_log_records(gmn_client_v1_v2)
+            d1_gmn.app.delete.delete_sciobj_from_database(pid)
+            total_2 = self.get_total_log_records(gmn_client_v1_v2)
+            assert total_2 < total_1
+            assert total_2 == self._get_live_total_log_records(gmn_client_v1_v2)
+
+    @responses.activate
+    def test_1050(self, gmn_client_v1_v2):
+        """listObjects(): Filters that are not supported by the cache are counted in
+        the database."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            pid = self.get_pid_list()[0]
+            assert self.get_total_objects(gmn_client_v1_v2, identifier=pid) == 1
+            assert not d1_gmn.app.models.QueryCount.objects.exists()
+
+    def test_1060(self):
+        """Logging an event does not read or write the cached counts."""
+        sciobj_model = d1_gmn.app.models.ScienceObject.objects.first()
+        with django.test.utils.CaptureQueriesContext(django.db.connection) as ctx:
+            d1_gmn.app.event_log.create_log_entry(
+                sciobj_model, "read", "1.2.3.4", "count-test-agent", "count-subject"
+            )
+        assert not [q for q in ctx.captured_queries if "querycount" in q["sql"]]
+
+    @responses.activate
+    def test_1070(self, gmn_client_v1_v2):
+        """listObjects(): A count from an earlier generation is not used."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            total_int = self.get_total_objects(gmn_client_v1_v2)
+            d1_gmn.app.models.QueryCount.objects.update(count=-1)
+            assert self.get_total_objects(gmn_client_v1_v2) == -1
+            with d1_gmn.app.query_count.track_sciobj_change():
+                pass
+            assert self.get_total_objects(gmn_client_v1_v2) == total_int
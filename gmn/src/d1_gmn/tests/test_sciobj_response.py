@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test delivery of SciObj bytes in MNRead.get(), with the supported delivery modes,
+HTTP Range requests and conditional requests."""
+
+import mock
+import pytest
+import responses
+
+import django.test
+
+import d1_gmn.app.models
+import d1_gmn.app.sciobj_store
+import d1_gmn.app.views.headers
+import d1_gmn.app.views.sciobj_response
+import d1_gmn.tests.gmn_mock
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+
+
+@pytest.fixture(params=["stream", "file"])
+def delivery_mode(request):
+    with django.test.override_settings(SCIOBJ_DELIVERY_MODE=request.param):
+        yield request.param
+
+
+def _get_byte_range_list(range_str, size, **header_dict):
+    request = django.test.RequestFactory().get("/", HTTP_RANGE=range_str, **header_dict)
+    return d1_gmn.app.views.sciobj_response.get_byte_range_list(
+        request, size, ['"SHA-1:abc"']
+    )
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestSciObjResponse")
+class TestSciObjResponse(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _get(self, client, pid, range_str=None, header_dict=None):
+        header_dict = dict(header_dict or {})
+        if range_str:
+            header_dict["Range"] = range_str
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            return client.getResponse(pid, vendorSpecific=header_dict or None)
+
+    @responses.activate
+    def test_1000(self, gmn_client_v1_v2, delivery_mode):
+        """MNRead.get(): Full object is returned when no range is requested."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(gmn_client_v1_v2)
+        response = self._get(gmn_client_v1_v2, pid)
+        assert response.status_code == 200
+        assert response.content == sciobj_bytes
+        assert response.headers["Accept-Ranges"] == "bytes"
+
+    @responses.activate
+    @pytest.mark.parametrize(
+        "range_str,first_byte,last_byte",
+        [("bytes=0-9", 0, 9), ("bytes=10-", 10, None), ("bytes=-5", -5, None)],
+    )
+    def test_1010(
+        self, gmn_client_v1_v2, delivery_mode, range_str, first_byte, last_byte
+    ):
+        """MNRead.get(): Single byte range is returned with 206 Partial Content."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(gmn_client_v1_v2)
+        expected_bytes = sciobj_bytes[
+            first_byte : None if last_byte is None else last_byte + 1
+        ]
+        response = self._get(gmn_client_v1_v2, pid, range_str)
+        assert response.status_code == 206
+        assert response.content == expected_bytes
+        assert response.headers["Content-Length"] == str(len(expected_bytes))
+        assert response.headers["Content-Range"].endswith(
+            "/{}".format(len(sciobj_bytes))
+        )
+
+    @responses.activate
+    def test_1020(self, gmn_client_v1_v2):
+        """MNRead.get(): Range starting after the end of the object returns 416 Range
+        Not Satisfiable."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(gmn_client_v1_v2)
+        response = self._get(
+            gmn_client_v1_v2, pid, "bytes={}-".format(len(sciobj_bytes))
+        )
+        assert response.status_code == 416
+        assert response.headers["Content-Range"] == "bytes */{}".format(
+            len(sciobj_bytes)
+        )
+
+    @responses.activate
+    def test_1030(self, gmn_client_v1_v2):
+        """MNRead.get(): x_sendfile hands the path of the file to the front-end
+        server."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(gmn_client_v1_v2)
+        with django.test.override_settings(SCIOBJ_DELIVERY_MODE="x_sendfile"):
+            response = self._get(gmn_client_v1_v2, pid)
+        assert response.status_code == 200
+        assert response.content == b""
+        assert response.headers[
+            "X-Sendfile"
+        ] == d1_gmn.app.sciobj_store.get_abs_sciobj_file_path_by_pid(pid)
+
+    @responses.activate
+    def test_1040(self, gmn_client_v1_v2):
+        """MNRead.get(): x_accel_redirect hands a URL for the file to the front-end
+        server."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(gmn_client_v1_v2)
+        with django.test.override_settings(
+            SCIOBJ_DELIVERY_MODE="x_accel_redirect",
+            SCIOBJ_X_ACCEL_REDIRECT_URL="/protected/",
+        ):
+            response = self._get(gmn_client_v1_v2, pid)
+        assert response.headers["X-Accel-Redirect"] == "/protected/{}".format(
+            d1_gmn.app.sciobj_store.get_rel_sciobj_file_path(pid)
+        )
+
+    @pytest.mark.parametrize(
+        "range_str,expected",
+        [
+            ("bytes=0-0", [(0, 0)]),
+            ("bytes=5-", [(5, 99)]),
+            ("bytes=90-200", [(90, 99)]),
+            ("bytes=-10", [(90, 99)]),
+            ("bytes=-200", [(0, 99)]),
+            ("bytes=0-1,5-6", [(0, 1), (5, 6)]),
+            ("bytes=0-1,200-300", [(0, 1)]),
+            ("bytes=9-5", None),
+            ("bytes=0-1,9-5", None),
+            ("items=0-1", None),
+            ("bytes=-", None),
+            ("bytes=" + ",".join(["0-1"] * 101), None),
+        ],
+    )
+    def test_1050(self, range_str, expected):
+        """get_byte_range_list(): Parses single and multiple ranges and ignores
+        invalid Range headers."""
+        assert _get_byte_range_list(range_str, 100) == expected
+
+    @pytest.mark.parametrize(
+        "range_str", ["bytes=100-", "bytes=-0", "bytes=100-101,200-"]
+    )
+    def test_1060(self, range_str):
+        """get_byte_range_list(): Raises RangeNotSatisfiable when none of the ranges
+        overlap the object."""
+        with pytest.raises(d1_gmn.app.views.sciobj_response.RangeNotSatisfiable):
+            _get_byte_range_list(range_str, 100)
+
+    def test_1070(self):
+        """get_byte_range_list(): Range is ignored if If-Range does not match."""
+        assert _get_byte_range_list("bytes=0-1", 100, HTTP_IF_RANGE='"SHA-1:abc"') == [
+            (0, 1)
+        ]
+        assert _get_byte_range_list("bytes=0-1", 100, HTTP_IF_RANGE='"other"') is None
+
+    @responses.activate
+    def test_1080(self, gmn_client_v1_v2, delivery_mode):
+        """MNRead.get(): Multiple ranges are returned as multipart/byteranges."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(gmn_client_v1_v2)
+        response = self._get(gmn_client_v1_v2, pid, "bytes=0-4,10-14")
+        assert response.status_code == 206
+        content_type_str = response.headers["Content-Type"]
+        assert content_type_str.startswith("multipart/byteranges; boundary=")
+        boundary_bytes = content_type_str.split("=")[1].encode("utf-8")
+        assert response.content.count(b"--" + boundary_bytes) == 3
+        assert sciobj_bytes[0:5] in response.content
+        assert sciobj_bytes[10:15] in response.content
+        assert response.headers["Content-Length"] == str(len(response.content))
+
+    @responses.activate
+    def test_1090(self, gmn_client_v1_v2):
+        """MNRead.get(): Returns 304 Not Modified when If-None-Match matches the ETag,
+        and the full object when it does not."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(gmn_client_v1_v2)
+        etag_str = self._get(gmn_client_v1_v2, pid).headers["ETag"]
+        response = self._get(
+            gmn_client_v1_v2, pid, header_dict={"If-None-Match": etag_str}
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag_str
+        response = self._get(
+            gmn_client_v1_v2, pid, header_dict={"If-None-Match": '"other"'}
+        )
+        assert response.status_code == 200
+        assert response.content == sciobj_bytes
+
+    @responses.activate
+    def test_1100(self, gmn_client_v1_v2):
+        """MNRead.get(): Returns 304 Not Modified when If-Modified-Since is not older
+        than the object."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(gmn_client_v1_v2)
+        last_modified_str = self._get(gmn_client_v1_v2, pid).headers["Last-Modified"]
+        response = self._get(
+            gmn_client_v1_v2, pid, header_dict={"If-Modified-Since": last_modified_str}
+        )
+        assert response.status_code == 304
+
+    @responses.activate
+    def test_1110(self, gmn_client_v1_v2):
+        """MNRead.getSystemMetadata(): Returns 304 Not Modified when If-None-Match
+        matches the ETag."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(gmn_client_v1_v2)
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            etag_str = gmn_client_v1_v2.getSystemMetadataResponse(pid).headers["ETag"]
+            response = gmn_client_v1_v2.getSystemMetadataResponse(
+                pid, vendorSpecific={"If-None-Match": etag_str}
+            )
+        assert response.status_code == 304
+
+    def test_1120(self):
+        """MNRead.get(): Range request for a proxy object is forwarded to the remote
+        server."""
+        sciobj_model = d1_gmn.app.models.ScienceObject.objects.first()
+        sciobj_model.url = "https://proxy.invalid/object"
+        remote_response = mock.Mock(
+            status_code=206,
+            headers={"Content-Length": "2", "Content-Range": "bytes 0-1/100"},
+        )
+        remote_response.iter_content.return_value = iter([b"ab"])
+        request = django.test.RequestFactory().get("/", HTTP_RANGE="bytes=0-1")
+        with mock.patch(
+            "d1_gmn.app.proxy.get_sciobj_response_remote",
+            return_value=remote_response,
+        ) as remote_mock:
+            response = d1_gmn.app.views.sciobj_response.create_sciobj_response(
+                request, sciobj_model, "application/octet-stream"
+            )
+        assert remote_mock.call_args[0][1] == {"Range": "bytes=0-1"}
+        assert response.status_code == 206
+        assert response["Content-Range"] == "bytes 0-1/100"
+        assert response["Content-Length"] == "2"
+        assert b"".join(response.streaming_content) == b"ab"
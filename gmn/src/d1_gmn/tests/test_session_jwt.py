@@ -18,15 +18,31 @@
 """Test JSON Web Token parsing and validation."""
 
 import freezegun
+import mock
+import pytest
 
 import d1_common.cert.x509
 
-import django.core.cache
+import django.test
 
+import d1_gmn.app.cache
 import d1_gmn.app.middleware.session_jwt
 import d1_gmn.tests.gmn_test_case
 
 
+@pytest.fixture(scope="function")
+def reset_cn_cert():
+    """Clear the CN cert held by the process and prevent the background refresh
+    thread from being started."""
+    d1_gmn.app.cache.clear_all()
+    with mock.patch("d1_gmn.app.middleware.session_jwt._cn_cert_obj", None):
+        with mock.patch(
+            "d1_gmn.app.middleware.session_jwt.start_cn_cert_refresh"
+        ) as start_mock:
+            yield start_mock
+
+
+@pytest.mark.usefixtures("reset_cn_cert")
 class TestSessionJwt(d1_gmn.tests.gmn_test_case.GMNTestCase):
     def load_sample_cert_jwt_pair(self, cert_file_name, jwt_file_name):
         cert_pem = self.test_files.load_cert(cert_file_name)
@@ -71,5 +87,77 @@ class TestSessionJwt(d1_gmn.tests.gmn_test_case.GMNTestCase):
             # Did not call connect() and getpeercert() again
             assert len(mock_connect.mock_calls) == 1
             assert len(mock_getpeercert.mock_calls) == 1
-            # Object is in cache
-            assert cert_obj == django.core.cache.cache.cn_cert_obj
+            # Object is held by the process
+            assert cert_obj == d1_gmn.app.middleware.session_jwt._cn_cert_obj
+
+    def _validate(self, jwt_bu64):
+        return d1_gmn.app.middleware.session_jwt.get_subject_with_cached_validation(
+            jwt_bu64
+        )
+
+    @freezegun.freeze_time("2017-06-13 12:00:00")
+    def test_1020(self, reset_cn_cert):
+        """get_subject_with_cached_validation(): Validated JWT is cached and the
+        signature is not verified again."""
+        cert_obj, jwt_bu64 = self.load_sample_cert_jwt_pair(
+            "cert_cn_dataone_org_20170517_122900.pem",
+            "jwt_token_20170612_232523.base64",
+        )
+        stats_dict = d1_gmn.app.middleware.session_jwt.get_cache_stats()
+        with self.mock_ssl_download(cert_obj):
+            assert self._validate(jwt_bu64) == "http://orcid.org/0000-0001-8849-7530"
+        reset_cn_cert.assert_called_once_with()
+        with mock.patch(
+            "d1_common.cert.jwt.validate_and_decode", side_effect=AssertionError
+        ):
+            assert self._validate(jwt_bu64) == "http://orcid.org/0000-0001-8849-7530"
+        new_stats_dict = d1_gmn.app.middleware.session_jwt.get_cache_stats()
+        assert new_stats_dict["miss"] == stats_dict["miss"] + 1
+        assert new_stats_dict["hit"] == stats_dict["hit"] + 1
+
+    @freezegun.freeze_time("2017-06-13 23:00:00")
+    def test_1030(self):
+        """get_subject_with_cached_validation(): Cached validation expires when the JWT
+        expires."""
+        cert_obj, jwt_bu64 = self.load_sample_cert_jwt_pair(
+            "cert_cn_dataone_org_20170517_122900.pem",
+            "jwt_token_20170612_232523.base64",
+        )
+        with self.mock_ssl_download(cert_obj):
+            with mock.patch("d1_gmn.app.cache.NamespaceCache.set") as set_mock:
+                self._validate(jwt_bu64)
+        assert set_mock.call_args[0][2] == 25 * 60 + 23
+
+    @freezegun.freeze_time("2017-06-13 12:00:00")
+    def test_1040(self):
+        """get_subject_with_cached_validation(): JWT signed with another cert is
+        rejected and not cached."""
+        cert_obj, jwt_bu64 = self.load_sample_cert_jwt_pair(
+            "cert_cn_ucsb_1_dataone_org_20120604_191249.pem",
+            "jwt_token_20170612_232523.base64",
+        )
+        stats_dict = d1_gmn.app.middleware.session_jwt.get_cache_stats()
+        with self.mock_ssl_download(cert_obj):
+            with mock.patch("d1_gmn.app.cache.NamespaceCache.set") as set_mock:
+                assert self._validate(jwt_bu64) is None
+        assert not set_mock.called
+        new_stats_dict = d1_gmn.app.middleware.session_jwt.get_cache_stats()
+        assert new_stats_dict["invalid"] == stats_dict["invalid"] + 1
+
+    @freezegun.freeze_time("2017-06-13 12:00:00")
+    def test_1050(self):
+        """get_subject_with_cached_validation(): Signature is verified for each call
+        when the cache is disabled."""
+        cert_obj, jwt_bu64 = self.load_sample_cert_jwt_pair(
+            "cert_cn_dataone_org_20170517_122900.pem",
+            "jwt_token_20170612_232523.base64",
+        )
+        with django.test.override_settings(JWT_CACHE_ENABLED=False):
+            with self.mock_ssl_download(cert_obj):
+                with mock.patch(
+                    "d1_common.cert.jwt.validate_and_decode",
+                    return_value={"sub": "subj"},
+                ) as validate_mock:
+                    assert self._validate(jwt_bu64) == "subj"
+                    assert self._validate(jwt_bu64) == "subj"
+        assert validate_mock.call_count == 2
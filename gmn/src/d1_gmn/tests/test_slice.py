@@ -22,8 +22,10 @@ import logging
 import multiprocessing
 import random
 
+import pytest
 import responses
 
+import d1_common.types.exceptions
 import d1_common.xml
 
 import django.test
@@ -139,3 +141,83 @@ class TestSlice(d1_gmn.tests.gmn_test_case.GMNTestCase):
                 slice_pyxb = slicable_api_func(start=0, count=100)
                 iterable_pyxb = getattr(slice_pyxb, iterable_attr)
                 assert len(iterable_pyxb) == 5
+
+    def _get_api_response_func(self, client, use_get_log_records):
+        if use_get_log_records:
+            return client.getLogRecordsResponse, "Log", "logEntry"
+        else:
+            return client.listObjectsResponse, "ObjectList", "objectInfo"
+
+    @responses.activate
+    def test_1020(self, gmn_client_v1_v2, true_false):
+        """Paging with resume tokens gives the same result as retrieving everything in a
+        single call."""
+        slicable_api_func, iterable_attr = self._get_api_func(
+            gmn_client_v1_v2, use_get_log_records=true_false
+        )
+        response_func, type_name, _ = self._get_api_response_func(
+            gmn_client_v1_v2, use_get_log_records=true_false
+        )
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            total_int = slicable_api_func(start=0, count=0).total
+            single_slice_pyxb = slicable_api_func(start=0, count=total_int)
+            single_slice_pyxb_list = getattr(single_slice_pyxb, iterable_attr)
+
+            multi_slice_pyxb_list = []
+            vendor_dict = None
+            start_int = 0
+            while start_int < total_int:
+                response = response_func(
+                    start=start_int, count=37, vendorSpecific=vendor_dict
+                )
+                slice_pyxb = gmn_client_v1_v2._read_dataone_type_response(
+                    response, type_name
+                )
+                assert slice_pyxb.start == start_int
+                multi_slice_pyxb_list.extend(getattr(slice_pyxb, iterable_attr))
+                start_int += slice_pyxb.count
+                vendor_dict = {
+                    "VENDOR-GMN-RESUME-TOKEN": response.headers[
+                        "VENDOR-GMN-RESUME-TOKEN"
+                    ]
+                }
+
+            assert len(single_slice_pyxb_list) == len(multi_slice_pyxb_list)
+            for a_pyxb, b_pyxb in zip(single_slice_pyxb_list, multi_slice_pyxb_list):
+                assert self.are_equivalent_pyxb(a_pyxb, b_pyxb)
+
+    @responses.activate
+    def test_1030(self, gmn_client_v1_v2, true_false):
+        """Slices at arbitrary start positions, which are selected via checkpoints,
+        match the corresponding part of a single large slice."""
+        slicable_api_func, iterable_attr = self._get_api_func(
+            gmn_client_v1_v2, use_get_log_records=true_false
+        )
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            total_int = slicable_api_func(start=0, count=0).total
+            single_slice_pyxb_list = getattr(
+                slicable_api_func(start=0, count=total_int), iterable_attr
+            )
+            for _ in range(5):
+                start_int = random.randint(0, total_int - 1)
+                count_int = random.randint(1, 20)
+                slice_pyxb_list = getattr(
+                    slicable_api_func(start=start_int, count=count_int), iterable_attr
+                )
+                expected_pyxb_list = single_slice_pyxb_list[
+                    start_int : start_int + count_int
+                ]
+                assert len(slice_pyxb_list) == len(expected_pyxb_list)
+                for a_pyxb, b_pyxb in zip(expected_pyxb_list, slice_pyxb_list):
+                    assert self.are_equivalent_pyxb(a_pyxb, b_pyxb)
+
+    @responses.activate
+    def test_1040(self, gmn_client_v1_v2):
+        """Invalid resume token raises InvalidRequest."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            with pytest.raises(
+                d1_common.types.exceptions.InvalidRequest, match="resume token"
+            ):
+                gmn_client_v1_v2.listObjects(
+                    vendorSpecific={"VENDOR-GMN-RESUME-TOKEN": "not-a-token"}
+                )
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test persistence of System Metadata with sysmeta.create_or_update().
+
+The rows for access rules, replication policy nodes and remote replicas are diffed
+against the existing rows and written in bulk, so the number of database queries does
+not depend on the number of entries.
+
+"""
+import logging
+import timeit
+
+import pytest
+
+import django.db
+import django.test.utils
+
+import d1_common.date_time
+import d1_common.types.dataoneTypes
+import d1_common.xml
+
+import d1_gmn.app.auth
+import d1_gmn.app.models
+import d1_gmn.app.sysmeta
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.test_files
+
+BENCHMARK_ENTRY_COUNT = 500
+
+
+def _generate_sysmeta(pid, entry_count):
+    """Generate System Metadata with ``entry_count`` access rules, preferred Member
+    Nodes and remote replicas."""
+    sysmeta_pyxb = d1_test.test_files.load_xml_to_pyxb(
+        "systemMetadata_v2_0_remote_replica_base.xml"
+    )
+    sysmeta_pyxb.identifier = pid
+    sysmeta_pyxb.seriesId = None
+    sysmeta_pyxb.obsoletes = None
+    sysmeta_pyxb.obsoletedBy = None
+    access_policy_pyxb = d1_common.types.dataoneTypes.AccessPolicy()
+    for i in range(entry_count):
+        access_rule_pyxb = d1_common.types.dataoneTypes.AccessRule()
+        access_rule_pyxb.subject.append("subj_{}".format(i))
+        access_rule_pyxb.permission.append(d1_gmn.app.auth.level_to_action(i % 3))
+        access_policy_pyxb.allow.append(access_rule_pyxb)
+    sysmeta_pyxb.accessPolicy = access_policy_pyxb
+    replication_policy_pyxb = d1_common.types.dataoneTypes.ReplicationPolicy()
+    replication_policy_pyxb.replicationAllowed = True
+    replication_policy_pyxb.numberReplicas = 3
+    for i in range(entry_count):
+        replication_policy_pyxb.preferredMemberNode.append("urn:node:pref_{}".format(i))
+    sysmeta_pyxb.replicationPolicy = replication_policy_pyxb
+    sysmeta_pyxb.replica = []
+    for i in range(entry_count):
+        replica_pyxb = d1_common.types.dataoneTypes.Replica()
+        replica_pyxb.replicaMemberNode = "urn:node:rep_{}".format(i)
+        replica_pyxb.replicationStatus = "completed"
+        replica_pyxb.replicaVerified = d1_common.date_time.create_utc_datetime(
+            2019, 1, 1
+        )
+        sysmeta_pyxb.replica.append(replica_pyxb)
+    return sysmeta_pyxb
+
+
+def _count_queries(sysmeta_pyxb):
+    with django.test.utils.CaptureQueriesContext(django.db.connection) as ctx:
+        d1_gmn.app.sysmeta.create_or_update(sysmeta_pyxb)
+    return len(ctx.captured_queries)
+
+
+def _get_permission_dict(pid):
+    return dict(
+        d1_gmn.app.models.Permission.objects.filter(sciobj__pid__did=pid).values_list(
+            "subject__subject", "level"
+        )
+    )
+
+
+class TestSysmetaPersistence(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def test_1000(self):
+        """create_or_update(): Number of queries does not depend on the number of
+        access rules, replication policy nodes and replicas."""
+        create_small_int = _count_queries(_generate_sysmeta("bulk_pid_1", 2))
+        create_large_int = _count_queries(_generate_sysmeta("bulk_pid_2", 200))
+        assert create_large_int <= create_small_int
+        update_small_int = _count_queries(_generate_sysmeta("bulk_pid_1", 2))
+        update_large_int = _count_queries(_generate_sysmeta("bulk_pid_2", 200))
+        assert update_large_int == update_small_int
+
+    def test_1010(self):
+        """create_or_update(): Update applies added, changed and removed access rules,
+        replication policy nodes and replicas."""
+        d1_gmn.app.sysmeta.create_or_update(_generate_sysmeta("bulk_pid", 6))
+        sysmeta_pyxb = _generate_sysmeta("bulk_pid", 6)
+        del sysmeta_pyxb.accessPolicy.allow[4:]
+        sysmeta_pyxb.accessPolicy.allow[0].permission[0] = "changePermission"
+        sysmeta_pyxb.accessPolicy.allow[1].subject[0] = "new_subj"
+        sysmeta_pyxb.replicationPolicy.preferredMemberNode = [
+            "urn:node:pref_1",
+            "urn:node:pref_new",
+        ]
+        sysmeta_pyxb.replicationPolicy.numberReplicas = 5
+        del sysmeta_pyxb.replica[:3]
+        sysmeta_pyxb.replica[0].replicationStatus = "invalidated"
+        d1_gmn.app.sysmeta.create_or_update(sysmeta_pyxb)
+
+        permission_dict = _get_permission_dict("bulk_pid")
+        assert permission_dict["subj_0"] == d1_gmn.app.auth.CHANGEPERMISSION_LEVEL
+        assert permission_dict["new_subj"] == d1_gmn.app.auth.WRITE_LEVEL
+        assert "subj_1" not in permission_dict
+        assert "subj_4" not in permission_dict
+
+        recv_sysmeta_pyxb = d1_gmn.app.sysmeta.model_to_pyxb("bulk_pid")
+        assert recv_sysmeta_pyxb.replicationPolicy.numberReplicas == 5
+        assert sorted(
+            d1_common.xml.get_req_val(v)
+            for v in recv_sysmeta_pyxb.replicationPolicy.preferredMemberNode
+        ) == ["urn:node:pref_1", "urn:node:pref_new"]
+        assert sorted(
+            (d1_common.xml.get_req_val(v.replicaMemberNode), v.replicationStatus)
+            for v in recv_sysmeta_pyxb.replica
+        ) == [
+            ("urn:node:rep_3", "invalidated"),
+            ("urn:node:rep_4", "completed"),
+            ("urn:node:rep_5", "completed"),
+        ]
+        # Removed replicas do not leave ReplicaInfo rows behind.
+        assert not d1_gmn.app.models.ReplicaInfo.objects.filter(
+            member_node__urn="urn:node:rep_0"
+        ).exists()
+
+    def test_1020(self):
+        """create_or_update(): Subject listed in multiple access rules gets a single
+        row with the highest level."""
+        sysmeta_pyxb = _generate_sysmeta("bulk_pid", 3)
+        for access_rule_pyxb in sysmeta_pyxb.accessPolicy.allow:
+            access_rule_pyxb.subject[0] = "dup_subj"
+        d1_gmn.app.sysmeta.create_or_update(sysmeta_pyxb)
+        assert (
+            d1_gmn.app.models.Permission.objects.filter(
+                sciobj__pid__did="bulk_pid", subject__subject="dup_subj"
+            ).count()
+            == 1
+        )
+        assert (
+            _get_permission_dict("bulk_pid")["dup_subj"]
+            == d1_gmn.app.auth.CHANGEPERMISSION_LEVEL
+        )
+
+    def test_1030(self):
+        """create_or_update(): Media type and replication policy that are not included
+        in the update are removed."""
+        sysmeta_pyxb = _generate_sysmeta("bulk_pid", 2)
+        sysmeta_pyxb.mediaType = d1_common.types.dataoneTypes.MediaType(name="text/csv")
+        sysmeta_pyxb.mediaType.property_.append(
+            d1_common.types.dataoneTypes.MediaTypeProperty("v", name="k")
+        )
+        d1_gmn.app.sysmeta.create_or_update(sysmeta_pyxb)
+        recv_sysmeta_pyxb = d1_gmn.app.sysmeta.model_to_pyxb("bulk_pid")
+        assert recv_sysmeta_pyxb.mediaType.name == "text/csv"
+        sysmeta_pyxb.mediaType = None
+        sysmeta_pyxb.replicationPolicy = None
+        d1_gmn.app.sysmeta.create_or_update(sysmeta_pyxb)
+        recv_sysmeta_pyxb = d1_gmn.app.sysmeta.model_to_pyxb("bulk_pid")
+        assert recv_sysmeta_pyxb.mediaType is None
+        assert recv_sysmeta_pyxb.replicationPolicy is None
+
+    def test_1040(self):
+        """model_to_pyxb_many(): Returns the same System Metadata as model_to_pyxb(),
+        in the order of the PIDs, and skips unknown PIDs."""
+        pid_list = ["bulk_pid_{}".format(i) for i in range(5)]
+        for i, pid in enumerate(pid_list):
+            d1_gmn.app.sysmeta.create_or_update(_generate_sysmeta(pid, i))
+        pid_sysmeta_list = list(
+            d1_gmn.app.sysmeta.model_to_pyxb_many(
+                ["unknown_pid"] + pid_list[::-1], batch_size=2
+            )
+        )
+        assert [pid for pid, _ in pid_sysmeta_list] == pid_list[::-1]
+        for pid, sysmeta_pyxb in pid_sysmeta_list:
+            assert d1_gmn.app.sysmeta.serialize(
+                sysmeta_pyxb
+            ) == d1_gmn.app.sysmeta.serialize(d1_gmn.app.sysmeta.model_to_pyxb(pid))
+
+    def test_1050(self):
+        """model_to_pyxb_many(): Number of queries does not depend on the number of
+        objects in a batch."""
+
+        def count_queries(pid_list):
+            with django.test.utils.CaptureQueriesContext(django.db.connection) as ctx:
+                list(d1_gmn.app.sysmeta.model_to_pyxb_many(pid_list))
+            return len(ctx.captured_queries)
+
+        pid_list = ["bulk_pid_{}".format(i) for i in range(20)]
+        for pid in pid_list:
+            d1_gmn.app.sysmeta.create_or_update(_generate_sysmeta(pid, 3))
+        assert count_queries(pid_list) == count_queries(pid_list[:2])
+
+
+@pytest.mark.skip("Benchmark. Run manually")
+class TestSysmetaPersistenceBenchmark(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def test_1000(self):
+        """create_or_update(): Create and update of System Metadata with many access
+        rules, replication policy nodes and replicas."""
+        sysmeta_pyxb = _generate_sysmeta("bench_pid", BENCHMARK_ENTRY_COUNT)
+        create_query_int = _count_queries(sysmeta_pyxb)
+        update_query_int = _count_queries(sysmeta_pyxb)
+        update_sec = timeit.timeit(
+            lambda: d1_gmn.app.sysmeta.create_or_update(sysmeta_pyxb), number=10
+        )
+        logging.info(
+            "create_or_update() with {} entries. create_queries={} "
+            "update_queries={} update_sec={:.3f}".format(
+                BENCHMARK_ENTRY_COUNT,
+                create_query_int,
+                update_query_int,
+                update_sec / 10,
+            )
+        )
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test single pass receive of SciObj bytes for MNStorage.create() and
+MNStorage.update()."""
+
+import hashlib
+import io
+import os
+
+import responses
+
+import django.test
+
+import d1_common.checksum
+
+import d1_gmn.app.sciobj_store
+import d1_gmn.app.upload_handler
+import d1_gmn.app.views.assert_sysmeta
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestUploadHandler")
+class TestUploadHandler(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _post(self, sciobj_bytes):
+        return django.test.RequestFactory().post(
+            "/",
+            {
+                "pid": "test_pid",
+                "object": io.BytesIO(sciobj_bytes),
+                "sysmeta": io.BytesIO(b"<sysmeta/>"),
+            },
+        )
+
+    def test_1000(self):
+        """SciObjUploadHandler: Size and checksums for all supported algorithms are
+        calculated while the object is received."""
+        sciobj_bytes = os.urandom(3 * 1024 ** 2 + 123)
+        request = self._post(sciobj_bytes)
+        sciobj_file = request.FILES["object"]
+        assert isinstance(sciobj_file, d1_gmn.app.upload_handler.SciObjUploadedFile)
+        assert sciobj_file.size == len(sciobj_bytes)
+        assert sorted(sciobj_file.checksum_dict) == sorted(
+            d1_common.checksum.get_supported_algorithms()
+        )
+        assert sciobj_file.checksum_dict["MD5"] == hashlib.md5(sciobj_bytes).hexdigest()
+        assert (
+            sciobj_file.checksum_dict["SHA-1"] == hashlib.sha1(sciobj_bytes).hexdigest()
+        )
+        assert sciobj_file.read() == sciobj_bytes
+
+    def test_1010(self):
+        """SciObjUploadHandler: Object is received into the SciObj store and other
+        MIME parts are handled by the Django upload handlers."""
+        request = self._post(b"sciobj bytes")
+        assert request.POST["pid"] == "test_pid"
+        assert request.FILES["sysmeta"].read() == b"<sysmeta/>"
+        assert not hasattr(request.FILES["sysmeta"], "checksum_dict")
+        assert (
+            os.path.dirname(request.FILES["object"].temporary_file_path())
+            == d1_gmn.app.sciobj_store.get_abs_upload_dir_path()
+        )
+
+    def test_1020(self):
+        """calculate_checksum(): Uses the checksum calculated by the upload handler."""
+        request = self._post(b"sciobj bytes")
+        request.FILES["object"].checksum_dict["SHA-1"] = "precalculated"
+        assert (
+            d1_gmn.app.views.assert_sysmeta.calculate_checksum(request, "SHA-1")
+            == "precalculated"
+        )
+
+    @responses.activate
+    def test_1030(self, gmn_client_v1_v2):
+        """MNStorage.create(): Object is moved from the upload folder into the SciObj
+        store."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(gmn_client_v1_v2)
+        with d1_gmn.app.sciobj_store.open_sciobj_file_by_pid_ctx(pid) as sciobj_file:
+            assert sciobj_file.read() == sciobj_bytes
+        assert not os.listdir(d1_gmn.app.sciobj_store.get_abs_upload_dir_path())
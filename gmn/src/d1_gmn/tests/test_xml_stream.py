@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test that the streaming ObjectList and Log serializer generates the same XML as the
+PyXB based serializer."""
+
+import datetime
+
+import pytest
+
+import d1_common.date_time
+import d1_common.xml
+
+import django.conf
+import django.db
+import django.db.models
+import django.test
+import django.test.utils
+
+import d1_gmn.app.models
+import d1_gmn.app.views.slice
+import d1_gmn.app.views.util
+import d1_gmn.app.xml_stream
+import d1_gmn.tests.gmn_test_case
+
+XSLT_URL = "/mn/static/xslt/xhtml_grid.xsl"
+
+
+def _generate_object_list(request, db_query, start, total):
+    """PyXB based ObjectList serializer, for comparing with the streamed XML."""
+    objectList = d1_gmn.app.views.util.dataoneTypes(request).objectList()
+    for row in db_query:
+        objectInfo = d1_gmn.app.views.util.dataoneTypes(request).ObjectInfo()
+        objectInfo.identifier = row["pid__did"]
+        objectInfo.formatId = row["format__format"]
+        checksum = d1_gmn.app.views.util.dataoneTypes(request).Checksum(row["checksum"])
+        checksum.algorithm = row["checksum_algorithm__checksum_algorithm"]
+        objectInfo.checksum = checksum
+        objectInfo.dateSysMetadataModified = d1_common.date_time.normalize_datetime_to_utc(
+            row["modified_timestamp"]
+        )
+        objectInfo.size = row["size"]
+        objectList.objectInfo.append(objectInfo)
+    objectList.start = start
+    objectList.count = len(objectList.objectInfo)
+    objectList.total = total
+    return objectList
+
+
+def _generate_log_records(request, db_query, start, total):
+    """PyXB based Log serializer, for comparing with the streamed XML."""
+    log = d1_gmn.app.views.util.dataoneTypes(request).log()
+    for row in db_query:
+        logEntry = d1_gmn.app.views.util.dataoneTypes(request).LogEntry()
+        logEntry.entryId = str(row["id"])
+        logEntry.identifier = row["sciobj__pid__did"]
+        # Redact ipAddress and subject on records for which client has only "read"
+        # access.
+        if row.get("redact", False):
+            logEntry.ipAddress = "<NotAuthorized>"
+            logEntry.subject = "<NotAuthorized>"
+        else:
+            logEntry.ipAddress = row["ip_address__ip_address"]
+            logEntry.subject = row["subject__subject"]
+        logEntry.userAgent = row["user_agent__user_agent"]
+        logEntry.event = row["event__event"]
+        logEntry.dateLogged = d1_common.date_time.normalize_datetime_to_utc(
+            row["timestamp"]
+        )
+        logEntry.nodeIdentifier = django.conf.settings.NODE_IDENTIFIER
+        log.logEntry.append(logEntry)
+    log.start = start
+    log.count = len(log.logEntry)
+    log.total = total
+    return log
+
+
+@pytest.fixture(params=["/v1/", "/v2/"])
+def api_request(request):
+    yield django.test.RequestFactory().get(request.param)
+
+
+class TestXmlStream(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _assert_equivalent(self, stream_func, pyxb_func, request, query, start):
+        # The slice is used as the complete result set, so count and total are the same.
+        count = query.count()
+        xml_stream = stream_func(request, query, start, count, count, xslt_url=XSLT_URL)
+        stream_bytes = xml_stream.getvalue()
+        pyxb_bytes = d1_common.xml.serialize_for_transport(
+            pyxb_func(request, query, start, count), xslt_url=XSLT_URL
+        )
+        assert stream_bytes == pyxb_bytes
+        assert xml_stream.count == len(query)
+
+    def _object_list_query(self):
+        return d1_gmn.app.models.ScienceObject.objects.order_by(
+            "modified_timestamp", "id"
+        ).values(*d1_gmn.app.views.util.OBJECT_LIST_FIELD_LIST)
+
+    def _log_query(self):
+        return d1_gmn.app.models.EventLog.objects.order_by("timestamp", "id").values(
+            *d1_gmn.app.views.util.LOG_FIELD_LIST
+        )
+
+    def test_1000(self, api_request):
+        """ObjectList: Streamed XML is identical to PyXB XML."""
+        self._assert_equivalent(
+            d1_gmn.app.xml_stream.object_list,
+            _generate_object_list,
+            api_request,
+            self._object_list_query()[3:40],
+            3,
+        )
+
+    def test_1010(self, api_request):
+        """ObjectList: Empty slice is identical to PyXB XML."""
+        self._assert_equivalent(
+            d1_gmn.app.xml_stream.object_list,
+            _generate_object_list,
+            api_request,
+            self._object_list_query().none(),
+            0,
+        )
+
+    def test_1020(self, api_request):
+        """Log: Streamed XML is identical to PyXB XML."""
+        self._assert_equivalent(
+            d1_gmn.app.xml_stream.log,
+            _generate_log_records,
+            api_request,
+            self._log_query()[5:50],
+            5,
+        )
+
+    def test_1030(self, api_request):
+        """Log: Streamed XML with redacted records is identical to PyXB XML."""
+        self._assert_equivalent(
+            d1_gmn.app.xml_stream.log,
+            _generate_log_records,
+            api_request,
+            d1_gmn.app.models.EventLog.objects.order_by("timestamp", "id")
+            .annotate(
+                redact=django.db.models.Value(
+                    True, output_field=django.db.models.BooleanField()
+                )
+            )
+            .values(*d1_gmn.app.views.util.LOG_FIELD_LIST, "redact")[:20],
+            0,
+        )
+
+    def test_1040(self, api_request):
+        """Log: Empty slice is identical to PyXB XML."""
+        self._assert_equivalent(
+            d1_gmn.app.xml_stream.log,
+            _generate_log_records,
+            api_request,
+            self._log_query().none(),
+            0,
+        )
+
+    def test_1050(self):
+        """_escape(): Escapes the same characters as minidom."""
+        assert (
+            d1_gmn.app.xml_stream._escape("a&b<c>d\"e'f")
+            == "a&amp;b&lt;c&gt;d&quot;e'f"
+        )
+
+    def test_1060(self):
+        """_datetime_str(): Matches the PyXB xs:dateTime format."""
+        assert (
+            d1_gmn.app.xml_stream._datetime_str(
+                datetime.datetime(2020, 1, 2, 3, 4, 5, 120000)
+            )
+            == "2020-01-02T03:04:05.12Z"
+        )
+        assert (
+            d1_gmn.app.xml_stream._datetime_str(
+                datetime.datetime(
+                    2020,
+                    1,
+                    2,
+                    3,
+                    4,
+                    5,
+                    tzinfo=datetime.timezone(datetime.timedelta(hours=-7)),
+                )
+            )
+            == "2020-01-02T10:04:05Z"
+        )
+
+    def test_1070(self, api_request):
+        """Log: The root element is returned before the rows are read, and the rows are
+        read with a single query."""
+        query = self._log_query()[:20]
+        xml_stream = d1_gmn.app.xml_stream.log(api_request, query, 0, 20, 100)
+        with django.test.utils.CaptureQueriesContext(django.db.connection) as ctx:
+            chunk_iter = iter(xml_stream)
+            assert next(chunk_iter).startswith(b"<?xml")
+            assert not ctx.captured_queries
+            assert b"".join(chunk_iter).count(b"<logEntry>") == 20
+            assert len(ctx.captured_queries) == 1
+
+    def test_1080(self):
+        """get_count_and_last_in_slice(): Returns the number of items and the sort key
+        of the last item in the slice."""
+        query = self._log_query()[5:25]
+        count, last_ts_tup = d1_gmn.app.views.slice.get_count_and_last_in_slice(
+            query, ["timestamp", "id"]
+        )
+        assert count == 20
+        assert last_ts_tup == tuple(query.values_list("timestamp", "id")[19])
+        assert d1_gmn.app.views.slice.get_count_and_last_in_slice(
+            query.none(), ["timestamp", "id"]
+        ) == (0, None)
@@ -17,6 +17,7 @@
 # limitations under the License.
 import asyncio
 import datetime
+import inspect
 import logging
 import os
 import pprint
@@ -127,7 +128,9 @@ class AsyncDataONEClient:
 
         Args:
             file_stream: Open file-like object
-                Stream to which the SciObj bytes will be written.
+                Stream to which the SciObj bytes will be written. If ``write()``
+                returns an awaitable, it is awaited before the next chunk is written.
+                This allows the writes to be done outside of the event loop.
 
             pid: str
 
@@ -143,7 +146,9 @@ class AsyncDataONEClient:
         ) as response:
             self._assert_valid_response(response)
             async for chunk_str, _ in response.content.iter_chunks():
-                file_stream.write(chunk_str)
+                write_result = file_stream.write(chunk_str)
+                if inspect.isawaitable(write_result):
+                    await write_result
 
     async def get_system_metadata(self, pid, vendor_specific=None):
         return await self._request_pyxb(
@@ -90,6 +90,10 @@ def create_bagit_stream(dir_name, payload_info_list):
 
             - keys: pid, filename, iter, checksum, checksum_algorithm
             - If the filename is None, the pid is used for the filename.
+            - Optional key: compress. If False, the file is stored in the zip archive
+              without compression. This avoids spending CPU time on files that are
+              already compressed, such as JPEG images and gzip archives. Default is
+              True.
 
     """
     zip_file = zipstream.ZipFile(mode="w", compression=zipstream.ZIP_DEFLATED)
@@ -217,7 +221,13 @@ def _add_payload_files(zip_file, payload_info_list):
     payload_byte_count = 0
     payload_file_count = 0
     for payload_info_dict in payload_info_list:
-        zip_file.write_iter(payload_info_dict["path"], payload_info_dict["iter"])
+        zip_file.write_iter(
+            payload_info_dict["path"],
+            payload_info_dict["iter"],
+            zipstream.ZIP_DEFLATED
+            if payload_info_dict.get("compress", True)
+            else zipstream.ZIP_STORED,
+        )
         payload_byte_count += payload_info_dict["iter"].size
         payload_file_count += 1
     return payload_byte_count, payload_file_count
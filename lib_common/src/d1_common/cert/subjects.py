@@ -46,7 +46,21 @@ def extract_subjects(cert_pem):
           identities.
 
     """
-    primary_str, subject_info_xml = d1_common.cert.x509.extract_subjects(cert_pem)
+    return extract_subjects_from_cert_obj(d1_common.cert.x509.deserialize_pem(cert_pem))
+
+
+def extract_subjects_from_cert_obj(cert_obj):
+    """Extract subjects from a deserialized DataONE X.509 v3 certificate.
+
+    Args:
+      cert_obj: cryptography.Certificate
+
+    Returns:
+      2-tuple: See ``extract_subjects()``.
+
+    """
+    primary_str = d1_common.cert.x509.extract_subject_from_dn(cert_obj)
+    subject_info_xml = d1_common.cert.x509.extract_subject_info_extension(cert_obj)
     equivalent_set = {
         primary_str,
         d1_common.const.SUBJECT_AUTHENTICATED,
@@ -25,7 +25,11 @@ extensions and content type.
 
 The cache is stored in a file and is automatically updated periodically.
 
-Simple methods for looking up elements of the ObjectFormatList are provided.
+Simple methods for looking up elements of the ObjectFormatList are provided. Lookups
+use an immutable index that is built when the ObjectFormatList is loaded, and the
+time at which the cache expires is held as a deadline on the monotonic clock, so a
+lookup is a single dict access and clock read. When the cache expires, it is refreshed
+in a background thread while lookups continue to use the current index.
 
 .. highlight:: python
 
@@ -58,13 +62,16 @@ Example:
 .. highlight:: none
 
 """
+import collections
 import contextlib
 import datetime
 import fcntl
 import json
 import json.decoder
 import logging
+import threading
 import time
+import types
 
 import d1_common.const
 import d1_common.date_time
@@ -80,6 +87,12 @@ DEFAULT_OBJECT_FORMAT_CACHE_PATH = d1_common.utils.filesystem.abs_path(
 )
 DEFAULT_CACHE_REFRESH_PERIOD = datetime.timedelta(days=30)
 DEFAULT_LOCK_FILE_PATH = "/tmp/object_format_cache.lock"
+# Delay before retrying a failed background refresh.
+REFRESH_RETRY_PERIOD = datetime.timedelta(minutes=5)
+
+FormatInfo = collections.namedtuple(
+    "FormatInfo", ["content_type", "extension", "format_type"]
+)
 
 # ===============================================================================
 
@@ -139,6 +152,10 @@ class ObjectFormatListCache(Singleton):
         self._cache_refresh_period = cache_refresh_period
         self._lock_file_path = lock_file_path
         self._format_dict = None
+        self._format_index = types.MappingProxyType({})
+        self._refresh_deadline = None
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread = None
         self._load_and_refresh_cache()
 
     @property
@@ -148,17 +165,36 @@ class ObjectFormatListCache(Singleton):
         self._refresh_cache_if_expired()
         return self._format_dict
 
+    @property
+    def object_format_index(self):
+        """Read-only mapping of formatId to FormatInfo(content_type, extension,
+        format_type)."""
+        self._refresh_cache_if_expired()
+        return self._format_index
+
+    def get_format_info(self, format_id, default=None):
+        self._refresh_cache_if_expired()
+        return self._format_index.get(format_id, default)
+
     def get_content_type(self, format_id, default=None):
-        try:
-            return self.object_format_dict[format_id]["media_type"]["name"]
-        except KeyError:
+        self._refresh_cache_if_expired()
+        format_info = self._format_index.get(format_id)
+        if format_info is None or format_info.content_type is None:
             return default
+        return format_info.content_type
 
     def get_filename_extension(self, format_id, default=None):
-        try:
-            return self.object_format_dict[format_id]["extension"]
-        except KeyError:
+        self._refresh_cache_if_expired()
+        format_info = self._format_index.get(format_id)
+        if format_info is None:
             return default
+        return format_info.extension
+
+    def join_refresh(self, timeout=None):
+        """Wait for any background refresh that is in progress to complete."""
+        refresh_thread = self._refresh_thread
+        if refresh_thread is not None:
+            refresh_thread.join(timeout)
 
     def refresh_cache(self):
         """Force a refresh of the local cached version of the ObjectFormatList.
@@ -170,7 +206,8 @@ class ObjectFormatListCache(Singleton):
         self._refresh_cache()
 
     def is_valid_format_id(self, format_id):
-        return format_id in self.object_format_dict
+        self._refresh_cache_if_expired()
+        return format_id in self._format_index
 
     #
     # Private.
@@ -179,13 +216,14 @@ class ObjectFormatListCache(Singleton):
     def _load_and_refresh_cache(self):
         with self._serialize_access():
             try:
-                self._format_dict = d1_common.util.load_json(
-                    self._object_format_cache_path
+                self._set_format_dict(
+                    d1_common.util.load_json(self._object_format_cache_path)
                 )
             except (EnvironmentError, json.decoder.JSONDecodeError):
                 self._refresh_cache()
             else:
-                self._refresh_cache_if_expired()
+                if self._is_cache_expired():
+                    self._refresh_cache()
 
     @contextlib.contextmanager
     def _serialize_access(self):
@@ -201,22 +239,73 @@ class ObjectFormatListCache(Singleton):
 
     def _refresh_cache_if_expired(self):
         if self._is_cache_expired():
-            self._refresh_cache()
+            self._start_background_refresh()
 
     def _is_cache_expired(self):
-        if self._cache_refresh_period is None:
-            return False
         return (
-            d1_common.date_time.dt_from_iso8601_str(
-                self._format_dict["_last_refresh_timestamp"]
-            )
-            < d1_common.date_time.utc_now() - self._cache_refresh_period
+            self._refresh_deadline is not None
+            and time.monotonic() >= self._refresh_deadline
         )
 
+    def _start_background_refresh(self):
+        with self._refresh_lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(
+                target=self._background_refresh,
+                name="ObjectFormatListRefresh",
+                daemon=True,
+            )
+            self._refresh_thread.start()
+
+    def _background_refresh(self):
+        try:
+            with self._serialize_access():
+                self._refresh_cache()
+        except Exception as e:
+            self._logger.error(
+                "Unable to refresh ObjectFormatList cache. Retrying in {}. "
+                'error="{}"'.format(REFRESH_RETRY_PERIOD, str(e))
+            )
+            self._refresh_deadline = (
+                time.monotonic() + REFRESH_RETRY_PERIOD.total_seconds()
+            )
+
     def _refresh_cache(self):
         self._logger.debug("Refreshing ObjectFormatList cache...")
-        self._download_format_dict_from_d1_env()
-        d1_common.util.save_json(self._format_dict, self._object_format_cache_path)
+        format_dict = self._download_format_dict_from_d1_env()
+        d1_common.util.save_json(format_dict, self._object_format_cache_path)
+        self._set_format_dict(format_dict)
+
+    def _set_format_dict(self, format_dict):
+        """Set the ObjectFormatList and build the index and refresh deadline for it.
+
+        The index and deadline are replaced in single assignments, so lookups in other
+        threads see either the old or the new values.
+
+        """
+        self._format_index = types.MappingProxyType(
+            {
+                format_id: FormatInfo(
+                    d["media_type"]["name"], d["extension"], d["format_type"]
+                )
+                for format_id, d in format_dict.items()
+                if not format_id.startswith("_")
+            }
+        )
+        self._format_dict = format_dict
+        if self._cache_refresh_period is None:
+            self._refresh_deadline = None
+        else:
+            age_sec = (
+                d1_common.date_time.utc_now()
+                - d1_common.date_time.dt_from_iso8601_str(
+                    format_dict["_last_refresh_timestamp"]
+                )
+            ).total_seconds()
+            self._refresh_deadline = time.monotonic() + (
+                self._cache_refresh_period.total_seconds() - age_sec
+            )
 
     def _download_format_dict_from_d1_env(self):
         self._logger.debug(
@@ -234,10 +323,9 @@ class ObjectFormatListCache(Singleton):
                     self._cn_base_url, str(e)
                 ),
             )
-        self._format_dict = self._pyxb_to_dict(object_format_list_pyxb)
-        self._format_dict["_last_refresh_timestamp"] = str(
-            d1_common.date_time.utc_now()
-        )
+        format_dict = self._pyxb_to_dict(object_format_list_pyxb)
+        format_dict["_last_refresh_timestamp"] = str(d1_common.date_time.utc_now())
+        return format_dict
 
     def _pyxb_to_dict(self, object_format_list_pyxb):
         return {
@@ -47,9 +47,22 @@ Note:
   In order for Resource Maps to be recognized and indexed by DataONE, they must be created
   with ``formatId`` set to ``http://www.openarchives.org/ore/terms``.
 
+Reading large Resource Maps:
+
+  :class:`ResourceMap` holds the complete RDF graph in memory and runs SPARQL queries
+  over it, which is slow and memory intensive for Resource Maps that aggregate many
+  objects. :func:`parseResourceMapSummary` extracts only the Resource Map PID, the
+  aggregated PIDs and the ``cito:documents`` / ``cito:isDocumentedBy`` relationships in
+  a single SAX pass over an RDF/XML document.
+
 """
 
+import io
 import logging
+import urllib.parse
+import xml.sax
+import xml.sax.handler
+import xml.sax.xmlreader
 
 import rdflib
 import rdflib.term
@@ -145,6 +158,51 @@ def createResourceMapFromStream(in_stream, base_url=d1_common.const.URL_DATAONE_
     return ore
 
 
+def parseResourceMapSummary(source):
+    """Extract the PIDs and relationships used by DataONE from an RDF/XML Resource
+    Map, without building an RDF graph.
+
+    The document is read in a single SAX pass, and only the triples that are required
+    for the methods of :class:`ResourceMapSummary` are kept. The few RDF/XML
+    constructs that are not handled by the streaming reader (``rdf:parseType``
+    ``Literal`` and ``Collection``) cause the document to be parsed with rdflib instead.
+
+    Args:
+      source: bytes, str or file-like object open for reading in binary mode
+        The RDF/XML document.
+
+    Returns:
+      ResourceMapSummary
+
+    Raises:
+      xml.sax.SAXException based exception: On parse error.
+
+    """
+    summary = ResourceMapSummary()
+    handler = _ResourceMapSaxHandler(summary)
+    parser = xml.sax.make_parser()
+    parser.setFeature(xml.sax.handler.feature_namespaces, True)
+    parser.setContentHandler(handler)
+    if isinstance(source, str):
+        input_source = xml.sax.xmlreader.InputSource()
+        input_source.setCharacterStream(io.StringIO(source))
+    elif isinstance(source, bytes):
+        input_source = io.BytesIO(source)
+    else:
+        input_source = source
+    try:
+        parser.parse(input_source)
+    except _UnsupportedRdfXmlError as e:
+        logging.debug(
+            "Unable to read Resource Map as a stream. Using rdflib. error={}".format(e)
+        )
+        if hasattr(source, "seek"):
+            source.seek(0)
+            source = source.read()
+        return _parse_summary_with_rdflib(source)
+    return summary
+
+
 # ===============================================================================
 
 
@@ -645,3 +703,308 @@ class ResourceMap(rdflib.ConjunctiveGraph):
     def _check_initialized(self):
         if not self._ore_initialized:
             raise ValueError("ResourceMap is not initialized.")
+
+
+# ===============================================================================
+
+
+class ResourceMapSummary(object):
+    """The PIDs and relationships used by DataONE in a Resource Map.
+
+    Created by :func:`parseResourceMapSummary`. The methods return the same values as
+    the methods with the same names in :class:`ResourceMap`.
+
+    """
+
+    def __init__(self):
+        # Subject -> {identifier key: PID}
+        self._identifier_dict = {}
+        # Dicts are used as ordered sets of (subject, object) tuples.
+        self._aggregates_dict = {}
+        self._documents_dict = {}
+        self._is_documented_by_dict = {}
+        self._resource_map_dict = {}
+
+    def getResourceMapPid(self):
+        """Returns:
+
+        str : PID of the Resource Map itself.
+
+        """
+        ore = list(self._resource_map_dict)[0]
+        return list(self._identifier_dict[ore].values())[0]
+
+    def getAggregatedPids(self):
+        """Returns: list of str: All aggregated PIDs."""
+        return [
+            pid
+            for _, o in self._aggregates_dict
+            for pid in self._identifier_dict.get(o, {}).values()
+        ]
+
+    def getAggregatedScienceMetadataPids(self):
+        """Returns: list of str: All Science Metadata PIDs."""
+        return self._get_aggregated_pids_with_relation(self._documents_dict)
+
+    def getAggregatedScienceDataPids(self):
+        """Returns: list of str: All Science Data PIDs."""
+        return self._get_aggregated_pids_with_relation(self._is_documented_by_dict)
+
+    def getDocumentsPidPairs(self):
+        """Returns: list of tuple: Distinct (documenting PID, documented PID) tuples
+        for all ``cito:documents`` and ``cito:isDocumentedBy`` relationships."""
+        pid_pair_dict = {}
+        for documenting, documented in list(self._documents_dict) + [
+            (o, s) for s, o in self._is_documented_by_dict
+        ]:
+            for documenting_pid in self._identifier_dict.get(documenting, {}).values():
+                for documented_pid in self._identifier_dict.get(
+                    documented, {}
+                ).values():
+                    pid_pair_dict[(documenting_pid, documented_pid)] = None
+        return list(pid_pair_dict)
+
+    def _get_aggregated_pids_with_relation(self, relation_dict):
+        aggregated_set = {o for _, o in self._aggregates_dict}
+        pid_dict = {}
+        for s, _ in relation_dict:
+            if s in aggregated_set:
+                for pid in self._identifier_dict.get(s, {}).values():
+                    pid_dict[pid] = None
+        return list(pid_dict)
+
+    def _add_triple(self, s, p, o):
+        """Add a triple if it is one of the triples used by the methods.
+
+        URIs are str, blank nodes are ``("bnode", id)`` and literals are
+        ``("literal", value, language, datatype)``.
+
+        """
+        if p == _DCTERMS_IDENTIFIER:
+            self._identifier_dict.setdefault(s, {})[o] = (
+                o[1] if isinstance(o, tuple) else o
+            )
+        elif p == _ORE_AGGREGATES:
+            self._aggregates_dict[(s, o)] = None
+        elif p == _CITO_DOCUMENTS:
+            self._documents_dict[(s, o)] = None
+        elif p == _CITO_IS_DOCUMENTED_BY:
+            self._is_documented_by_dict[(s, o)] = None
+        elif p == _RDF_TYPE and o == _ORE_RESOURCE_MAP:
+            self._resource_map_dict[s] = None
+
+
+_RDF_NS = str(rdflib.RDF)
+_XML_NS = "http://www.w3.org/XML/1998/namespace"
+_DCTERMS_IDENTIFIER = str(DCTERMS.identifier)
+_ORE_AGGREGATES = str(ORE.aggregates)
+_ORE_RESOURCE_MAP = str(ORE.ResourceMap)
+_CITO_DOCUMENTS = str(CITO.documents)
+_CITO_IS_DOCUMENTED_BY = str(CITO.isDocumentedBy)
+_RDF_TYPE = str(rdflib.RDF.type)
+# Attributes on node and property elements that are not property attributes.
+_RDF_SYNTAX_ATTR_SET = {
+    (_RDF_NS, "about"),
+    (_RDF_NS, "ID"),
+    (_RDF_NS, "nodeID"),
+    (_RDF_NS, "resource"),
+    (_RDF_NS, "datatype"),
+    (_RDF_NS, "parseType"),
+    (_RDF_NS, "bagID"),
+    (_RDF_NS, "aboutEach"),
+    (_RDF_NS, "aboutEachPrefix"),
+}
+
+
+class _UnsupportedRdfXmlError(Exception):
+    pass
+
+
+class _ResourceMapSaxHandler(xml.sax.handler.ContentHandler):
+    """Generate triples from an RDF/XML document.
+
+    Implements the parts of the RDF/XML grammar that are used in Resource Maps. Each
+    open element is represented by a frame on a stack. Node frames hold the subject of
+    a node element, and property frames hold the subject and predicate of a property
+    element and collect its text. Only the frames of the open elements are kept.
+
+    """
+
+    def __init__(self, summary):
+        super().__init__()
+        self._summary = summary
+        self._frame_list = []
+        self._bnode_count = 0
+
+    def startElementNS(self, name, qname, attrs):
+        parent = self._frame_list[-1] if self._frame_list else None
+        base = self._get_in_scope(parent, "base", attrs, "base")
+        lang = self._get_in_scope(parent, "lang", attrs, "lang")
+        if parent is None and name == (_RDF_NS, "RDF"):
+            self._frame_list.append({"kind": "rdf", "base": base, "lang": lang})
+        elif parent is None or parent["kind"] in ("rdf", "property"):
+            self._start_node_element(parent, name, attrs, base, lang)
+        elif parent["kind"] == "node":
+            self._start_property_element(parent, name, attrs, base, lang)
+        else:
+            raise _UnsupportedRdfXmlError(
+                "Element in empty property element. name={}".format(name)
+            )
+
+    def endElementNS(self, name, qname):
+        frame = self._frame_list.pop()
+        if frame["kind"] == "property" and not frame["has_node"]:
+            datatype = frame["datatype"]
+            self._summary._add_triple(
+                frame["subject"],
+                frame["predicate"],
+                (
+                    "literal",
+                    "".join(frame["text_list"]),
+                    None if datatype else frame["lang"],
+                    datatype,
+                ),
+            )
+
+    def characters(self, content):
+        if self._frame_list and self._frame_list[-1]["kind"] == "property":
+            self._frame_list[-1]["text_list"].append(content)
+
+    def _start_node_element(self, parent, name, attrs, base, lang):
+        subject = self._get_subject(attrs, base)
+        if parent is not None and parent["kind"] == "property":
+            parent["has_node"] = True
+            self._summary._add_triple(parent["subject"], parent["predicate"], subject)
+        if name != (_RDF_NS, "Description"):
+            self._summary._add_triple(subject, _RDF_TYPE, self._get_uri(name))
+        self._add_property_attrs(subject, attrs, base, lang)
+        self._frame_list.append(
+            {"kind": "node", "subject": subject, "base": base, "lang": lang, "li": 0}
+        )
+
+    def _start_property_element(self, parent, name, attrs, base, lang):
+        subject = parent["subject"]
+        if name == (_RDF_NS, "li"):
+            parent["li"] += 1
+            predicate = "{}_{}".format(_RDF_NS, parent["li"])
+        else:
+            predicate = self._get_uri(name)
+        parse_type = attrs.get((_RDF_NS, "parseType"))
+        if parse_type == "Resource":
+            o = self._create_bnode()
+            self._summary._add_triple(subject, predicate, o)
+            self._frame_list.append(
+                {"kind": "node", "subject": o, "base": base, "lang": lang, "li": 0}
+            )
+        elif parse_type is not None:
+            raise _UnsupportedRdfXmlError(
+                "Unsupported parseType. parse_type={}".format(parse_type)
+            )
+        elif (
+            (_RDF_NS, "resource") in attrs
+            or (_RDF_NS, "nodeID") in attrs
+            or any(self._is_property_attr(k) for k in attrs.getNames())
+        ):
+            if (_RDF_NS, "resource") in attrs:
+                o = self._resolve(base, attrs[(_RDF_NS, "resource")])
+            elif (_RDF_NS, "nodeID") in attrs:
+                o = ("bnode", attrs[(_RDF_NS, "nodeID")])
+            else:
+                o = self._create_bnode()
+            self._summary._add_triple(subject, predicate, o)
+            self._add_property_attrs(o, attrs, base, lang)
+            self._frame_list.append({"kind": "empty", "base": base, "lang": lang})
+        else:
+            self._frame_list.append(
+                {
+                    "kind": "property",
+                    "subject": subject,
+                    "predicate": predicate,
+                    "datatype": attrs.get((_RDF_NS, "datatype")),
+                    "text_list": [],
+                    "has_node": False,
+                    "base": base,
+                    "lang": lang,
+                }
+            )
+
+    def _add_property_attrs(self, subject, attrs, base, lang):
+        for k in attrs.getNames():
+            if not self._is_property_attr(k):
+                continue
+            if k == (_RDF_NS, "type"):
+                o = self._resolve(base, attrs[k])
+            else:
+                o = ("literal", attrs[k], lang, None)
+            self._summary._add_triple(subject, self._get_uri(k), o)
+
+    def _is_property_attr(self, name):
+        ns, local_name = name
+        return (
+            ns not in (None, _XML_NS)
+            and name not in _RDF_SYNTAX_ATTR_SET
+            and not local_name.lower().startswith("xml")
+        )
+
+    def _get_subject(self, attrs, base):
+        if (_RDF_NS, "about") in attrs:
+            return self._resolve(base, attrs[(_RDF_NS, "about")])
+        if (_RDF_NS, "ID") in attrs:
+            return self._resolve(base, "#" + attrs[(_RDF_NS, "ID")])
+        if (_RDF_NS, "nodeID") in attrs:
+            return "bnode", attrs[(_RDF_NS, "nodeID")]
+        return self._create_bnode()
+
+    def _create_bnode(self):
+        # Generated ids cannot clash with rdf:nodeID values, which are XML names.
+        self._bnode_count += 1
+        return "bnode", "-{}".format(self._bnode_count)
+
+    def _get_in_scope(self, parent, key, attrs, xml_attr_name):
+        value = attrs.get((_XML_NS, xml_attr_name))
+        if value is None:
+            return parent[key] if parent else None
+        if key == "base":
+            return self._resolve(parent["base"] if parent else None, value)
+        return value or None
+
+    def _get_uri(self, name):
+        ns, local_name = name
+        return (ns or "") + local_name
+
+    def _resolve(self, base, uri):
+        return urllib.parse.urljoin(base, uri) if base else uri
+
+
+def _parse_summary_with_rdflib(source):
+    resource_map = ResourceMap()
+    if isinstance(source, bytes):
+        resource_map.deserialize(file=io.BytesIO(source), format="xml")
+    else:
+        resource_map.deserialize(data=source, format="xml")
+    summary = ResourceMapSummary()
+    for predicate in (
+        _DCTERMS_IDENTIFIER,
+        _ORE_AGGREGATES,
+        _CITO_DOCUMENTS,
+        _CITO_IS_DOCUMENTED_BY,
+        _RDF_TYPE,
+    ):
+        for s, o in resource_map.subject_objects(rdflib.term.URIRef(predicate)):
+            summary._add_triple(
+                _rdflib_term_to_key(s), predicate, _rdflib_term_to_key(o)
+            )
+    return summary
+
+
+def _rdflib_term_to_key(term):
+    if isinstance(term, rdflib.term.BNode):
+        return "bnode", str(term)
+    if isinstance(term, rdflib.term.Literal):
+        return (
+            "literal",
+            str(term),
+            term.language,
+            str(term.datatype) if term.datatype else None,
+        )
+    return str(term)
@@ -17,7 +17,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
 import tempfile
+import timeit
 
 import freezegun
 import pytest
@@ -103,6 +105,9 @@ class TestObjectFormatList(d1_test.d1_test_case.D1TestCase):
         """object_format_dict property access: Cache is refreshed if expired."""
         # Property access 31 days after last refresh timestamp
         with freezegun.freeze_time("2019-05-04"):
+            # The refresh runs in the background while the current list is returned.
+            assert "format_id_96" not in format_info_cache.object_format_dict
+            format_info_cache.join_refresh()
             self.sample.assert_equals(format_info_cache.object_format_dict, "refresh")
             assert "format_id_96" in format_info_cache.object_format_dict
 
@@ -120,3 +125,31 @@ class TestObjectFormatList(d1_test.d1_test_case.D1TestCase):
         assert "format_id_96" not in format_info_cache.object_format_dict
         format_info_cache.refresh_cache()
         assert "format_id_96" in format_info_cache.object_format_dict
+
+    def test_1060(self, format_info_cache):
+        """get_format_info(): Returns content type, extension and format type from the
+        index."""
+        assert format_info_cache.get_format_info(
+            "anvl/erc-v02"
+        ) == d1_common.object_format_cache.FormatInfo("text/anvl", ".anvl", "DATA")
+        assert format_info_cache.get_format_info("unknown") is None
+        assert "_last_refresh_timestamp" not in format_info_cache.object_format_index
+        with pytest.raises(TypeError):
+            format_info_cache.object_format_index["unknown"] = None
+
+    def test_1070(self, format_info_cache):
+        """get_content_type(): Returns default for unknown formatId."""
+        assert format_info_cache.get_content_type("unknown", "default") == "default"
+
+
+@pytest.mark.skip("Benchmark")
+class TestObjectFormatListBenchmark(d1_test.d1_test_case.D1TestCase):
+    def test_1000(self, format_info_cache):
+        """get_content_type(): Lookup time."""
+        count = 1000000
+        sec = timeit.timeit(
+            lambda: format_info_cache.get_content_type("INCITS-453-2009"), number=count
+        )
+        logging.info(
+            "get_content_type(): {:.3f} us per lookup".format(sec / count * 1e6)
+        )
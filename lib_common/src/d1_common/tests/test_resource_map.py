@@ -292,6 +292,7 @@ import io
 #   ]
 #
 import warnings
+import xml.sax
 
 import pytest
 import rdflib
@@ -299,6 +300,7 @@ import rdflib
 import d1_common.resource_map
 
 import d1_test.d1_test_case
+import d1_test.test_files
 
 
 class TestResourceMap(d1_test.d1_test_case.D1TestCase):
@@ -467,3 +469,139 @@ class TestResourceMap(d1_test.d1_test_case.D1TestCase):
         ore.addResource("resource1_pid")
         ore.setAtLocation("resource1_pid", "scripts/data_cleaning")
         self.sample.assert_equals(ore, "set_at_location", mn_client_v2)
+
+
+# Resource Map that uses RDF/XML constructs that the ResourceMap class does not
+# generate.
+ORE_VARIANT_XML = """<?xml version="1.0" encoding="utf-8"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+    xmlns:ore="http://www.openarchives.org/ore/terms/"
+    xmlns:dcterms="http://purl.org/dc/terms/"
+    xmlns:cito="http://purl.org/spar/cito/"
+    xml:base="https://cn.dataone.org/cn/v2/resolve/">
+  <rdf:Description rdf:ID="map">
+    <rdf:type rdf:resource="http://www.openarchives.org/ore/terms/ResourceMap"/>
+    <dcterms:identifier xml:lang="en">map_pid</dcterms:identifier>
+    <ore:describes rdf:nodeID="agg"/>
+  </rdf:Description>
+  <ore:Aggregation rdf:nodeID="agg">
+    <ore:aggregates rdf:resource="meta_pid"/>
+    <ore:aggregates rdf:resource="data_1"/>
+    <ore:aggregates dcterms:identifier="data_2" cito:isDocumentedBy="x"/>
+    <ore:aggregates rdf:parseType="Resource">
+      <dcterms:identifier
+          rdf:datatype="http://www.w3.org/2001/XMLSchema#string">data_3</dcterms:identifier>
+      <cito:isDocumentedBy rdf:resource="meta_pid"/>
+    </ore:aggregates>
+    <ore:aggregates>
+      <rdf:Description>
+        <dcterms:identifier> data 4 </dcterms:identifier>
+      </rdf:Description>
+    </ore:aggregates>
+  </ore:Aggregation>
+  <rdf:Description rdf:about="meta_pid" dcterms:identifier="meta_pid">
+    <cito:documents rdf:resource="data_1"/>
+  </rdf:Description>
+  <rdf:Description rdf:about="data_1">
+    <dcterms:identifier>data_1</dcterms:identifier>
+    <dcterms:identifier>data_1_alt</dcterms:identifier>
+    <cito:isDocumentedBy rdf:resource="meta_pid"/>
+  </rdf:Description>
+</rdf:RDF>
+"""
+
+
+class TestResourceMapSummary(d1_test.d1_test_case.D1TestCase):
+    def _assert_conforms(self, ore_xml):
+        """The streaming reader returns the same PIDs as the rdflib based
+        ResourceMap."""
+        ore = d1_common.resource_map.ResourceMap()
+        ore.deserialize(data=ore_xml, format="xml")
+        summary = d1_common.resource_map.parseResourceMapSummary(ore_xml)
+        assert sorted(summary.getAggregatedPids()) == sorted(ore.getAggregatedPids())
+        assert sorted(summary.getAggregatedScienceMetadataPids()) == sorted(
+            ore.getAggregatedScienceMetadataPids()
+        )
+        assert sorted(summary.getAggregatedScienceDataPids()) == sorted(
+            ore.getAggregatedScienceDataPids()
+        )
+        assert summary.getResourceMapPid() == ore.getResourceMapPid()
+        pair_query = """
+          PREFIX dcterms: <http://purl.org/dc/terms/>
+          PREFIX cito: <http://purl.org/spar/cito/>
+          SELECT DISTINCT ?a ?b
+          WHERE {
+            { ?x cito:documents ?y } UNION { ?y cito:isDocumentedBy ?x }
+            ?x dcterms:identifier ?a .
+            ?y dcterms:identifier ?b .
+          }
+        """
+        assert sorted(summary.getDocumentsPidPairs()) == sorted(
+            (str(a), str(b)) for a, b in ore.query(pair_query)
+        )
+        return summary
+
+    def test_1000(self):
+        """parseResourceMapSummary(): Conforms with ResourceMap for a Resource Map
+        with nested elements in random order."""
+        self._assert_conforms(
+            d1_test.test_files.load_xml_to_str("ore_basic_valid_random_order.xml")
+        )
+
+    def test_1010(self):
+        """parseResourceMapSummary(): Conforms with ResourceMap for Resource Maps
+        serialized by ResourceMap."""
+        ore = d1_common.resource_map.createSimpleResourceMap(
+            "ore_pid", "meta_pid", ["data_pid_{}".format(i) for i in range(100)]
+        )
+        self._assert_conforms(ore.serialize_to_transport())
+        summary = self._assert_conforms(
+            rdflib.ConjunctiveGraph.serialize(ore, format="pretty-xml")
+        )
+        assert len(summary.getAggregatedPids()) == 101
+
+    def test_1020(self):
+        """parseResourceMapSummary(): Conforms with ResourceMap for typed nodes, blank
+        nodes, property attributes, xml:base, xml:lang and rdf:datatype."""
+        summary = self._assert_conforms(ORE_VARIANT_XML)
+        assert sorted(summary.getAggregatedPids()) == [
+            " data 4 ",
+            "data_1",
+            "data_1_alt",
+            "data_2",
+            "data_3",
+            "meta_pid",
+        ]
+
+    def test_1030(self):
+        """parseResourceMapSummary(): Document that uses rdf:parseType="Collection" is
+        read with rdflib."""
+        self._assert_conforms(
+            ORE_VARIANT_XML.replace(
+                '<ore:aggregates rdf:resource="data_1"/>',
+                '<ore:aggregates rdf:resource="data_1"/>'
+                '<ore:similarTo rdf:parseType="Collection">'
+                '<rdf:Description rdf:about="data_1"/></ore:similarTo>',
+            )
+        )
+
+    def test_1040(self):
+        """parseResourceMapSummary(): Accepts bytes and file-like objects."""
+        ore_bytes = ORE_VARIANT_XML.encode("utf-8")
+        assert (
+            d1_common.resource_map.parseResourceMapSummary(
+                ore_bytes
+            ).getResourceMapPid()
+            == "map_pid"
+        )
+        assert (
+            d1_common.resource_map.parseResourceMapSummary(
+                io.BytesIO(ore_bytes)
+            ).getResourceMapPid()
+            == "map_pid"
+        )
+
+    def test_1050(self):
+        """parseResourceMapSummary(): Invalid XML raises SAXException."""
+        with pytest.raises(xml.sax.SAXException):
+            d1_common.resource_map.parseResourceMapSummary("<rdf:RDF")
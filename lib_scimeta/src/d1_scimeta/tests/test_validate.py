@@ -17,6 +17,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import io
 import os
 
 import pytest
@@ -110,3 +111,49 @@ class TestSciMetaValidate(d1_test.d1_test_case.D1TestCase):
         """SciMeta.assert_valid(): Valid ISO/TC 211"""
         xml_str = self.test_files.load_xml_to_bytes(os.path.join("isotc211", xml_doc))
         d1_scimeta.validate.assert_valid("http://www.isotc211.org/2005/gmd", xml_str)
+
+    # Validator cache
+
+    def test_1100(self):
+        """get_schema_validator(): Returns the same compiled validator on repeated
+        calls."""
+        format_id = "eml://ecoinformatics.org/eml-2.1.1"
+        validator = d1_scimeta.validate.get_schema_validator(format_id)
+        assert d1_scimeta.validate.get_schema_validator(format_id) is validator
+
+    def test_1110(self):
+        """clear_cache(): Dropped validator is recompiled on next use and still
+        validates."""
+        format_id = "eml://ecoinformatics.org/eml-2.1.1"
+        validator = d1_scimeta.validate.get_schema_validator(format_id)
+        d1_scimeta.validate.clear_cache(format_id)
+        assert format_id not in d1_scimeta.validate.SCHEMA_VALIDATOR_DICT
+        assert d1_scimeta.validate.get_schema_validator(format_id) is not validator
+        xml_str = self.test_files.load_bin("xml/scimeta_eml_valid.xml")
+        d1_scimeta.validate.assert_valid(format_id, xml_str)
+
+    def test_1120(self):
+        """warm_up_cache(): Creates validators for the requested formatIds."""
+        d1_scimeta.validate.clear_cache()
+        format_id_list = [
+            "eml://ecoinformatics.org/eml-2.1.1",
+            "http://ns.dataone.org/metadata/schema/onedcx/v1.0",
+        ]
+        assert d1_scimeta.validate.warm_up_cache(format_id_list) == []
+        for format_id in format_id_list:
+            assert format_id in d1_scimeta.validate.SCHEMA_VALIDATOR_DICT
+
+    def test_1130(self):
+        """warm_up_cache(): Invalid formatId is reported, not raised."""
+        failed_list = d1_scimeta.validate.warm_up_cache(["unknown_format_id"])
+        assert len(failed_list) == 1
+        assert failed_list[0][0] == "unknown_format_id"
+
+    def test_1140(self):
+        """validate_file(): Valid and invalid EML 2.1.1 read from file-like object."""
+        format_id = "eml://ecoinformatics.org/eml-2.1.1"
+        xml_bytes = self.test_files.load_bin("xml/scimeta_eml_valid.xml")
+        d1_scimeta.validate.validate_file(format_id, io.BytesIO(xml_bytes))
+        xml_bytes = self.test_files.load_bin("xml/scimeta_eml_invalid_1.xml")
+        with pytest.raises(d1_scimeta.util.SciMetaError, match="unexpectedElement"):
+            d1_scimeta.validate.validate_file(format_id, io.BytesIO(xml_bytes))
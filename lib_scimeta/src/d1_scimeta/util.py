@@ -384,13 +384,22 @@ def load_xml_file_to_tree(xml_path):
 def parse_xml_bytes(xml_bytes, xml_path=None):
     """Parse XML bytes to tree.
 
+    Passing in the path to the file enables relative imports to work.
+    """
+    return parse_xml_file(io.BytesIO(xml_bytes), xml_path)
+
+
+def parse_xml_file(xml_file, xml_path=None):
+    """Parse XML from file-like object to tree.
+
+    The file is read incrementally by the parser, so the XML bytes are not held in
+    memory in addition to the tree.
+
     Passing in the path to the file enables relative imports to work.
     """
     xml_parser = lxml.etree.XMLParser(no_network=True)
     try:
-        return lxml.etree.parse(
-            io.BytesIO(xml_bytes), parser=xml_parser, base_url=xml_path
-        )
+        return lxml.etree.parse(xml_file, parser=xml_parser, base_url=xml_path)
     except lxml.etree.LxmlError as e:
         raise SciMetaError(
             "Invalid XML (not well formed). {}".format(
@@ -566,29 +575,42 @@ def remove_empty_elements(xml_tree):
 
 def apply_xslt_transform(xml_tree, xslt_path):
     abs_xslt_path = d1_common.utils.filesystem.abs_path(xslt_path)
-    if abs_xslt_path not in XSLT_TRANSFORM_DICT:
-        try:
-            XSLT_TRANSFORM_DICT[abs_xslt_path] = create_lxml_obj(
-                load_xml_file_to_tree(abs_xslt_path), lxml.etree.XSLT
-            )
-        except SciMetaError as e:
-            raise SciMetaError(
-                "Unable to create XSLT processor: {}: {}".format(xslt_path, str(e))
-            )
-
+    xslt_transform = get_xslt_transform(abs_xslt_path)
     try:
-        transformed_tree = XSLT_TRANSFORM_DICT[abs_xslt_path](xml_tree)
+        transformed_tree = xslt_transform(xml_tree)
     except lxml.etree.XSLTError as e:
         raise SciMetaError(
             "Unable to apply XSLT processor from file: {}: {}".format(
                 abs_xslt_path, get_error_log_as_str(e)
             )
         )
-    if XSLT_TRANSFORM_DICT[abs_xslt_path].error_log:
+    if xslt_transform.error_log:
         log.warning(get_error_log_as_str(transformed_tree))
     return transformed_tree
 
 
+def get_xslt_transform(abs_xslt_path):
+    """Get the compiled lxml.etree.XSLT processor for the XSLT file at
+    `abs_xslt_path`.
+
+    The processor is created on first use and cached in XSLT_TRANSFORM_DICT.
+    """
+    try:
+        return XSLT_TRANSFORM_DICT[abs_xslt_path]
+    except KeyError:
+        pass
+    try:
+        xslt_transform = create_lxml_obj(
+            load_xml_file_to_tree(abs_xslt_path), lxml.etree.XSLT
+        )
+    except SciMetaError as e:
+        raise SciMetaError(
+            "Unable to create XSLT processor: {}: {}".format(abs_xslt_path, str(e))
+        )
+    XSLT_TRANSFORM_DICT[abs_xslt_path] = xslt_transform
+    return xslt_transform
+
+
 def create_lxml_obj(xml_tree, lxml_obj_class):
     """Create an object from an lxml class that takes a tree as parameter.
 
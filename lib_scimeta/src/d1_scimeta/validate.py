@@ -28,14 +28,33 @@ Usage:
     except d1_scimeta.util.SciMetaError as e:
         log.error(e)
 
+Compiled validators:
+
+    Creating the lxml.etree.XMLSchema validator for a formatId requires loading and
+    compiling the root XSD and all the XSDs it includes and imports, which can be
+    hundreds of files for formats such as ISO/TC 211 and EML. The compiled validators
+    are cached for the lifetime of the process, keyed by formatId.
+
+    warm_up_cache() can be called at startup to create the validators before the
+    first validation is requested. clear_cache() drops cached validators, which causes
+    them to be recompiled from disk on next use.
+
 """
 import logging
 import os
+import threading
 
 import lxml.etree
 
 import d1_scimeta.util
 
+# formatId -> lxml.etree.XMLSchema
+SCHEMA_VALIDATOR_DICT = {}
+# Root XSD path -> abs path to Xerces adaption XSLT, or None if there is no XSLT
+ADAPTION_XSLT_PATH_DICT = {}
+
+_cache_lock = threading.RLock()
+
 log = logging.getLogger(__name__)
 
 
@@ -82,36 +101,146 @@ def validate_bytes(format_id, xml_bytes, xml_path=None):
     _assert_valid(format_id, d1_scimeta.util.parse_xml_bytes(xml_bytes, xml_path))
 
 
+def validate_file(format_id, xml_file, xml_path=None):
+    log.debug("Validating XML file-like object")
+    _assert_valid(format_id, d1_scimeta.util.parse_xml_file(xml_file, xml_path))
+
+
 def validate_path(format_id, xml_path):
     log.debug("Validating XML file: {}".format(xml_path))
     _assert_valid(format_id, d1_scimeta.util.load_xml_file_to_tree(xml_path))
 
 
 def apply_xerces_adaption_schema_transform(root_xsd_path, xml_tree):
-    xslt_path = os.path.splitext(root_xsd_path)[0] + ".xslt"
-    if os.path.exists(xslt_path):
+    xslt_path = _get_adaption_xslt_path(root_xsd_path)
+    if xslt_path is not None:
         return d1_scimeta.util.apply_xslt_transform(xml_tree, xslt_path)
     return xml_tree
 
 
+def get_schema_validator(format_id):
+    """Get the compiled lxml.etree.XMLSchema validator for `format_id`.
+
+    The validator is created on first use and then cached for the lifetime of the
+    process, or until it is dropped with clear_cache().
+
+    Raises:
+        d1_scimeta.util.SciMetaError: On invalid formatId or if the validator cannot be
+        created.
+
+    """
+    try:
+        return SCHEMA_VALIDATOR_DICT[format_id]
+    except KeyError:
+        pass
+    with _cache_lock:
+        if format_id not in SCHEMA_VALIDATOR_DICT:
+            root_xsd_path = d1_scimeta.util.get_abs_root_xsd_path(format_id)
+            log.debug(
+                'Creating schema validator. format_id="{}" root_xsd_path="{}"'.format(
+                    format_id, root_xsd_path
+                )
+            )
+            xsd_tree = d1_scimeta.util.load_xml_file_to_tree(root_xsd_path)
+            SCHEMA_VALIDATOR_DICT[format_id] = _create_schema_validator(xsd_tree)
+        return SCHEMA_VALIDATOR_DICT[format_id]
+
+
+def warm_up_cache(format_id_list=None):
+    """Create and cache validators and XSLT transforms ahead of first use.
+
+    Args:
+        format_id_list: list of str
+            formatIds for which to create validators. If None, validators are created
+            for all formatIds supported by the library.
+
+    Returns:
+        list of (format_id, error_str): formatIds for which a validator could not be
+        created, together with the reason. Those formatIds will be retried on next
+        use.
+
+    """
+    if format_id_list is None:
+        format_id_list = d1_scimeta.util.get_supported_format_id_list()
+    d1_scimeta.util.get_xslt_transform(d1_scimeta.util.STRIP_WHITESPACE_XSLT_PATH)
+    failed_list = []
+    for format_id in format_id_list:
+        try:
+            get_schema_validator(format_id)
+            root_xsd_path = d1_scimeta.util.get_abs_root_xsd_path(format_id)
+            xslt_path = _get_adaption_xslt_path(root_xsd_path)
+            if xslt_path is not None:
+                d1_scimeta.util.get_xslt_transform(xslt_path)
+        except d1_scimeta.util.SciMetaError as e:
+            failed_list.append((format_id, str(e)))
+    return failed_list
+
+
+def clear_cache(format_id=None):
+    """Drop cached validators and XSLT transforms.
+
+    Args:
+        format_id: str
+            If set, only drop the validator and adaption XSLT for the given formatId.
+            If None, drop all cached validators and XSLT transforms.
+
+    """
+    with _cache_lock:
+        if format_id is None:
+            SCHEMA_VALIDATOR_DICT.clear()
+            ADAPTION_XSLT_PATH_DICT.clear()
+            d1_scimeta.util.XSLT_TRANSFORM_DICT.clear()
+            return
+        SCHEMA_VALIDATOR_DICT.pop(format_id, None)
+        root_xsd_path = d1_scimeta.util.get_abs_root_xsd_path(format_id)
+        xslt_path = ADAPTION_XSLT_PATH_DICT.pop(root_xsd_path, None)
+        if xslt_path is not None:
+            d1_scimeta.util.XSLT_TRANSFORM_DICT.pop(xslt_path, None)
+
+
+def _get_adaption_xslt_path(root_xsd_path):
+    """Get the abs path to the Xerces adaption XSLT for the root XSD, or None if the
+    schema does not require adaption.
+
+    The result is cached in order to avoid checking the filesystem for each
+    validation.
+    """
+    try:
+        return ADAPTION_XSLT_PATH_DICT[root_xsd_path]
+    except KeyError:
+        pass
+    xslt_path = os.path.splitext(root_xsd_path)[0] + ".xslt"
+    if not os.path.exists(xslt_path):
+        xslt_path = None
+    ADAPTION_XSLT_PATH_DICT[root_xsd_path] = xslt_path
+    return xslt_path
+
+
 def _assert_valid(format_id, xml_tree):
     root_xsd_path = d1_scimeta.util.get_abs_root_xsd_path(format_id)
-    xsd_tree = d1_scimeta.util.load_xml_file_to_tree(root_xsd_path)
+    validator = get_schema_validator(format_id)
     stripped_xml_tree = d1_scimeta.util.strip_whitespace(xml_tree)
     adapted_tree = apply_xerces_adaption_schema_transform(
         root_xsd_path, stripped_xml_tree
     )
     # d1_scimeta.util.dump_pretty_tree(adapted_tree, 'Final tree to be validated')
-    _assert_valid_tree(xsd_tree, adapted_tree)
+    _assert_valid_with_validator(validator, adapted_tree)
 
 
 def _assert_valid_tree(xsd_tree, xml_tree):
+    _assert_valid_with_validator(_create_schema_validator(xsd_tree), xml_tree)
+
+
+def _create_schema_validator(xsd_tree):
     try:
-        validator = d1_scimeta.util.create_lxml_obj(xsd_tree, lxml.etree.XMLSchema)
+        return d1_scimeta.util.create_lxml_obj(xsd_tree, lxml.etree.XMLSchema)
     except d1_scimeta.util.SciMetaError as e:
         raise d1_scimeta.util.SciMetaError(
             "Unable to create lxml schema validator: {}".format(str(e))
         )
+
+
+def _assert_valid_with_validator(validator, xml_tree):
     try:
         validator.assertValid(xml_tree)
     except lxml.etree.DocumentInvalid as e: